@@ -1,7 +1,6 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import yfinance as yf
 from datetime import datetime, timedelta
 from database import (
     create_user, 
@@ -17,9 +16,25 @@ import streamlit.components.v1 as components
 import stripe
 import time
 from dotenv import load_dotenv
-from webhook_handler import handle_webhook_event
-from flask import Flask, request
 import threading
+from market_data import get_provider
+from perf import CallCounter, Prefetcher, Timings
+from price_store import PriceStore, frame_version, slice_period
+from downsample import downsample
+from export import FORMATS as EXPORT_FORMATS, export_bytes
+from figures import FigureCache
+from holdings import HoldingsRepository
+from quotes import QuoteService
+from registry import APPROACH_COLUMNS, OVERVIEW_COLUMNS, RISK_LEVELS, ETFRegistry
+from shared_store import SharedStore, content_version
+from loader import ConcurrentLoader, Task
+from returns import HORIZONS, compute_trailing
+from risk import risk_metrics as calculate_risk_metrics
+from rolling import ROLLING_WINDOWS, RollingAnalytics, pair_returns
+from snapshots import SnapshotCache
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from swr_cache import SWRCache
+from watcher import WorkbookWatcher
 
 # Load environment variables
 load_dotenv()
@@ -28,105 +43,99 @@ load_dotenv()
 stripe.api_key = os.getenv('STRIPE_SECRET_KEY')
 STRIPE_PRICE_ID = os.getenv('STRIPE_PRICE_ID')
 
-# Initialize Flask app
-app = Flask(__name__)
-
-# Add this function to run Streamlit and Flask together
-def run_flask():
-    app.run(port=5000)
-
-# Start Flask in a separate thread
-flask_thread = threading.Thread(target=run_flask)
-flask_thread.daemon = True
-flask_thread.start()
+# Stripe webhooks are served by webhook_service.py, a separate process
 
 # ====================== DATA FUNCTIONS ==========================
-@st.cache_data
+@st.cache_resource
+def get_etf_registry():
+    """Process-wide ETF universe from the reference workbook (see registry.py)"""
+    return ETFRegistry.load()
+
 def get_etf_data():
     """ETF data with exact figures from official sources"""
-    return pd.DataFrame({
-        'ETF': ['SPUS', 'SPWO', 'UMMA', 'HLAL', 'ISDU', 'ISDE', 'WSHR'],
-        'Full Name': [
-            'SP Funds S&P 500 Sharia Industry Exclusions ETF',
-            'SP Funds Dow Jones World ETF',
-            'UMMA Islamic Values ETF',
-            'Wahed FTSE USA Shariah ETF',
-            'iShares MSCI USA Islamic UCITS ETF',
-            'iShares MSCI World Islamic UCITS ETF',
-            'Wealthsimple Shariah World Equity Index ETF'
-        ],
-        'Focus': [
-            'US Large Cap',
-            'Global Equity',
-            'Global Islamic',
-            'US All Cap',
-            'US Islamic',
-            'Global Islamic',
-            'Global Islamic'
-        ],
-        'AUM (M)': [1101, 36.50, 245.86, 595.45, 325.50, 36.50, 313.70],
-        'Expense Ratio': ['0.45%', '0.55%', '0.50%', '0.50%', '0.60%', '0.60%', '0.64%'],
-        'Shariah Advisory': [
-            'Ratings Intelligence',
-            'Ratings Intelligence',
-            'Yasaar Limited',
-            'Yasaar Limited',
-            'Amanie Advisors',
-            'Amanie Advisors',
-            'Ratings Intelligence'
-        ],
-        'YTD Return': ['3.40%', '1.07%', '2.80%', '1.90%', '2.45%', '2.10%', '2.30%'],
-        '1-Year Return': ['26.70%', '14.11%', '20.50%', '17.10%', '22.45%', '18.89%', '14.01%'],
-        '3-Year Return': ['14.90%', 'N/A', 'N/A', '11.30%', '14.14%', '10.50%', 'N/A']
-    })
+    return get_etf_registry().columns(OVERVIEW_COLUMNS)
+@st.cache_resource
+def get_market_data():
+    """Process-wide market data provider (see market_data.py)"""
+    return get_provider()
+
+@st.cache_resource
+def get_price_store():
+    """Process-wide on-disk price history store"""
+    return PriceStore(provider=get_market_data())
+
+@st.cache_resource
+def get_data_cache():
+    """Process-wide stale-while-revalidate cache for quotes and histories"""
+    return SWRCache(ttl=300)
+
+@st.cache_resource
+def get_shared_store():
+    """Process-wide view of datasets memory-mapped from disk and shared by all server processes"""
+    return SharedStore()
+
+def share_frame(name, frame):
+    """Publish a frame to the shared store and return the read-only mapped copy"""
+    store = get_shared_store()
+    # Map the version just published: CURRENT may already name another process's
+    return store.frame(name, store.publish(name, frame))
+
+def get_price_history(ticker, period):
+    """Price history for a period, sliced from the cached full history"""
+    full_history = get_data_cache().get(
+        (ticker, "max"),
+        lambda: share_frame(f"prices-{ticker}", get_price_store().history(ticker)),
+        ttl=900
+    )
+    return slice_period(full_history, period)
+
+def share_closes(tickers):
+    """Aligned full close histories, shared under one dataset per set of tickers"""
+    canonical = sorted(dict.fromkeys(tickers))
+    closes = share_frame(f"closes-{'-'.join(canonical)}", get_price_store().history_many(canonical))
+    # Bound the datasets left behind by past selections
+    get_shared_store().retire("closes-", MAX_SHARED_SELECTIONS)
+    # Column selection keeps the mapped buffers
+    return closes if list(closes.columns) == list(tickers) else closes[list(tickers)]
+
+def get_price_histories(tickers, period):
+    """Aligned close prices for several tickers, sliced from the cached full histories"""
+    full_history = get_data_cache().get(
+        (tuple(tickers), "max"),
+        lambda: share_closes(tickers),
+        ttl=900
+    )
+    return slice_period(full_history, period)
+
+def chart_points():
+    """Points per trace for the viewer's screen: about one per pixel of chart width"""
+    mobile = 'Mobi' in st.context.headers.get('User-Agent', '')
+    return MOBILE_CHART_WIDTH if mobile else DESKTOP_CHART_WIDTH
+
+@st.cache_data(max_entries=256)
+def downsample_history(ticker, period, points, data_version, _data):
+    """Chart copy of a price history (LTTB, extremes kept), memoized per (ticker, period, resolution)"""
+    return downsample(_data, points)
+
 def plot_price_chart(etf, period, key=None):
-    """Generate price history using yfinance"""
-    period_map = {
-        "1mo": "1mo",
-        "3mo": "3mo",
-        "6mo": "6mo",
-        "1y": "1y",
-        "max": "max"
-    }
-    try:
-        data = yf.Ticker(etf).history(period=period_map[period])
-        fig = px.line(data, x=data.index, y='Close', title=f"{etf} Price History")
-        st.plotly_chart(fig, key=key)
-    except KeyError:
-        data = yf.Ticker(etf).history(period="1y")
-        fig = px.line(data, x=data.index, y='Close', title=f"{etf} Price History")
-        st.plotly_chart(fig, key=key)
-def get_manual_holdings(etf):
-    """Holdings data from official factsheets"""
-    holdings = {
-        'SPUS': ['Microsoft', 'Apple', 'Amazon', 'Google', 'Tesla'],
-        'SPTE': ['NVIDIA', 'AMD', 'Intel', 'Qualcomm'],
-        'SPWO': ['SpaceX', 'Blue Origin', 'Virgin Galactic'],
-        'UMMA': ['Microsoft', 'Apple', 'NVIDIA', 'Tesla', 'Meta'],
-        'HLAL': ['Pfizer', 'Johnson & Johnson', 'Moderna', 'Novartis'],
-        'ISDU': ['Microsoft', 'Apple', 'NVIDIA', 'Tesla', 'Meta'],
-        'ISDE': ['Samsung', 'Alibaba', 'Tencent', 'Sony'],
-        'WSHR': ['Microsoft', 'Apple', 'NVIDIA', 'Tesla', 'Meta']
-    }
+    """Generate price history from the local price store"""
+    data = get_price_history(etf, period)
+    data = downsample_history(etf, period, chart_points(), frame_version(data), data)
+    fig = px.line(data, x=data.index, y='Close', title=f"{etf} Price History")
+    st.plotly_chart(fig, key=key)
+def get_holdings(etf):
+    """Holdings data from the ETF's Details workbook"""
+    holdings = get_holdings_repository().holdings(etf)
     return pd.DataFrame({
-        'Holding': holdings.get(etf, []),
-        'Weight (%)': [30, 25, 20, 15, 10][:len(holdings.get(etf, []))]
+        'Holding': holdings['security'].to_numpy(),
+        'Weight (%)': holdings['weight'].to_numpy() * 100
     })
 def get_sector_weightings(etf):
-    """Sector data from fund reports"""
-    sectors = {
-        'SPUS': {'Technology': 40, 'Healthcare': 30, 'Consumer': 20, 'Other': 10},
-        'SPTE': {'Technology': 80, 'Semiconductors': 20},
-        'SPWO': {'Aerospace': 70, 'Technology': 30},
-        'UMMA': {'Technology': 45, 'Healthcare': 25, 'Consumer': 20, 'Other': 10},
-        'HLAL': {'Healthcare': 60, 'Technology': 25, 'Consumer': 15},
-        'ISDU': {'Technology': 42, 'Healthcare': 28, 'Consumer': 20, 'Other': 10},
-        'ISDE': {'Technology': 35, 'Consumer': 30, 'Healthcare': 25, 'Other': 10},
-        'WSHR': {'Technology': 40, 'Healthcare': 30, 'Consumer': 20, 'Other': 10}
-    }
+    """Sector data from the ETF's Details workbook"""
+    sectors = get_holdings_repository().sectors(etf)
     return pd.DataFrame({
-        'Sector': sectors.get(etf, {}).keys(),
-        'Weight': sectors.get(etf, {}).values()
+        'Sector': sectors['sector'].to_numpy(),
+        'Weight': sectors['weight'].to_numpy() * 100
     })
 def add_back_to_top_button():
     # Create a fixed container for the button
@@ -161,19 +170,43 @@ def add_back_to_top_button():
                 """
                 components.html(js, height=0)
 
-@st.cache_data
-def read_excel_data(file_path):
+@st.cache_resource
+def get_snapshot_cache():
+    """Process-wide Parquet snapshots of the Details workbooks"""
+    return SnapshotCache()
+
+@st.cache_resource
+def get_workbook_watcher():
+    """Process-wide poller that re-ingests workbooks when their content changes"""
+    return WorkbookWatcher()
+
+@st.cache_resource(max_entries=1)
+def load_holdings_repository(dataset_versions):
+    """Compact holdings repository for one set of dataset versions, mapped from the shared store"""
+    tables = HoldingsRepository(get_workbook_watcher().dataset).tables
+    return HoldingsRepository.from_compact({name: share_frame(name, table) for name, table in tables.items()})
+
+def get_holdings_repository():
+    """Process-wide holdings repository, rebuilt only when a workbook changes"""
+    watcher = get_workbook_watcher()
+    watcher.poll()
+    return load_holdings_repository(tuple(sorted(watcher.versions.items())))
+
+@st.cache_data(max_entries=64)
+def load_workbook_snapshot(file_path, dataset_version, sheets=None):
+    """Workbook sheets for one dataset version, parsed only if no snapshot exists yet"""
+    return get_snapshot_cache().load(file_path, sheets)
+
+def read_excel_data(file_path, sheets=None):
     """Read ISDU data from Excel file"""
     try:
         if not os.path.exists(file_path):
             st.error(f"Excel file not found at: {file_path}")
             return None
             
-        excel_data = pd.ExcelFile(file_path)
-        data = {}
-        for sheet in excel_data.sheet_names:
-            data[sheet] = pd.read_excel(file_path, sheet_name=sheet)
-        return data
+        watcher = get_workbook_watcher()
+        watcher.poll()
+        return load_workbook_snapshot(file_path, watcher.version(file_path), tuple(sheets) if sheets else None)
     except pd.errors.EmptyDataError:
         st.error("The Excel file is empty")
         return None
@@ -184,56 +217,25 @@ def read_excel_data(file_path):
         st.error(f"Error reading Excel file: {e}")
         return None
 
-@st.cache_data
 def get_isdu_holdings():
-    """Get ISDU holdings from Excel"""
-    file_path = '7- ISDU Details.xlsx'
-    data = read_excel_data(file_path)
-    
-    if data is None or 'ISDE Holdings' not in data:
-        return pd.DataFrame()
-    
-    holdings_df = data['ISDE Holdings']
-    # Ensure column names match exactly
-    if 'Security Name' in holdings_df.columns and 'Weightings' in holdings_df.columns:
-        return holdings_df.sort_values('Weightings', ascending=False)
-    return pd.DataFrame()
+    """Get ISDU holdings from the holdings repository"""
+    holdings = get_holdings_repository().holdings('ISDU')
+    return holdings.rename(columns={'security': 'Security Name', 'weight': 'Weightings'})[['Security Name', 'Weightings']].reset_index(drop=True)
 
-@st.cache_data
 def get_isdu_sectors():
-    """Get ISDU sectors from Excel"""
-    file_path = '7- ISDU Details.xlsx'
-    data = read_excel_data(file_path)
-    
-    if data is None or 'ISDE Sector' not in data:
-        return pd.DataFrame()
-    
-    sectors_df = data['ISDE Sector']
-    # Ensure column names match exactly
-    if 'Sector' in sectors_df.columns and 'Weightings' in sectors_df.columns:
-        return sectors_df.sort_values('Weightings', ascending=False)
-    return pd.DataFrame()
+    """Get ISDU sectors from the holdings repository"""
+    sectors = get_holdings_repository().sectors('ISDU')
+    return sectors.rename(columns={'sector': 'Sector', 'weight': 'Weightings'})[['Sector', 'Weightings']].reset_index(drop=True)
 
-@st.cache_data
 def get_isdu_countries():
-    """Get ISDU countries from Excel"""
-    file_path = '7- ISDU Details.xlsx'
-    data = read_excel_data(file_path)
-    
-    if data is None or 'ISDE Country' not in data:
-        return pd.DataFrame()
-    
-    countries_df = data['ISDE Country']
-    # Note the space after "Country" in the column name
-    if 'Country ' in countries_df.columns and 'Weightings' in countries_df.columns:
-        return countries_df.sort_values('Weightings', ascending=False)
-    return pd.DataFrame()
+    """Get ISDU countries from the holdings repository"""
+    countries = get_holdings_repository().countries('ISDU')
+    return countries.rename(columns={'country': 'Country', 'weight': 'Weightings'})[['Country', 'Weightings']].reset_index(drop=True)
 
-@st.cache_data
 def get_isdu_returns():
     """Get ISDU returns data from Excel"""
     file_path = '7- ISDU Details.xlsx'
-    data = read_excel_data(file_path)
+    data = read_excel_data(file_path, ['ISDE Returns'])
     
     if data is None or 'ISDE Returns' not in data:
         return pd.DataFrame()
@@ -243,11 +245,10 @@ def get_isdu_returns():
         return returns_df
     return pd.DataFrame()
 
-@st.cache_data
 def get_isdu_price():
     """Get current ISDU price from Excel"""
     file_path = '7- ISDU Details.xlsx'
-    data = read_excel_data(file_path)
+    data = read_excel_data(file_path, ['ISDE Price'])
     
     if data is None or 'ISDE Price' not in data:
         return None
@@ -257,52 +258,130 @@ def get_isdu_price():
         return price_df['Current Price'].iloc[0]
     return None
 
-@st.cache_data
-def get_current_price(ticker):
-    """Get current price from yfinance"""
-    try:
-        stock = yf.Ticker(ticker)
-        current_price = stock.info.get('regularMarketPrice')
-        return current_price if current_price else None
-    except Exception as e:
-        st.error(f"Error fetching price: {e}")
-        return None
+@st.cache_resource
+def get_quote_service():
+    """Process-wide batched quote service for every tracked ETF"""
+    return QuoteService(get_market_data(), YAHOO_TICKERS.values())
 
-@st.cache_data
-def get_etf_summary(ticker):
-    """Get ETF summary from yfinance"""
-    try:
-        etf = yf.Ticker(ticker)
-        return etf.info
-    except Exception as e:
-        st.error(f"Error fetching ETF summary: {e}")
-        return None
+def get_quotes():
+    """Quote snapshot of all tracked ETFs, fetched in one batch"""
+    return get_data_cache().get(('quotes',), lambda: get_quote_service().fetch(), ttl=60)
+
+@st.cache_resource
+def get_loader():
+    """Process-wide concurrent loader; its circuit breakers persist across reruns"""
+    return ConcurrentLoader(max_workers=8)
+
+def in_script_context(fn):
+    """Wrap `fn` to run in a worker thread with this session's context (needed by Streamlit caches)"""
+    ctx = get_script_run_ctx()
+
+    def run(*args):
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fn(*args)
+    return run
+
+def load_isdu_page():
+    """Start every independent ISDU Deep Dive fetch at once and wait for all of them"""
+    tasks = [
+        Task('quotes', in_script_context(get_quotes), timeout=10),
+        Task('price_history', in_script_context(get_price_history), ("ISDU.L", "max"), timeout=20),
+        Task('holdings', in_script_context(get_isdu_holdings), timeout=15),
+        Task('sectors', in_script_context(get_isdu_sectors), timeout=15),
+        Task('countries', in_script_context(get_isdu_countries), timeout=15),
+        Task('return_prices', in_script_context(get_price_histories), (["ISDU.L", "^GSPC"], "max"), timeout=20),
+    ]
+    results = get_loader().load(tasks)
+    # Per-dependency load times go to the admin stats; only failures are logged
+    for name, result in results.items():
+        get_timings().record(f"isdu:{name}", result.elapsed)
+        if not result.ok:
+            print(f"⚠️ ISDU load {name} failed after {result.attempts} attempt(s): {result.error}")
+    return results
+
+def warm_holdings_view():
+    registry = get_etf_registry()
+    get_holdings_repository()
+    get_price_history(YAHOO_TICKERS[registry.in_order(registry.between('Expense Ratio', hi=0.65))[0]], "max")
+
+def warm_comparison_view():
+    get_rolling_frames(SELECTED_ETFS[:2])
+
+def warm_isdu_view():
+    get_quotes()
+    get_holdings_repository()
+    get_price_histories(["ISDU.L", "^GSPC"], "max")
+    get_price_history("ISDU.L", "max")
+
+@st.cache_resource
+def get_timings():
+    """Process-wide render timings (see perf.py)"""
+    return Timings()
+
+@st.cache_resource
+def get_figure_cache():
+    """Process-wide built figures for charts that look the same to every user"""
+    return FigureCache()
+
+def cached_figure(frame, spec):
+    """Figure for `spec` over `frame`, built once per process per data version (do not modify it)"""
+    return get_figure_cache().get(content_version(frame), frame, spec)
+
+@st.cache_resource
+def get_call_counter():
+    """Process-wide count of repo functions executed per run/fragment (set PERF_COUNT_CALLS=1)"""
+    return CallCounter(enabled=os.getenv('PERF_COUNT_CALLS') == '1')
+
+@st.cache_resource
+def get_prefetcher():
+    """Process-wide next-view predictor that warms that view's caches in the background"""
+    return Prefetcher(VIEWS, {
+        "ETF Overview": get_risk_metrics,
+        "Holdings Analysis": warm_holdings_view,
+        "Performance Comparison": warm_comparison_view,
+        "ISDU Deep Dive": warm_isdu_view,
+    })
 
 @st.cache_data
-def calculate_returns(history, periods):
-    """Calculate returns for different time periods"""
-    returns = {}
-    for period_name, period_info in periods.items():
-        years = period_info['years']
-        if not history.empty:
-            current_price = history['Close'].iloc[-1]
-            # Calculate the number of trading days to look back
-            lookback_days = years * 252  # Approximate trading days in a year
-            
-            # Get the start date index
-            if len(history) >= lookback_days:
-                start_price = history['Close'].iloc[-lookback_days]
-            else:
-                # If we don't have enough history, use the earliest available price
-                start_price = history['Close'].iloc[0]
-            
-            # Calculate return
-            returns[period_name] = {
-                "start_price": start_price,
-                "current_price": current_price,
-                "return": ((current_price - start_price) / start_price) * 100
-            }
-    return returns
+def compute_risk_metrics(data_version, _prices):
+    """Risk metrics memoized per price data version (prices are not hashed)"""
+    return calculate_risk_metrics(_prices, benchmark="^GSPC")
+
+def get_risk_metrics():
+    """Risk metrics for every tracked ETF from the cached daily histories"""
+    prices = get_price_histories(list(YAHOO_TICKERS.values()) + ["^GSPC"], "max")
+    prices = slice_period(prices, "3y")
+    metrics = compute_risk_metrics(frame_version(prices), prices)
+    metrics = metrics.rename(index={symbol: etf for etf, symbol in YAHOO_TICKERS.items()})
+    return metrics.rename_axis('ETF').reset_index()
+
+@st.cache_resource
+def get_rolling_analytics():
+    """Process-wide incremental rolling-window state, shared by all sessions"""
+    return RollingAnalytics(ROLLING_WINDOWS)
+
+def get_rolling_frames(etfs):
+    """Rolling volatility/beta/correlation vs ^GSPC for each ETF"""
+    symbols = [YAHOO_TICKERS[etf] for etf in etfs]
+    # Gap-fill the selection in one batched request (the comparison charts' cache entry)
+    get_price_histories(symbols, "max")
+    benchmark = get_price_history("^GSPC", "max")['Close']
+    analytics = get_rolling_analytics()
+    frames = {}
+    for etf, symbol in zip(etfs, symbols):
+        # Each ETF's own cached history, so the rolling state sees one series per ticker
+        # whatever else is selected; returns on the ETF's own trading days
+        returns, benchmark_returns = pair_returns(get_price_history(symbol, "max")['Close'], benchmark)
+        frames[etf] = analytics.update(symbol, returns, benchmark_returns)
+    return frames
+
+def loaded(results, name, default=None):
+    """Value of a finished load, or `default` if it failed"""
+    result = results[name]
+    if not result.ok:
+        st.error(f"Error loading {name.replace('_', ' ')}: {result.error}")
+        return default
+    return result.value
 
 # ====================== SUBSCRIPTION FUNCTIONS ==========================
 def check_subscription(username):
@@ -346,6 +425,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+get_call_counter().start("run")
+
 # Initialize session state for authentication if not already set
 if 'authentication_status' not in st.session_state:
     st.session_state['authentication_status'] = None
@@ -359,10 +440,186 @@ if 'history_period' not in st.session_state:
     st.session_state['history_period'] = "1y"
 
 # ====================== CONSTANTS ==============================
-SELECTED_ETFS = ['SPUS', 'SPWO', 'UMMA', 'HLAL', 'ISDU', 'ISDE', 'WSHR']
-ETF_EXPENSE_RATIOS = {row['ETF']: float(row['Expense Ratio'].strip('%')) 
-                     for _, row in get_etf_data().iterrows()}
+# The ETF universe, its Yahoo Finance symbols (the London/NEO listings need a suffix)
+# and metadata all come from the registry
+SELECTED_ETFS = get_etf_registry().tickers
+YAHOO_TICKERS = get_etf_registry().yahoo_tickers
+# Estimated chart widths (px) used to cap the points sent per price trace
+DESKTOP_CHART_WIDTH = 1200
+MOBILE_CHART_WIDTH = 400
+MAX_SHARED_SELECTIONS = 32
+# Main views, in navigation order
+VIEWS = ["ETF Overview", "Holdings Analysis", "Performance Comparison", "ISDU Deep Dive"]
 ADMIN_USERS = ['abdul']  # List of usernames with admin access
+# ====================== FRAGMENTS ==============================
+# Interactive sections are fragments: a widget change inside one reruns only
+# that function instead of the whole script (and its subscription query)
+@st.fragment
+@get_call_counter().counted("fragment:holdings_analysis")
+def holdings_analysis():
+    """Holdings Analysis view: ETF/period selectors, price chart, holdings and export"""
+    st.header("Holdings Analysis")
+
+    # Filter ETFs
+    registry = get_etf_registry()
+    filtered_etfs = registry.in_order(registry.between('Expense Ratio', hi=0.65))
+
+    # ETF selector with filtered ETFs
+    selected_etf = st.selectbox(
+        "Select ETF to analyze",
+        filtered_etfs
+    )
+
+    # Add period selector
+    period = st.selectbox(
+        "Select Time Period",
+        ["1D", "5D", "1M", "6M", "YTD", "1Y", "5Y", "All"],
+        index=5
+    )
+
+    # Show price chart
+    plot_price_chart(YAHOO_TICKERS[selected_etf], period, key=f"holdings_{selected_etf}")
+
+    # Show holdings
+    st.subheader(f"{selected_etf} Holdings")
+    holdings_df = get_holdings(selected_etf)
+    st.dataframe(holdings_df)
+
+    # Show sector weights with pie chart
+    st.subheader("Sector Weightings")
+    sectors_df = get_sector_weightings(selected_etf)
+    fig = px.pie(sectors_df, values='Weight', names='Sector',
+                title=f'{selected_etf} Sector Distribution')
+    st.plotly_chart(fig)
+
+    # Export holdings, sectors and countries for any set of ETFs
+    st.subheader("Export Holdings")
+    export_col1, export_col2 = st.columns([3, 1])
+    with export_col1:
+        export_etfs = st.multiselect(
+            "ETFs to export", get_holdings_repository().etfs, default=[selected_etf], key="export_etfs"
+        )
+    with export_col2:
+        export_format = st.selectbox("Format", list(EXPORT_FORMATS), key="export_format")
+    st.download_button(
+        "⬇️ Download Holdings",
+        data=lambda: export_bytes(get_holdings_repository(), export_format, export_etfs),
+        file_name=f"holdings.{export_format}",
+        mime=EXPORT_FORMATS[export_format],
+        disabled=not export_etfs,
+        key="export_download"
+    )
+
+
+@st.fragment
+@get_call_counter().counted("fragment:performance_comparison")
+def performance_comparison():
+    """Performance Comparison view: price and rolling risk charts for the selected ETFs"""
+    st.header("Performance Comparison")
+
+    selected_etfs_compare = st.multiselect(
+        "Compare ETFs",
+        SELECTED_ETFS,
+        default=SELECTED_ETFS[:2]
+    )
+
+    if selected_etfs_compare:
+        st.subheader("Historical Performance")
+        # One batched fetch for every selected ETF, aligned on date
+        symbols = [YAHOO_TICKERS[etf] for etf in selected_etfs_compare]
+        compare_prices = get_price_histories(symbols, "1y")
+        for i, etf in enumerate(selected_etfs_compare):
+            data = compare_prices[[YAHOO_TICKERS[etf]]].rename(columns={YAHOO_TICKERS[etf]: etf}).dropna()
+            data = downsample_history(etf, "1y", chart_points(), frame_version(data), data)
+            fig = px.line(data, x=data.index, y=etf, title=f"{etf} Price History",
+                          labels={etf: 'Close'})
+            st.plotly_chart(fig, key=f"compare_{etf}_{i}")
+
+        # Rolling risk against the S&P 500, updated incrementally as new bars arrive
+        st.subheader("Rolling Risk vs S&P 500")
+        rolling_window = st.radio(
+            "Rolling window (trading days)",
+            ROLLING_WINDOWS,
+            index=1,
+            horizontal=True
+        )
+        rolling_frames = get_rolling_frames(selected_etfs_compare)
+        for metric, title in [
+            ('vol', "Rolling Volatility (%)"),
+            ('beta', "Rolling Beta"),
+            ('corr', "Rolling Correlation")
+        ]:
+            chart_data = pd.DataFrame({
+                etf: frame[(metric, rolling_window)] for etf, frame in rolling_frames.items()
+            })
+            fig = px.line(chart_data, x=chart_data.index, y=list(chart_data.columns), title=title)
+            # Each ETF is on its own trading calendar: bridge the dates only another one traded
+            fig.update_traces(connectgaps=True)
+            fig.update_layout(yaxis_title=title, legend_title_text="ETF")
+            st.plotly_chart(fig, key=f"rolling_{metric}")
+    else:
+        st.warning("Select at least 2 ETFs for comparison")
+
+
+@st.fragment
+@get_call_counter().counted("fragment:isdu_price_history")
+def isdu_price_history():
+    """ISDU.L price chart with its period buttons"""
+    # Add period selector buttons
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        if st.button("1 Month", key="1m_isdu"):
+            st.session_state['history_period'] = "1mo"
+    with col2:
+        if st.button("3 Months", key="3m_isdu"):
+            st.session_state['history_period'] = "3mo"
+    with col3:
+        if st.button("6 Months", key="6m_isdu"):
+            st.session_state['history_period'] = "6mo"
+    with col4:
+        if st.button("1 Year", key="1y_isdu"):
+            st.session_state['history_period'] = "1y"
+    with col5:
+        if st.button("All", key="all_isdu"):
+            st.session_state['history_period'] = "max"
+
+    # Show price chart
+    plot_price_chart("ISDU.L", st.session_state['history_period'], key="isdu_main_chart")
+
+
+@st.fragment
+@get_call_counter().counted("fragment:isdu_top_holdings")
+def isdu_top_holdings(holdings_df):
+    """ISDU top 10 holdings with the full-list toggle"""
+    st.write("Top 10 Holdings")
+    st.dataframe(holdings_df.head(10))
+
+    # Show/Hide full holdings
+    if st.button("Toggle Full Holdings"):
+        st.session_state['show_full_holdings'] = not st.session_state.get('show_full_holdings', False)
+
+    if st.session_state.get('show_full_holdings', False):
+        st.write("Complete Holdings List")
+        st.dataframe(holdings_df)
+
+
+@st.fragment
+@get_call_counter().counted("fragment:expense_filter")
+def expense_filter():
+    """Sidebar filter of the ETF universe by expense ratio"""
+    # Filter ETFs by Expense Ratio
+    st.subheader("🔍 Filter ETFs")
+    max_expense_ratio = st.slider(
+        "Maximum Expense Ratio (%)",
+        min_value=0.0,
+        max_value=1.0,
+        value=0.65,
+        step=0.01
+    )
+    filtered_etfs = get_etf_registry().between('Expense Ratio', hi=max_expense_ratio)
+    st.caption(f"{len(filtered_etfs)} ETFs at or below {max_expense_ratio:.2f}%: {', '.join(filtered_etfs) or 'none'}")
+
+
 # ====================== USER AUTHENTICATION ==========================
 # Main content
 if not st.session_state['authentication_status']:
@@ -429,16 +686,17 @@ else:
         st.session_state['username'] = None
         st.rerun()
 
-    # Create main tabs
-    tab1, tab2, tab3, tab4 = st.tabs([
-        "ETF Overview", 
-        "Holdings Analysis", 
-        "Performance Comparison",
-        "ISDU Deep Dive"
-    ])
+    # Check subscription for premium views
+    has_subscription = check_subscription(st.session_state['username'])
+
+    # Only the active view runs on a rerun (st.tabs would execute every tab body)
+    active_view = st.radio("View", VIEWS, horizontal=True, key="active_view", label_visibility="collapsed")
+    get_prefetcher().visit(st.session_state.get('previous_view'), active_view)
+    st.session_state['previous_view'] = active_view
+    view_started = time.perf_counter()
 
-    # Tab 1: ETF Overview - Always accessible
-    with tab1:
+    # View 1: ETF Overview - Always accessible
+    if active_view == "ETF Overview":
         st.header("Halal ETF Overview")
         
         # Summary Statistics
@@ -448,14 +706,14 @@ else:
         etf_data = get_etf_data()
         with col1:
             st.metric("Total ETFs", len(SELECTED_ETFS))
-            st.metric("Average Expense Ratio", f"{etf_data['Expense Ratio'].str.rstrip('%').astype(float).mean():.2f}%")
+            st.metric("Average Expense Ratio", f"{etf_data['Expense Ratio'].mean():.2f}%")
         with col2:
-            st.metric("Lowest Cost ETF", f"{etf_data['ETF'][etf_data['Expense Ratio'].str.rstrip('%').astype(float).idxmin()]}")
-            st.metric("Highest YTD Return", f"{etf_data['YTD Return'].max()}")
+            st.metric("Lowest Cost ETF", f"{etf_data.loc[etf_data['Expense Ratio'].idxmin(), 'ETF']}")
+            st.metric("Highest YTD Return", f"{etf_data['YTD Return'].max():.2f}%")
         with col3:
             total_aum = etf_data['AUM (M)'].sum()
             st.metric("Total AUM", f"${total_aum:,.2f}M")
-            st.metric("Average 1Y Return", f"{etf_data['1-Year Return'].str.rstrip('%').astype(float).mean():.2f}%")
+            st.metric("Average 1Y Return", f"{etf_data['1-Year Return'].mean():.2f}%")
 
         # Detailed ETF Comparison
         st.subheader("ETF Comparison")
@@ -477,8 +735,11 @@ else:
                     "Full Name": st.column_config.TextColumn("Full Name"),
                     "Focus": st.column_config.TextColumn("Investment Focus"),
                     "AUM (M)": st.column_config.NumberColumn("AUM (M USD)", format="$%.2f M"),
-                    "Expense Ratio": st.column_config.TextColumn("Expense Ratio"),
-                    "Shariah Advisory": st.column_config.TextColumn("Shariah Advisory")
+                    "Expense Ratio": st.column_config.NumberColumn("Expense Ratio", format="%.2f%%"),
+                    "Shariah Advisory": st.column_config.TextColumn("Shariah Advisory"),
+                    "YTD Return": st.column_config.NumberColumn("YTD Return", format="%.2f%%"),
+                    "1-Year Return": st.column_config.NumberColumn("1-Year Return", format="%.2f%%"),
+                    "3-Year Return": st.column_config.NumberColumn("3-Year Return", format="%.2f%%")
                 },
                 hide_index=True,
                 use_container_width=True
@@ -486,45 +747,7 @@ else:
 
             # Investment Approach section
             st.subheader("Investment Approach")
-            approach_data = pd.DataFrame({
-                'ETF': etf_data['ETF'],
-                'Investment Style': [
-                    'Large Cap Value',
-                    'Global Equity',
-                    'Global Islamic',
-                    'US All Cap',
-                    'US Islamic',
-                    'Global Islamic',
-                    'Global Islamic'
-                ],
-                'Screening Method': [
-                    'AAOIFI Standards',
-                    'AAOIFI Standards',
-                    'Custom Islamic',
-                    'FTSE Shariah',
-                    'MSCI Islamic',
-                    'MSCI Islamic',
-                    'Custom Islamic'
-                ],
-                'Rebalancing': [
-                    'Quarterly',
-                    'Quarterly',
-                    'Semi-Annual',
-                    'Quarterly',
-                    'Quarterly',
-                    'Quarterly',
-                    'Semi-Annual'
-                ],
-                'Key Features': [
-                    'Low cost, S&P 500 based',
-                    'Global diversification',
-                    'ESG integration',
-                    'US market focus',
-                    'MSCI methodology',
-                    'Global exposure',
-                    'ESG focused'
-                ]
-            })
+            approach_data = get_etf_registry().columns(APPROACH_COLUMNS)
 
             # Display the approach comparison table
             st.dataframe(
@@ -580,74 +803,67 @@ else:
             
             with col1:
                 # Expense Ratio Bar Chart
-                expense_ratios = [float(x.strip('%')) for x in etf_data['Expense Ratio']]
-                fig_expense = px.bar(
-                    etf_data,
-                    x='ETF',
-                    y=expense_ratios,
-                    title="Expense Ratios Comparison",
-                    labels={'y': 'Expense Ratio (%)'}
-                )
-                fig_expense.update_traces(
-                    texttemplate='%{y:.2f}%',
-                    textposition='outside',
-                    marker_color='#1f77b4'
-                )
+                fig_expense = cached_figure(etf_data, {
+                    'kind': 'bar',
+                    'x': 'ETF',
+                    'y': 'Expense Ratio',
+                    'title': "Expense Ratios Comparison",
+                    'labels': {'Expense Ratio': 'Expense Ratio (%)'},
+                    'traces': {
+                        'texttemplate': '%{y:.2f}%',
+                        'textposition': 'outside',
+                        'marker_color': '#1f77b4'
+                    }
+                })
                 st.plotly_chart(fig_expense, use_container_width=True)
             
             with col2:
                 # AUM Bar Chart
-                fig_aum = px.bar(
-                    etf_data,
-                    x='ETF',
-                    y='AUM (M)',
-                    title="Assets Under Management",
-                    labels={'y': 'AUM (Million USD)'}
-                )
-                fig_aum.update_traces(
-                    texttemplate='$%{y:.1f}M',
-                    textposition='outside',
-                    marker_color='#2ca02c'
-                )
+                fig_aum = cached_figure(etf_data, {
+                    'kind': 'bar',
+                    'x': 'ETF',
+                    'y': 'AUM (M)',
+                    'title': "Assets Under Management",
+                    'labels': {'y': 'AUM (Million USD)'},
+                    'traces': {
+                        'texttemplate': '$%{y:.1f}M',
+                        'textposition': 'outside',
+                        'marker_color': '#2ca02c'
+                    }
+                })
                 st.plotly_chart(fig_aum, use_container_width=True)
             
             # Returns Comparison
             st.subheader("Returns Comparison")
-            returns_data = pd.DataFrame({
-                'ETF': etf_data['ETF'],
-                'YTD Return': [float(x.strip('%')) for x in etf_data['YTD Return']],
-                '1-Year Return': [float(x.strip('%')) if x != 'N/A' else 0 for x in etf_data['1-Year Return']],
-                '3-Year Return': [float(x.strip('%')) if x != 'N/A' else 0 for x in etf_data['3-Year Return']]
+            fig_returns = cached_figure(etf_data, {
+                'kind': 'bar',
+                'x': 'ETF',
+                'y': ['YTD Return', '1-Year Return', '3-Year Return'],
+                'title': "Performance Comparison",
+                'barmode': 'group',
+                'traces': {'texttemplate': '%{y:.1f}%', 'textposition': 'outside'}
             })
-            
-            fig_returns = px.bar(
-                returns_data,
-                x='ETF',
-                y=['YTD Return', '1-Year Return', '3-Year Return'],
-                title="Performance Comparison",
-                barmode='group'
-            )
-            fig_returns.update_traces(texttemplate='%{y:.1f}%', textposition='outside')
             st.plotly_chart(fig_returns, use_container_width=True)
-            st.info("Note: Some ETFs may show 0% returns for certain periods if data is not available (N/A).")
+            st.info("Note: Periods without a bar have no return data for that ETF yet.")
 
         with compare_tab3:
             st.subheader("Risk Metrics")
             
-            # Risk metrics data
-            risk_metrics = pd.DataFrame({
-                'ETF': SELECTED_ETFS,
-                'Beta': ['1.0', '0.85', '0.95', '0.98', '1.02', '0.96', '0.92'],
-                'Volatility': ['12.5%', '8.5%', '11.5%', '12.0%', '13.2%', '12.8%', '11.8%']
-            })
+            # Risk metrics computed from 3 years of daily returns against the S&P 500
+            risk_metrics = get_risk_metrics()
+            st.caption("Computed from the last 3 years of daily returns, benchmarked against the S&P 500 (^GSPC).")
             
             # Display risk metrics table
             st.dataframe(
                 risk_metrics,
                 column_config={
                     "ETF": st.column_config.TextColumn("ETF Symbol"),
-                    "Beta": st.column_config.TextColumn("Beta", help="Measure of volatility compared to the market"),
-                    "Volatility": st.column_config.TextColumn("Volatility", help="Standard deviation of returns")
+                    "Beta": st.column_config.NumberColumn("Beta", help="Measure of volatility compared to the market", format="%.2f"),
+                    "Volatility (%)": st.column_config.NumberColumn("Volatility", help="Annualized standard deviation of returns", format="%.1f%%"),
+                    "Sharpe": st.column_config.NumberColumn("Sharpe", help="Annualized return per unit of volatility", format="%.2f"),
+                    "Sortino": st.column_config.NumberColumn("Sortino", help="Annualized return per unit of downside volatility", format="%.2f"),
+                    "Max Drawdown (%)": st.column_config.NumberColumn("Max Drawdown", help="Largest peak-to-trough decline", format="%.1f%%"),
+                    "Tracking Error (%)": st.column_config.NumberColumn("Tracking Error", help="Annualized volatility of returns relative to the S&P 500", format="%.1f%%")
                 },
                 hide_index=True,
                 use_container_width=True
@@ -657,24 +873,24 @@ else:
             col1, col2 = st.columns(2)
             
             with col1:
-                fig_beta = px.bar(
-                    risk_metrics,
-                    x='ETF',
-                    y=[float(x) for x in risk_metrics['Beta']],
-                    title="Beta Comparison"
-                )
-                fig_beta.add_hline(y=1, line_dash="dash", line_color="red")
-                fig_beta.update_traces(texttemplate='%{y:.2f}', textposition='outside')
+                fig_beta = cached_figure(risk_metrics, {
+                    'kind': 'bar',
+                    'x': 'ETF',
+                    'y': 'Beta',
+                    'title': "Beta Comparison",
+                    'hline': {'y': 1, 'line_dash': "dash", 'line_color': "red"},
+                    'traces': {'texttemplate': '%{y:.2f}', 'textposition': 'outside'}
+                })
                 st.plotly_chart(fig_beta, use_container_width=True)
             
             with col2:
-                fig_vol = px.bar(
-                    risk_metrics,
-                    x='ETF',
-                    y=[float(x.strip('%')) for x in risk_metrics['Volatility']],
-                    title="Volatility Comparison"
-                )
-                fig_vol.update_traces(texttemplate='%{y:.1f}%', textposition='outside')
+                fig_vol = cached_figure(risk_metrics, {
+                    'kind': 'bar',
+                    'x': 'ETF',
+                    'y': 'Volatility (%)',
+                    'title': "Volatility Comparison",
+                    'traces': {'texttemplate': '%{y:.1f}%', 'textposition': 'outside'}
+                })
                 st.plotly_chart(fig_vol, use_container_width=True)
             
             # Add explanation of metrics
@@ -690,6 +906,16 @@ else:
             - Measures the degree of variation in returns
             - Higher volatility indicates greater risk and potential return
             - Lower volatility suggests more stable returns
+            
+            **Sharpe and Sortino Ratios**
+            - Annualized return earned per unit of risk
+            - Sortino only counts downside volatility as risk
+            
+            **Max Drawdown**
+            - The largest fall from a previous peak over the period
+            
+            **Tracking Error**
+            - How much the ETF's returns deviate from the S&P 500
             """)
 
         # Add Newsletter Signup
@@ -733,11 +959,8 @@ else:
                 else:
                     st.warning("Please fill in both name and email.")
 
-    # Check subscription for premium tabs
-    has_subscription = check_subscription(st.session_state['username'])
-    
-    # Tab 2: Holdings Analysis - Premium feature
-    with tab2:
+    # View 2: Holdings Analysis - Premium feature
+    if active_view == "Holdings Analysis":
         if not has_subscription:
             st.warning("⭐ This feature requires a premium subscription")
             
@@ -782,42 +1005,10 @@ else:
             - 🔍 Deep Dive Analysis
             """)
         else:
-            # Show existing Holdings Analysis content
-            st.header("Holdings Analysis")
-            
-            # Filter ETFs
-            filtered_etfs = [etf for etf in SELECTED_ETFS if ETF_EXPENSE_RATIOS[etf] <= 0.65]
-            
-            # ETF selector with filtered ETFs
-            selected_etf = st.selectbox(
-                "Select ETF to analyze",
-                filtered_etfs
-            )
-            
-            # Add period selector
-            period = st.selectbox(
-                "Select Time Period",
-                ["1D", "5D", "1M", "6M", "YTD", "1Y", "5Y", "All"],
-                index=5
-            )
-            
-            # Show price chart
-            plot_price_chart(selected_etf, period, key=f"holdings_{selected_etf}")
-            
-            # Show holdings
-            st.subheader(f"{selected_etf} Holdings")
-            holdings_df = get_manual_holdings(selected_etf)
-            st.dataframe(holdings_df)
-            
-            # Show sector weights with pie chart
-            st.subheader("Sector Weightings")
-            sectors_df = get_sector_weightings(selected_etf)
-            fig = px.pie(sectors_df, values='Weight', names='Sector',
-                        title=f'{selected_etf} Sector Distribution')
-            st.plotly_chart(fig)
-
-    # Tab 3: Performance Comparison - Premium feature
-    with tab3:
+            holdings_analysis()
+
+    # View 3: Performance Comparison - Premium feature
+    if active_view == "Performance Comparison":
         if not has_subscription:
             st.warning("⭐ This feature requires a premium subscription")
             
@@ -862,24 +1053,10 @@ else:
             - 🔍 Deep Dive Analysis
             """)
         else:
-            # Show existing Performance Comparison content
-            st.header("Performance Comparison")
-            
-            selected_etfs_compare = st.multiselect(
-                "Compare ETFs",
-                SELECTED_ETFS,
-                default=SELECTED_ETFS[:2]
-            )
-            
-            if selected_etfs_compare:
-                st.subheader("Historical Performance")
-                for i, etf in enumerate(selected_etfs_compare):
-                    plot_price_chart(etf, "1Y", key=f"compare_{etf}_{i}")
-            else:
-                st.warning("Select at least 2 ETFs for comparison")
+            performance_comparison()
 
-    # Tab 4: ISDU Deep Dive - Premium feature
-    with tab4:
+    # View 4: ISDU Deep Dive - Premium feature
+    if active_view == "ISDU Deep Dive":
         if not has_subscription:
             st.warning("This is a premium feature.")
             
@@ -943,26 +1120,28 @@ else:
             with col1:
                 if st.button("🔄 Refresh Data", key="refresh_isdu"):
                     with st.spinner("Refreshing data..."):
-                        st.cache_data.clear()
-                        get_isdu_holdings.clear()
-                        get_isdu_sectors.clear()
-                        get_isdu_countries.clear()
-                        get_isdu_returns.clear()
-                        get_current_price.clear()
-                        get_etf_summary.clear()
-                        calculate_returns.clear()
-                        get_etf_data.clear()
-                        st.success("Cache cleared! Data refreshed.")
+                        # Only datasets whose workbook changed get a new version (and new cache entries)
+                        changed = get_workbook_watcher().poll(force=True)
+                        if 'reference' in changed:
+                            get_etf_registry.clear()
+                        # Quotes and histories keep serving while they revalidate
+                        get_price_store().expire()
+                        get_data_cache().invalidate()
+                        st.success(f"Data refreshed. Updated: {', '.join(changed) if changed else 'no workbook changes'}")
                         st.rerun()
             
             # Add an image at the top
             st.image("logo.png", width=200)
+
+            # Fetch everything the page needs concurrently before rendering
+            isdu_results = load_isdu_page()
+            isdu_quote = loaded(isdu_results, 'quotes', {}).get("ISDU.L")
             
             # Center the title
             st.markdown("<h1 style='text-align: center;'>iShares MSCI USA Islamic UCITS ETF (ISDU.L) ETF Analysis</h1>", unsafe_allow_html=True)
 
             # ETF Description and Summary
-            etf_summary = get_etf_summary("ISDU.L")
+            etf_summary = isdu_quote
             if etf_summary:
                 st.markdown("## ISDU.L Summary")
                 
@@ -988,26 +1167,28 @@ else:
                 # Summary table in right column
                 with col2:
                     st.subheader("ETF Summary from Yahoo Finance")
+                    q = etf_summary
+                    # Metric -> (quote fields it needs, formatted value)
                     summary_items = {
-                        "Name": etf_summary.get('longName', 'N/A'),
-                        "Previous Close": f"${etf_summary.get('regularMarketPreviousClose', 'N/A'):.2f}",
-                        "Open": f"${etf_summary.get('regularMarketOpen', 'N/A'):.2f}",
-                        "Bid": f"${etf_summary.get('bid', 'N/A'):.2f}",
-                        "Ask": f"${etf_summary.get('ask', 'N/A'):.2f}",
-                        "Day's Range": f"${etf_summary.get('dayLow', 'N/A'):.2f} - ${etf_summary.get('dayHigh', 'N/A'):.2f}",
-                        "52 Week Range": f"${etf_summary.get('fiftyTwoWeekLow', 'N/A'):.2f} - ${etf_summary.get('fiftyTwoWeekHigh', 'N/A'):.2f}",
-                        "Volume": f"{etf_summary.get('volume', 'N/A'):,}",
-                        "Avg. Volume": f"{etf_summary.get('averageVolume', 'N/A'):,}",
-                        "Net Assets": f"${etf_summary.get('totalAssets', 'N/A'):,.0f}",
-                        "NAV": f"${etf_summary.get('navPrice', 'N/A'):.4f}",
-                        "PE Ratio (TTM)": f"{etf_summary.get('trailingPE', 'N/A'):.2f}",
-                        "Yield": f"{float(etf_summary.get('yield', 0)) * 100:.2f}%",
-                        "YTD Daily Total Return": f"{etf_summary.get('ytdReturn', 'N/A'):.2f}%"
+                        "Previous Close": (['previous_close'], lambda: f"${q.previous_close:.2f}"),
+                        "Open": (['open'], lambda: f"${q.open:.2f}"),
+                        "Bid": (['bid'], lambda: f"${q.bid:.2f}"),
+                        "Ask": (['ask'], lambda: f"${q.ask:.2f}"),
+                        "Day's Range": (['day_low', 'day_high'], lambda: f"${q.day_low:.2f} - ${q.day_high:.2f}"),
+                        "52 Week Range": (['year_low', 'year_high'], lambda: f"${q.year_low:.2f} - ${q.year_high:.2f}"),
+                        "Volume": (['volume'], lambda: f"{q.volume:,.0f}"),
+                        "Avg. Volume": (['average_volume'], lambda: f"{q.average_volume:,.0f}"),
+                        "Net Assets": (['net_assets'], lambda: f"${q.net_assets:,.0f}"),
+                        "NAV": (['nav'], lambda: f"${q.nav:.4f}"),
+                        "PE Ratio (TTM)": (['pe_ratio'], lambda: f"{q.pe_ratio:.2f}"),
+                        "Yield": (['dividend_yield'], lambda: f"{q.dividend_yield * 100:.2f}%"),
+                        "YTD Daily Total Return": (['ytd_return'], lambda: f"{q.ytd_return:.2f}%")
                     }
                     
-                    # Create and display the summary table
+                    # Create and display the summary table, skipping fields Yahoo didn't provide
                     summary_df = pd.DataFrame(
-                        [(k, v) for k, v in summary_items.items() if 'N/A' not in str(v)],
+                        [("Name", q.name)] +
+                        [(k, value()) for k, (attrs, value) in summary_items.items() if all(map(q.has, attrs))],
                         columns=['Metric', 'Value']
                     )
                     st.dataframe(
@@ -1024,50 +1205,23 @@ else:
 
             # Historical Price Data
             st.subheader("Historical Price Data")
-            current_price = get_current_price("ISDU.L")
+            current_price = isdu_quote.price if isdu_quote and isdu_quote.has('price') else None
             if current_price is not None:
                 st.write(f"**Current Price:** ${current_price:.2f}")
             else:
                 st.warning("Unable to fetch current price from Yahoo Finance")
             
-            # Add period selector buttons
-            col1, col2, col3, col4, col5 = st.columns(5)
-            with col1:
-                if st.button("1 Month", key="1m_isdu"):
-                    st.session_state['history_period'] = "1mo"
-            with col2:
-                if st.button("3 Months", key="3m_isdu"):
-                    st.session_state['history_period'] = "3mo"
-            with col3:
-                if st.button("6 Months", key="6m_isdu"):
-                    st.session_state['history_period'] = "6mo"
-            with col4:
-                if st.button("1 Year", key="1y_isdu"):
-                    st.session_state['history_period'] = "1y"
-            with col5:
-                if st.button("All", key="all_isdu"):
-                    st.session_state['history_period'] = "max"
-            
-            # Show price chart
-            plot_price_chart("ISDU.L", st.session_state['history_period'], key="isdu_main_chart")
+            # Period buttons and chart rerun on their own
+            isdu_price_history()
             
             # Holdings Analysis
             st.subheader("ISDE Holdings")
-            holdings_df = get_isdu_holdings()
+            holdings_df = loaded(isdu_results, 'holdings', pd.DataFrame())
             
             if not holdings_df.empty:
                 col1, col2 = st.columns(2)
                 with col1:
-                    st.write("Top 10 Holdings")
-                    st.dataframe(holdings_df.head(10))
-                    
-                    # Show/Hide full holdings
-                    if st.button("Toggle Full Holdings"):
-                        st.session_state['show_full_holdings'] = not st.session_state.get('show_full_holdings', False)
-                    
-                    if st.session_state.get('show_full_holdings', False):
-                        st.write("Complete Holdings List")
-                        st.dataframe(holdings_df)
+                    isdu_top_holdings(holdings_df)
                 
                 with col2:
                     fig = px.pie(
@@ -1085,7 +1239,7 @@ else:
             col1, col2 = st.columns(2)
             
             with col1:
-                sectors_df = get_isdu_sectors()
+                sectors_df = loaded(isdu_results, 'sectors', pd.DataFrame())
                 if not sectors_df.empty:
                     # Group by sector and sum the weightings
                     grouped_sectors = sectors_df.groupby('Sector')['Weightings'].sum().reset_index()
@@ -1130,12 +1284,12 @@ else:
                     st.warning("No sector data available")
             
             with col2:
-                countries_df = get_isdu_countries()
+                countries_df = loaded(isdu_results, 'countries', pd.DataFrame())
                 if not countries_df.empty:
                     fig = px.pie(
                         countries_df,
                         values='Weightings',
-                        names='Country ',  # Note the space after Country
+                        names='Country',
                         title="Country Distribution"
                     )
                     st.plotly_chart(fig, use_container_width=True)
@@ -1146,52 +1300,34 @@ else:
             st.subheader("Return Analysis")
 
             # Get historical data for both ETFs
-            etf_history = yf.download("ISDU.L", period="5y")
-            sp500_history = yf.download("^GSPC", period="5y")
+            return_prices = loaded(isdu_results, 'return_prices', pd.DataFrame(columns=["ISDU.L", "^GSPC"]))
 
-            if not etf_history.empty and not sp500_history.empty:
-                # Define periods for return calculation
+            if not return_prices["ISDU.L"].dropna().empty and not return_prices["^GSPC"].dropna().empty:
+                # Calendar-accurate trailing returns for both tickers in one pass
                 periods = {
-                    "1 Year": {"years": 1},
-                    "3 Years": {"years": 3},
-                    "5 Years": {"years": 5}
+                    "1 Year": HORIZONS['1Y'],
+                    "3 Years": HORIZONS['3Y'],
+                    "5 Years": HORIZONS['5Y']
                 }
+                trailing = compute_trailing(return_prices[["ISDU.L", "^GSPC"]], periods)
+                numeric_returns = trailing.returns.T
                 
-                # Create a clean DataFrame for display
-                clean_data = []
-                for period_name, period_info in periods.items():
-                    years = period_info['years']
-                    # Calculate lookback days
-                    lookback_days = years * 252
-                    
-                    # Get ISDU.L prices
-                    isdu_current = float(etf_history['Close'].iloc[-1])  # Convert to float
-                    if len(etf_history) >= lookback_days:
-                        isdu_start = float(etf_history['Close'].iloc[-lookback_days])  # Convert to float
-                    else:
-                        isdu_start = float(etf_history['Close'].iloc[0])  # Convert to float
-                    isdu_return = ((isdu_current - isdu_start) / isdu_start) * 100
-                    
-                    # Get S&P 500 prices
-                    sp_current = float(sp500_history['Close'].iloc[-1])  # Convert to float
-                    if len(sp500_history) >= lookback_days:
-                        sp_start = float(sp500_history['Close'].iloc[-lookback_days])  # Convert to float
-                    else:
-                        sp_start = float(sp500_history['Close'].iloc[0])  # Convert to float
-                    sp_return = ((sp_current - sp_start) / sp_start) * 100
-                    
-                    clean_data.append({
-                        'Period': period_name,
-                        'ISDU.L Start Price': f'${isdu_start:.2f}',
-                        'ISDU.L Current Price': f'${isdu_current:.2f}',
-                        'ISDU.L Return (%)': f'{isdu_return:.2f}%',
-                        'S&P 500 Start Price': f'${sp_start:.2f}',
-                        'S&P 500 Current Price': f'${sp_current:.2f}',
-                        'S&P 500 Return (%)': f'{sp_return:.2f}%'
-                    })
-                
-                # Create DataFrame
-                returns_df = pd.DataFrame(clean_data)
+                # Format only for display
+                def price_text(value):
+                    return f'${value:.2f}' if pd.notna(value) else 'N/A'
+
+                def return_text(value):
+                    return f'{value:.2f}%' if pd.notna(value) else 'N/A'
+
+                returns_df = pd.DataFrame({
+                    'Period': list(periods),
+                    'ISDU.L Start Price': trailing.start_prices.loc["ISDU.L"].map(price_text).values,
+                    'ISDU.L Current Price': price_text(trailing.end_prices["ISDU.L"]),
+                    'ISDU.L Return (%)': numeric_returns["ISDU.L"].map(return_text).values,
+                    'S&P 500 Start Price': trailing.start_prices.loc["^GSPC"].map(price_text).values,
+                    'S&P 500 Current Price': price_text(trailing.end_prices["^GSPC"]),
+                    'S&P 500 Return (%)': numeric_returns["^GSPC"].map(return_text).values
+                })
                 
                 # Display the table
                 st.write("Returns Data:")
@@ -1211,9 +1347,9 @@ else:
                 
                 # Plot the bar chart comparing returns
                 plot_data = pd.DataFrame({
-                    'Period': returns_df['Period'],
-                    'ISDU.L Return (%)': [float(x.strip('%')) for x in returns_df['ISDU.L Return (%)']],
-                    'S&P 500 Return (%)': [float(x.strip('%')) for x in returns_df['S&P 500 Return (%)']]
+                    'Period': list(periods),
+                    'ISDU.L Return (%)': numeric_returns["ISDU.L"].values,
+                    'S&P 500 Return (%)': numeric_returns["^GSPC"].values
                 })
                 
                 fig = px.bar(
@@ -1242,14 +1378,25 @@ else:
             st.markdown("## Overall Thoughts on iShares MSCI USA Islamic UCITS ETF (ISDU.L)")
 
             if etf_summary:
-                expense_ratio = float(etf_summary.get('annualReportExpenseRatio', 0)) * 100
-                nav = etf_summary.get('navPrice', 'N/A')
-                ytd_return = etf_summary.get('ytdReturn', 'N/A')
+                # Yahoo's ratio is a fraction; the registry's figure (already in %) covers a missing one
+                if etf_summary.has('expense_ratio'):
+                    expense_ratio = etf_summary.expense_ratio * 100
+                else:
+                    expense_ratio = get_etf_registry().value('ISDU', 'Expense Ratio')
+                snapshot = []
+                if etf_summary.has('nav'):
+                    snapshot.append(f"a net asset value (NAV) of ${etf_summary.nav:.2f}")
+                if etf_summary.has('ytd_return'):
+                    snapshot.append(f"a year-to-date (YTD) return of {etf_summary.ytd_return:.2f}%")
+                performance = (
+                    f"- **Performance Snapshot**: As of {datetime.now().strftime('%B %d, %Y')}, ISDU.L has {' and '.join(snapshot)}."
+                    if snapshot else ""
+                )
                 
                 st.markdown(f"""
                 - **Competitive Expense Ratio**: ISDU.L offers a total expense ratio (TER) of {expense_ratio:.2f}%, which is relatively low compared to other Shariah-compliant ETFs.
                 - **U.S. Market Exposure**: The fund provides Shariah-compliant exposure to U.S. equities, focusing on companies that adhere to Islamic investment principles.
-                - **Performance Snapshot**: As of {datetime.now().strftime('%B %d, %Y')}, ISDU.L has a net asset value (NAV) of ${nav:.2f}, reflecting a year-to-date (YTD) return of {ytd_return:.2f}%.
+                {performance}
                 """)
             else:
                 st.warning("Unable to fetch current ETF metrics from Yahoo Finance")
@@ -1286,6 +1433,14 @@ else:
 
     # Add back to top button and footer
     st.markdown("---")
+    get_timings().record(f"view:{active_view}", time.perf_counter() - view_started)
+    # Warm the caches of the view this user is likely to open next
+    get_prefetcher().hint(
+        active_view,
+        allowed=VIEWS if has_subscription else ["ETF Overview"],
+        wrap=in_script_context
+    )
+
     add_back_to_top_button()
     
     # Footer
@@ -1299,36 +1454,29 @@ else:
     with st.sidebar:
         st.header("⚙️ Tool Settings")
         
-        # Filter ETFs by Expense Ratio
-        st.subheader("🔍 Filter ETFs")
-        max_expense_ratio = st.slider(
-            "Maximum Expense Ratio (%)",
-            min_value=0.0,
-            max_value=1.0,
-            value=0.65,
-            step=0.01
-        )
-        filtered_etfs = [etf for etf in SELECTED_ETFS 
-                        if ETF_EXPENSE_RATIOS[etf] <= max_expense_ratio]
+        expense_filter()
         
         # Risk Assessment Tool
         st.subheader("📉 Risk Assessment")
         risk_tolerance = st.selectbox(
             "What is your risk tolerance?",
-            options=["Low", "Medium", "High"],
+            options=RISK_LEVELS,
             index=1
         )
         st.write(f"**Recommended ETFs for {risk_tolerance} Risk Tolerance:**")
-        recommendations = {
-            "Low": ["SPUS: Sharia-compliant US equities (Low volatility)", 
-                   "HLAL: Global diversified portfolio"],
-            "Medium": ["SPTE: Tech sector focus", 
-                      "ISDE.L: Emerging markets exposure"],
-            "High": ["SPWO: Space industry growth stocks", 
-                    "WSHR.NE: Blockchain/crypto sector"]
-        }
-        for rec in recommendations[risk_tolerance]:
-            st.write(f"- {rec}")
+        registry = get_etf_registry()
+        for etf in registry.by_risk(risk_tolerance):
+            st.write(f"- {etf}: {registry.value(etf, 'Full Name')} ({registry.value(etf, 'Focus')})")
+
+        if st.session_state['username'] in ADMIN_USERS:
+            with st.expander("📦 Cache Statistics"):
+                st.json(get_data_cache().stats())
+                st.json(get_workbook_watcher().stats())
+                st.json(get_shared_store().stats())
+                st.json(get_timings().stats())
+                st.json(get_figure_cache().stats())
+                st.json(get_call_counter().stats())
+                st.json(get_prefetcher().stats())
 
     def claim_subscription():
         st.subheader("Claim Your Subscription")
@@ -1374,24 +1522,4 @@ else:
                 cur.close()
                 conn.close()
 
-# Add this route after your other routes
-@app.route('/webhook', methods=['POST'])
-def webhook():
-    event = None
-    payload = request.data
-    sig_header = request.headers.get('Stripe-Signature')
-
-    try:
-        event = stripe.Webhook.construct_event(
-            payload, sig_header, os.getenv('STRIPE_WEBHOOK_SECRET')
-        )
-    except ValueError as e:
-        # Invalid payload
-        return 'Invalid payload', 400
-    except stripe.error.SignatureVerificationError as e:
-        # Invalid signature
-        return 'Invalid signature', 400
-
-    # Handle the event
-    handle_webhook_event(event)
-    return 'Success', 200
+get_call_counter().stop()
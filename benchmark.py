@@ -0,0 +1,778 @@
+"""Offline performance benchmarks for the dashboard's data layer.
+
+Run `python benchmark.py <name>`; every benchmark uses synthetic data or the
+workbooks in this repo, so no network access is needed.
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from market_data import MarketDataProvider, normalize_history
+from price_store import PriceStore
+
+
+class StubProvider(MarketDataProvider):
+    """Synthetic daily bars served after a fixed simulated network delay"""
+
+    def __init__(self, latency=0.25, years=20, seed=0):
+        self.latency = latency
+        self.calls = 0
+        dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=years * 252)
+        rng = np.random.default_rng(seed)
+        close = 50 * np.exp(np.cumsum(rng.normal(0.0003, 0.01, len(dates))))
+        self.bars = normalize_history(pd.DataFrame({
+            'Open': close, 'High': close * 1.01, 'Low': close * 0.99,
+            'Close': close, 'Volume': rng.integers(1e4, 1e6, len(dates)),
+        }, index=dates))
+
+    def history(self, ticker, start=None):
+        self.calls += 1
+        time.sleep(self.latency)
+        return self.bars if start is None else self.bars[self.bars.index >= start]
+
+    def download(self, tickers, start=None):
+        # One round trip; the payload grows a little with every ticker
+        self.calls += 1
+        time.sleep(self.latency + 0.01 * len(tickers))
+        bars = self.bars if start is None else self.bars[self.bars.index >= start]
+        return {ticker: bars for ticker in tickers}
+
+
+def _timed(fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def bench_price_store(args):
+    """Cold (empty store) vs warm (gap-filled store) chart render latency"""
+    root = tempfile.mkdtemp(prefix='price_store_')
+    try:
+        provider = StubProvider(latency=args.latency)
+
+        def render(store, ticker):
+            data = store.history(ticker, period="1y")
+            return px.line(data, x=data.index, y='Close', title=f"{ticker} Price History")
+
+        cold_store = PriceStore(root=root, provider=provider, refresh_interval=0)
+        _, cold = _timed(render, cold_store, 'SPUS')
+        # A new process: disk is populated, so only the gap since the last bar is fetched
+        restart_store = PriceStore(root=root, provider=provider, refresh_interval=0)
+        _, restart = _timed(render, restart_store, 'SPUS')
+        warm_store = PriceStore(root=root, provider=provider, refresh_interval=900)
+        warm_store._checked['SPUS'] = time.time()
+        warm = [_timed(render, warm_store, 'SPUS')[1] for _ in range(args.repeat)]
+
+        print(f"Simulated provider latency: {args.latency * 1000:.0f} ms")
+        print(f"Cold render (full backfill):      {cold:8.1f} ms")
+        print(f"Restart render (gap-fill only):   {restart:8.1f} ms")
+        print(f"Warm render (local data only):    {np.median(warm):8.1f} ms (median of {args.repeat})")
+        print(f"Provider calls: {provider.calls}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def bench_batched_history(args):
+    """Per-ticker vs batched history fetch as the number of compared ETFs grows"""
+    tickers = ['SPUS', 'SPWO', 'UMMA', 'HLAL', 'ISDU.L', 'ISDE.L', 'WSHR.NE']
+    print(f"Simulated provider latency: {args.latency * 1000:.0f} ms")
+    print(f"{'ETFs':>4} {'per-ticker ms':>14} {'batched ms':>11} {'calls':>6}")
+    for n in range(1, len(tickers) + 1):
+        selected = tickers[:n]
+        root = tempfile.mkdtemp(prefix='price_store_')
+        try:
+            provider = StubProvider(latency=args.latency)
+            store = PriceStore(root=root, provider=provider, refresh_interval=0)
+            _, loop = _timed(lambda: [store.history(t, period="1y") for t in selected])
+            provider.calls = 0
+            shutil.rmtree(root)
+            store = PriceStore(root=root, provider=provider, refresh_interval=0)
+            _, batched = _timed(store.history_many, selected, period="1y")
+            print(f"{n:>4} {loop:>14.1f} {batched:>11.1f} {provider.calls:>6}")
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+def bench_replay(args):
+    """Concurrent sessions against a replayed latency/error profile"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from market_data import FixtureProvider, ReplayProvider
+
+    if args.fixtures:
+        inner = FixtureProvider(args.fixtures)
+        profile_path = args.profile or os.path.join(args.fixtures, 'profile.json')
+        with open(profile_path) as f:
+            profile = json.load(f)
+    else:
+        inner = StubProvider(latency=0)
+        # Long-tailed latency with occasional failures, roughly what Yahoo looks like
+        rng = np.random.default_rng(1)
+        profile = {
+            'history': {'latency_ms': list(rng.lognormal(5.5, 0.5, 200)), 'error_rate': 0.03},
+            'download': {'latency_ms': list(rng.lognormal(6.0, 0.5, 200)), 'error_rate': 0.03},
+            'info': {'latency_ms': list(rng.lognormal(6.2, 0.6, 200)), 'error_rate': 0.05},
+        }
+    provider = ReplayProvider(inner, profile, seed=0)
+    tickers = ['SPUS', 'HLAL', 'ISDU.L']
+
+    def session(i):
+        started = time.perf_counter()
+        try:
+            provider.history(tickers[i % len(tickers)])
+            ok = True
+        except Exception:
+            ok = False
+        return (time.perf_counter() - started) * 1000, ok
+
+    with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+        results = list(pool.map(session, range(args.sessions * args.repeat)))
+    latencies = np.array([latency for latency, _ in results])
+    errors = sum(1 for _, ok in results if not ok)
+    print(f"{len(results)} history calls across {args.sessions} concurrent sessions")
+    print(f"p50 {np.percentile(latencies, 50):.1f} ms, p95 {np.percentile(latencies, 95):.1f} ms, "
+          f"p99 {np.percentile(latencies, 99):.1f} ms, errors {errors}")
+
+
+def bench_quotes(args):
+    """Per-ticker Ticker.info dicts vs one batched compact quote snapshot"""
+    import tracemalloc
+
+    from quotes import PROFILE_FIELDS, QUOTE_FIELDS, QuoteService
+
+    tickers = ['SPUS', 'SPWO', 'UMMA', 'HLAL', 'ISDU.L', 'ISDE.L', 'WSHR.NE']
+    profile_keys = {QUOTE_FIELDS[attr] for attr in PROFILE_FIELDS}
+
+    class InfoStub(MarketDataProvider):
+        info_calls = 0
+
+        # Ticker.info returns ~150 keys, most of them unused by the dashboard
+        def info(self, ticker):
+            self.info_calls += 1
+            time.sleep(args.latency)
+            info = {f"field{i}": f"value {i} for {ticker}" for i in range(130)}
+            info.update({key: 1.0 + i for i, key in enumerate(QUOTE_FIELDS.values())})
+            info['longName'] = f"{ticker} Long Name"
+            return info
+
+        # Like the v7 endpoint: fund profile fields are never returned
+        def quotes(self, tickers, fields):
+            time.sleep(args.latency)
+            return {
+                ticker: {field: None if field in profile_keys else 1.0 for field in fields}
+                for ticker in tickers
+            }
+
+        # Like YFinanceProvider: profile fields come from one Ticker.info per ticker
+        def profiles(self, tickers, fields):
+            infos = {ticker: self.info(ticker) for ticker in tickers}
+            return {ticker: {field: info.get(field) for field in fields} for ticker, info in infos.items()}
+
+    provider = InfoStub()
+    tracemalloc.start()
+    infos, info_ms = _timed(lambda: {ticker: provider.info(ticker) for ticker in tickers})
+    info_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del infos
+
+    service = QuoteService(provider, tickers)
+    provider.info_calls = 0
+    tracemalloc.start()
+    snapshot, first_ms = _timed(service.fetch)
+    quote_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    first_calls = provider.info_calls
+    _, refresh_ms = _timed(service.fetch)
+    assert all(quote.has('nav') and quote.has('expense_ratio') for quote in snapshot.values())
+
+    print(f"Simulated provider latency: {args.latency * 1000:.0f} ms, {len(tickers)} ETFs")
+    print(f"Ticker.info per ETF:        {info_ms:8.1f} ms, {info_bytes / 1024:8.1f} KiB retained")
+    print(f"First quote snapshot:       {first_ms:8.1f} ms, {quote_bytes / 1024:8.1f} KiB retained, "
+          f"{first_calls} profile lookups")
+    print(f"Refresh (profiles cached):  {refresh_ms:8.1f} ms, {provider.info_calls - first_calls} profile lookups")
+
+
+def bench_loader(args):
+    """ISDU Deep Dive dependencies: sequential vs concurrent loading"""
+    from loader import ConcurrentLoader, Task
+
+    latencies = {
+        'summary': 0.40, 'price': 0.05, 'price_history': 0.60, 'holdings': 0.35,
+        'sectors': 0.35, 'countries': 0.35, 'isdu_download': 0.50, 'sp500_download': 0.50,
+    }
+    tasks = [Task(name, time.sleep, (latency,)) for name, latency in latencies.items()]
+
+    _, sequential = _timed(lambda: [time.sleep(latency) for latency in latencies.values()])
+    results, concurrent = _timed(ConcurrentLoader(max_workers=8).load, tasks)
+    assert all(result.ok for result in results.values())
+    print(f"Slowest dependency: {max(latencies.values()) * 1000:8.1f} ms")
+    print(f"Sequential page:    {sequential:8.1f} ms")
+    print(f"Concurrent page:    {concurrent:8.1f} ms")
+
+
+def bench_returns(args):
+    """Vectorized trailing returns vs the old per-ticker, per-period loop"""
+    from returns import compute_trailing
+
+    dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=20 * 252)
+    rng = np.random.default_rng(0)
+    prices = pd.DataFrame(
+        50 * np.exp(np.cumsum(rng.normal(0.0003, 0.01, (len(dates), args.tickers)), axis=0)),
+        index=dates, columns=[f"T{i:04d}" for i in range(args.tickers)]
+    )
+    # Stagger inception dates so some horizons are longer than the history
+    for i, column in enumerate(prices.columns):
+        prices.iloc[:(i * 37) % (15 * 252), i] = np.nan
+
+    def loop():
+        # The approach calculate_returns and the ISDU table used, per ticker
+        rows = {}
+        for ticker in prices.columns:
+            history = prices[ticker].dropna()
+            row = {}
+            for name, years in [('1Y', 1), ('3Y', 3), ('5Y', 5)]:
+                lookback_days = years * 252
+                current = float(history.iloc[-1])
+                start = float(history.iloc[-lookback_days] if len(history) >= lookback_days else history.iloc[0])
+                row[name] = f"{((current - start) / start) * 100:.2f}%"
+            rows[ticker] = row
+        return rows
+
+    _, loop_ms = _timed(loop)
+    result, vectorized_ms = _timed(compute_trailing, prices)
+    print(f"{args.tickers} tickers x {len(dates)} daily bars")
+    print(f"Per-ticker loop (3 horizons):        {loop_ms:8.1f} ms")
+    print(f"Vectorized ({len(result.returns.columns)} horizons, calendar): {vectorized_ms:8.1f} ms")
+
+
+def bench_rolling(args):
+    """Incremental rolling vol/beta/corr vs full pandas recomputation, with an exactness check"""
+    from rolling import RollingAnalytics, pandas_rolling
+
+    dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=20 * 252)
+    rng = np.random.default_rng(0)
+    benchmark = pd.Series(rng.normal(0.0003, 0.01, len(dates)), index=dates)
+    returns = pd.Series(0.9 * benchmark.to_numpy() + rng.normal(0, 0.006, len(dates)), index=dates)
+    returns.iloc[1000:1005] = np.nan
+    benchmark.iloc[2500] = np.nan
+
+    analytics = RollingAnalytics()
+    _, initial = _timed(analytics.update, 'X', returns.iloc[:-args.repeat], benchmark.iloc[:-args.repeat])
+    per_bar = []
+    for end in range(len(dates) - args.repeat + 1, len(dates) + 1):
+        _, elapsed = _timed(analytics.update, 'X', returns.iloc[:end], benchmark.iloc[:end])
+        per_bar.append(elapsed)
+    incremental = analytics.update('X', returns, benchmark)
+    reference, full = _timed(pandas_rolling, returns, benchmark)
+
+    reference = reference[incremental.columns]
+    same_nans = (incremental.isna() == reference.isna()).all().all()
+    max_error = (incremental - reference).abs().max().max()
+    assert same_nans and max_error < 1e-9, "incremental rolling diverged from pandas"
+    print(f"{len(dates)} bars, windows {analytics.windows}")
+    print(f"Initial incremental build:      {initial:8.1f} ms")
+    print(f"Incremental update per new bar: {np.median(per_bar):8.2f} ms (median of {args.repeat})")
+    print(f"Full pandas recomputation:      {full:8.1f} ms")
+    print(f"Matches pandas: identical NaN pattern={same_nans}, max abs difference={max_error:.2e}")
+
+
+def bench_snapshot(args):
+    """Parsing the Details workbooks vs loading their Parquet snapshots"""
+    from snapshots import SnapshotCache
+
+    root = tempfile.mkdtemp(prefix='snapshots_')
+    try:
+        cache = SnapshotCache(root)
+        workbooks = sorted(name for name in os.listdir('.') if name.endswith('Details.xlsx'))
+        for workbook in workbooks:
+            _, parse_ms = _timed(pd.read_excel, workbook, sheet_name=None)
+            _, compile_ms = _timed(cache.compile, workbook)
+            _, load_ms = _timed(cache.load, workbook)
+            print(f"{workbook:28s} parse {parse_ms:7.1f} ms   compile {compile_ms:7.1f} ms   snapshot {load_ms:6.1f} ms")
+    finally:
+        shutil.rmtree(root)
+
+
+def bench_workbook(args):
+    """Per-sheet read_excel (the old read_excel_data) vs the single-open WorkbookReader"""
+    from workbook import WorkbookReader
+
+    def read_excel_data(file_path):
+        excel_data = pd.ExcelFile(file_path)
+        return {sheet: pd.read_excel(file_path, sheet_name=sheet) for sheet in excel_data.sheet_names}
+
+    def reader_all(file_path):
+        with WorkbookReader(file_path) as reader:
+            return reader.sheets()
+
+    def reader_one(file_path, sheet, columns):
+        with WorkbookReader(file_path) as reader:
+            return reader.sheet(sheet, columns)
+
+    for workbook, sheet in [('7- ISDU Details.xlsx', 'ISDE Holdings'), ('1- SPUS Details.xlsx', 'SPUS Holdings')]:
+        times = {}
+        for label, fn, fn_args in [
+            ('read_excel_data (all sheets)', read_excel_data, (workbook,)),
+            ('WorkbookReader (all sheets)', reader_all, (workbook,)),
+            (f"WorkbookReader ({sheet})", reader_one, (workbook, sheet, None)),
+            (f"WorkbookReader ({sheet}, 2 cols)", reader_one, (workbook, sheet, ['Security Name', 'Weightings'])),
+        ]:
+            times[label] = min(_timed(fn, *fn_args)[1] for _ in range(max(args.repeat // 4, 1)))
+        print(workbook)
+        for label, elapsed in times.items():
+            print(f"  {label:40s} {elapsed:8.1f} ms")
+
+
+def bench_ingest(args):
+    """Process-pool ingest of a synthetic 100-workbook corpus at several worker counts"""
+    import openpyxl
+    from ingest import ingest
+
+    root = tempfile.mkdtemp(prefix='ingest_')
+    try:
+        rng = np.random.default_rng(0)
+        template = os.path.join(root, 'template.xlsx')
+        book = openpyxl.Workbook(write_only=True)
+        rows = 1000
+        weights = rng.dirichlet(np.ones(rows))
+        for sheet, header, labels in [
+            ('Holdings', 'Security Name', [f"Security {i}" for i in range(rows)]),
+            ('Sector', 'Sector', [f"Sector {i % 11}" for i in range(rows)]),
+            ('Country', 'Country ', [f"Country {i % 40}" for i in range(rows)]),
+        ]:
+            worksheet = book.create_sheet(f"SYN {sheet}")
+            worksheet.append([header, 'Weightings'])
+            for label, weight in zip(labels, weights):
+                worksheet.append([label, float(weight)])
+        book.save(template)
+        corpus = []
+        for i in range(100):
+            code = ''.join(chr(65 + int(digit)) for digit in f"{i:03d}")
+            path = os.path.join(root, f"{i}- {code} Details.xlsx")
+            shutil.copy(template, path)
+            corpus.append(path)
+
+        print(f"{len(corpus)} workbooks x 3 sheets x {rows} rows, {os.cpu_count()} CPUs")
+        baseline = None
+        for workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+            snapshot_dir = os.path.join(root, f"snapshots-{workers}")
+            dataset, _, elapsed = ingest(corpus, workers, out_dir=None, snapshot_dir=snapshot_dir)
+            baseline = baseline or elapsed
+            print(f"  {workers:3d} workers: {elapsed:6.2f} s  ({baseline / elapsed:4.1f}x, {len(dataset['holdings'])} holdings rows)")
+    finally:
+        shutil.rmtree(root)
+
+
+def bench_holdings(args):
+    """Memory of the per-call workbook frames vs the compact holdings repository"""
+    from holdings import HoldingsRepository
+    from ingest import DEFAULT_WORKBOOKS, combine, ingest_workbook, workbook_etf
+
+    root = tempfile.mkdtemp(prefix='holdings_')
+    try:
+        workbooks = [path for path in DEFAULT_WORKBOOKS if workbook_etf(path)]
+        results = [ingest_workbook(path, root) for path in workbooks]
+        # What every get_isdu_*-style call held: the ETF's own sheets as object frames
+        per_call = 0
+        for path in workbooks:
+            workbook = pd.read_excel(path, sheet_name=None)
+            prefix = next(name[:-len(' Holdings')] for name in workbook if name.endswith(' Holdings'))
+            for kind in ('Holdings', 'Sector', 'Country'):
+                per_call += int(workbook[f"{prefix} {kind}"].memory_usage(deep=True).sum())
+        dataset = combine(results)
+        normalized = sum(int(dataset[name].memory_usage(deep=True).sum()) for name in ('holdings', 'sectors', 'countries'))
+        repository, build_ms = _timed(HoldingsRepository, dataset)
+        compact = sum(repository.memory_usage().values())
+        print(f"{len(workbooks)} ETFs, {len(dataset['holdings'])} holdings rows")
+        print(f"Raw workbook frames (object):   {per_call / 1024:8.1f} KiB")
+        print(f"Normalized tables (string/f64): {normalized / 1024:8.1f} KiB")
+        print(f"HoldingsRepository (cat/f32):   {compact / 1024:8.1f} KiB  (built in {build_ms:.1f} ms)")
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            for etf in repository.etfs:
+                repository.holdings(etf)
+                repository.sectors(etf)
+                repository.countries(etf)
+        elapsed = (time.perf_counter() - started) * 1000 / (args.repeat * len(repository.etfs))
+        print(f"Per-ETF query (3 tables):       {elapsed * 1000:8.1f} us")
+    finally:
+        shutil.rmtree(root)
+
+
+def _mapped_memory(path_suffix):
+    """Rss and Pss (KiB) of this process's mappings whose path ends with `path_suffix`"""
+    totals = {'Rss': 0, 'Pss': 0}
+    matching = False
+    with open('/proc/self/smaps') as f:
+        for line in f:
+            fields = line.split()
+            if len(fields) >= 5 and '-' in fields[0]:
+                matching = fields[-1].endswith(path_suffix)
+            elif matching and fields[0].rstrip(':') in totals:
+                totals[fields[0].rstrip(':')] += int(fields[1])
+    return totals
+
+
+def _shared_reader(root, name, generations, barrier, report):
+    from shared_store import SharedStore
+
+    store = SharedStore(root)
+    version = store.version(name)
+    frame = store.frame(name)
+    # Touch every page so the mapping is resident
+    for column in frame.columns:
+        frame[column].to_numpy().sum()
+    barrier.wait(timeout=60)
+    seen, torn = [], 0
+    report.put(('mapped', os.getpid(), _mapped_memory(f"{version}.arrow")))
+    deadline = time.time() + 60
+    while len(seen) < generations and time.time() < deadline:
+        frame = store.frame(name)
+        values = frame[frame.columns[1]].to_numpy()
+        generation = int(values[0])
+        # Every cell of a generation holds the same value (or NaN), so a torn read would show mixed values
+        torn += int(any(
+            (np.nan_to_num(frame[column].to_numpy(), nan=generation) != generation).any()
+            for column in frame.columns[::50]
+        ))
+        if not seen or seen[-1] != generation:
+            seen.append(generation)
+        time.sleep(0.005)
+    report.put(('swaps', os.getpid(), seen, torn))
+
+
+def bench_shared_store(args):
+    """Two processes mapping one Arrow dataset: shared pages and atomic version swaps"""
+    import multiprocessing
+    from shared_store import SharedStore
+
+    root = tempfile.mkdtemp(prefix='shared_store_')
+    try:
+        store = SharedStore(root)
+        rows, columns, generations = 5000, args.tickers, 5
+
+        def frame(generation):
+            # Aligned closes have NaN where a ticker has no bar (holidays, later listings)
+            values = np.full((rows, columns), float(generation))
+            values[:250, ::2] = np.nan
+            return pd.DataFrame(
+                values,
+                index=pd.bdate_range('2000-01-03', periods=rows, name='Date'),
+                columns=[f"T{i:04d}" for i in range(columns)]
+            )
+
+        store.publish('closes', frame(0))
+        size_kib = store.table('closes').nbytes / 1024
+        report = multiprocessing.Queue()
+        barrier = multiprocessing.Barrier(2)
+        readers = [
+            multiprocessing.Process(target=_shared_reader, args=(root, 'closes', generations, barrier, report))
+            for _ in range(2)
+        ]
+        for reader in readers:
+            reader.start()
+        mapped = [report.get(timeout=60) for _ in readers]
+        print(f"Dataset: {rows} x {columns} float64 ({size_kib / 1024:.1f} MiB)")
+        # Pss splits shared pages between the processes mapping them: ~Rss/2 means one copy for both
+        for _, pid, memory in mapped:
+            print(f"  pid {pid}: mapped Rss {memory['Rss'] / 1024:6.1f} MiB, Pss {memory['Pss'] / 1024:6.1f} MiB")
+        for generation in range(1, generations):
+            time.sleep(0.2)
+            _, publish_ms = _timed(store.publish, 'closes', frame(generation))
+            print(f"  published generation {generation} in {publish_ms:.0f} ms")
+        for _ in readers:
+            _, pid, seen, torn = report.get(timeout=60)
+            print(f"  pid {pid}: saw generations {seen}, torn reads {torn}")
+        for reader in readers:
+            reader.join()
+    finally:
+        shutil.rmtree(root)
+
+
+def bench_export(args):
+    """Streamed exports vs materializing the combined frame, 50k holdings rows"""
+    import tracemalloc
+    from export import FORMATS, export
+    from holdings import HoldingsRepository
+
+    rng = np.random.default_rng(0)
+    etfs, per_etf = 50, 1000
+    holdings = pd.DataFrame({
+        'etf': np.repeat([f"E{i:02d}" for i in range(etfs)], per_etf),
+        'security': [f"Security {i % 7000}" for i in range(etfs * per_etf)],
+        'weight': rng.dirichlet(np.ones(per_etf), etfs).ravel(),
+    })
+    exposures = lambda label, count: pd.DataFrame({
+        'etf': np.repeat(holdings['etf'].unique(), count),
+        label: [f"{label} {i % count}" for i in range(etfs * count)],
+        'weight': rng.dirichlet(np.ones(count), etfs).ravel(),
+    })
+    repository = HoldingsRepository({
+        'holdings': holdings, 'sectors': exposures('sector', 11), 'countries': exposures('country', 40)
+    })
+
+    def materialized(fmt, path):
+        # Build the combined frame first, then write it in one call
+        frames = []
+        for table, label in [('holdings', 'security'), ('sectors', 'sector'), ('countries', 'country')]:
+            frame = repository.tables[table].rename(columns={label: 'name'}).astype({'etf': str, 'name': str})
+            frames.append(frame.assign(table=table)[['table', 'etf', 'name', 'weight']])
+        combined = pd.concat(frames, ignore_index=True)
+        if fmt == 'csv':
+            combined.to_csv(path, index=False)
+        elif fmt == 'parquet':
+            combined.to_parquet(path, index=False)
+        else:
+            with pd.ExcelWriter(path) as writer:
+                for table, frame in combined.groupby('table'):
+                    frame.to_excel(writer, sheet_name=table.capitalize(), index=False)
+        return len(combined)
+
+    def measure(fn, *fn_args):
+        tracemalloc.start()
+        started = time.perf_counter()
+        rows = fn(*fn_args)
+        elapsed = (time.perf_counter() - started) * 1000
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return rows, elapsed, peak / 2 ** 20
+
+    root = tempfile.mkdtemp(prefix='export_')
+    try:
+        for fmt in FORMATS:
+            path = os.path.join(root, f"export.{fmt}")
+            rows, streamed_ms, streamed_mib = measure(export, repository, path, fmt)
+            _, full_ms, full_mib = measure(materialized, fmt, path)
+            print(f"{fmt:8s} {rows} rows  streamed {streamed_ms:7.0f} ms / peak {streamed_mib:6.1f} MiB   "
+                  f"materialized {full_ms:7.0f} ms / peak {full_mib:6.1f} MiB")
+    finally:
+        shutil.rmtree(root)
+
+
+def bench_registry(args):
+    """Expense-ratio/AUM filters: list scan vs the registry's sorted indexes"""
+    from registry import ETFRegistry
+
+    rng = np.random.default_rng(0)
+    universe = pd.DataFrame({
+        'ETF': [f"E{i:05d}" for i in range(args.tickers)],
+        'AUM (M)': rng.lognormal(5, 1.5, args.tickers),
+        'Expense Ratio': [f"{value:.2f}%" if value < 0.95 else 'N/A' for value in rng.uniform(0.05, 1.0, args.tickers)],
+    })
+    registry, build_ms = _timed(ETFRegistry, universe, [])
+    tickers = registry.tickers
+    ratios = dict(zip(tickers, registry.frame['Expense Ratio']))
+    aum = dict(zip(tickers, registry.frame['AUM (M)']))
+    limits = rng.uniform(0.1, 1.0, args.repeat)
+
+    started = time.perf_counter()
+    scans = [[etf for etf in tickers if ratios[etf] <= limit and aum[etf] >= 100] for limit in limits]
+    scan_ms = (time.perf_counter() - started) * 1000 / args.repeat
+    started = time.perf_counter()
+    indexed = [
+        set(registry.between('Expense Ratio', hi=limit)).intersection(registry.between('AUM (M)', lo=100))
+        for limit in limits
+    ]
+    index_ms = (time.perf_counter() - started) * 1000 / args.repeat
+    started = time.perf_counter()
+    narrow = [registry.between('Expense Ratio', hi=0.1) for _ in limits]
+    narrow_ms = (time.perf_counter() - started) * 1000 / args.repeat
+    same = all(set(scan) == found for scan, found in zip(scans, indexed))
+    print(f"{len(registry)} ETFs, registry built in {build_ms:.1f} ms")
+    print(f"List scan (expense <= x, AUM >= 100M): {scan_ms:8.3f} ms")
+    print(f"Index range scans + intersection:      {index_ms:8.3f} ms")
+    print(f"Index range scan (expense <= 0.10%):   {narrow_ms:8.3f} ms ({len(narrow[0])} ETFs)")
+    print(f"Same results: {same}")
+
+
+def bench_webhook(args):
+    """Load test of webhook_service: acknowledgement latency and events/s"""
+    import hashlib
+    import hmac
+    import http.client
+    import socket
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    import uvicorn
+
+    from webhook_service import create_app
+
+    secret = 'whsec_benchmark'
+
+    def handler(event):
+        # Stands in for the MySQL work of webhook_handler.handle_webhook_event
+        time.sleep(args.latency)
+
+    # Events are fsynced to the spool before they are acknowledged
+    spool = tempfile.mkdtemp(prefix='webhook_spool_')
+    app = create_app(handler=handler, secret=secret, threads=args.threads, maxsize=100000, spool=spool)
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning'))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    def post(client, i):
+        payload = json.dumps({
+            'id': f"evt_{client}_{i}", 'object': 'event', 'type': 'invoice.payment_succeeded',
+            'data': {'object': {'id': f"in_{client}_{i}", 'customer': f"cus_{client}"}},
+        })
+        timestamp = int(time.time())
+        signature = hmac.new(secret.encode(), f"{timestamp}.{payload}".encode(), hashlib.sha256).hexdigest()
+        return payload, {'Stripe-Signature': f"t={timestamp},v1={signature}", 'Content-Type': 'application/json'}
+
+    def client(n):
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        latencies = []
+        for i in range(args.repeat):
+            payload, headers = post(n, i)
+            started = time.perf_counter()
+            connection.request('POST', '/webhook', payload, headers)
+            response = connection.getresponse()
+            response.read()
+            latencies.append((time.perf_counter() - started, response.status))
+        connection.close()
+        return latencies
+
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(args.sessions) as pool:
+            results = [latency for latencies in pool.map(client, range(args.sessions)) for latency in latencies]
+        acked = time.perf_counter() - started
+        app.state.events.join()
+        processed = time.perf_counter() - started
+        stats = app.state.events.stats()
+    finally:
+        server.should_exit = True
+        shutil.rmtree(spool, ignore_errors=True)
+    ms = np.array([latency for latency, _ in results]) * 1000
+    statuses = {status: sum(1 for _, s in results if s == status) for status in {s for _, s in results}}
+    print(f"{len(results)} events from {args.sessions} concurrent senders, handler {args.latency * 1000:.0f} ms, "
+          f"{args.threads} worker threads")
+    print(f"Acknowledged: {len(results) / acked:8.0f} events/s, p50 {np.percentile(ms, 50):.1f} ms, "
+          f"p95 {np.percentile(ms, 95):.1f} ms, p99 {np.percentile(ms, 99):.1f} ms, statuses {statuses}")
+    print(f"Processed:    {len(results) / processed:8.1f} events/s ({processed:.1f} s to drain the queue)")
+    print(f"Queue: {stats}")
+
+
+def bench_figures(args):
+    """CPU per Overview rerun for the comparison bar charts: built per rerun vs FigureCache"""
+    import plotly.io
+    from concurrent.futures import ThreadPoolExecutor
+
+    from figures import FigureCache, build_figure
+    from registry import DEFAULT_UNIVERSE, OVERVIEW_COLUMNS, ETFRegistry
+    from shared_store import content_version
+
+    etf_data = ETFRegistry(DEFAULT_UNIVERSE, []).columns(OVERVIEW_COLUMNS)
+    rng = np.random.default_rng(0)
+    risk = pd.DataFrame({'ETF': etf_data['ETF'], 'Beta': rng.uniform(0.8, 1.2, len(etf_data)),
+                         'Volatility (%)': rng.uniform(12, 20, len(etf_data))})
+    charts = [
+        (etf_data, {'kind': 'bar', 'x': 'ETF', 'y': 'Expense Ratio', 'title': "Expense Ratios Comparison",
+                    'traces': {'texttemplate': '%{y:.2f}%', 'textposition': 'outside'}}),
+        (etf_data, {'kind': 'bar', 'x': 'ETF', 'y': 'AUM (M)', 'title': "Assets Under Management",
+                    'traces': {'texttemplate': '$%{y:.1f}M', 'textposition': 'outside'}}),
+        (etf_data, {'kind': 'bar', 'x': 'ETF', 'y': ['YTD Return', '1-Year Return', '3-Year Return'],
+                    'barmode': 'group', 'traces': {'texttemplate': '%{y:.1f}%', 'textposition': 'outside'}}),
+        (risk, {'kind': 'bar', 'x': 'ETF', 'y': 'Beta', 'hline': {'y': 1, 'line_dash': "dash"},
+                'traces': {'texttemplate': '%{y:.2f}', 'textposition': 'outside'}}),
+        (risk, {'kind': 'bar', 'x': 'ETF', 'y': 'Volatility (%)',
+                'traces': {'texttemplate': '%{y:.1f}%', 'textposition': 'outside'}}),
+    ]
+    # Serializing is what st.plotly_chart does with either figure
+    def uncached_rerun(_):
+        for frame, spec in charts:
+            plotly.io.to_json(build_figure(frame, spec), validate=False)
+
+    cache = FigureCache()
+
+    def cached_rerun(_):
+        for frame, spec in charts:
+            plotly.io.to_json(cache.get(content_version(frame), frame, spec), validate=False)
+
+    same = all(
+        plotly.io.to_json(build_figure(frame, spec)) == plotly.io.to_json(cache.get(content_version(frame), frame, spec))
+        for frame, spec in charts
+    )
+    reruns = args.sessions * args.repeat
+    print(f"{args.sessions} concurrent sessions x {args.repeat} reruns, {len(charts)} charts per rerun")
+    for name, rerun in [('Built every rerun', uncached_rerun), ('FigureCache', cached_rerun)]:
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        with ThreadPoolExecutor(args.sessions) as pool:
+            list(pool.map(rerun, range(reruns)))
+        cpu_ms = (time.process_time() - cpu) * 1000 / reruns
+        print(f"{name:18s} {cpu_ms:7.1f} ms CPU per rerun, {time.perf_counter() - wall:6.1f} s wall")
+    print(f"Cached figures serialize identically: {same}; cache {cache.stats()}")
+
+
+def bench_downsample(args):
+    """Plotly payload and timing of full daily histories vs LTTB/min-max downsampling"""
+    import plotly.io
+
+    from downsample import downsample
+
+    bars = StubProvider(latency=0, years=20).bars
+    raw = plotly.io.to_json(px.line(bars, x=bars.index, y='Close'), validate=False)
+    print(f"{len(bars)} daily bars, full trace: {len(raw) / 1024:8.1f} KiB")
+    for points in (400, 1200):
+        for method in ('lttb', 'minmax'):
+            sampled, ms = _timed(downsample, bars, points, method=method)
+            payload = plotly.io.to_json(px.line(sampled, x=sampled.index, y='Close'), validate=False)
+            extremes = sampled['Close'].max() == bars['Close'].max() and sampled['Close'].min() == bars['Close'].min()
+            print(f"{method:6s} {points:5d} pts: {len(sampled):5d} points, {len(payload) / 1024:8.1f} KiB, "
+                  f"{ms:6.2f} ms, extremes kept: {extremes}")
+    series = pd.Series(np.random.default_rng(0).normal(size=args.tickers * 1000).cumsum())
+    for method in ('lttb', 'minmax'):
+        _, ms = _timed(downsample, series, 1200, method=method)
+        print(f"{method:6s} {len(series)} points -> 1200: {ms:8.1f} ms")
+
+
+BENCHMARKS = {
+    'downsample': bench_downsample,
+    'figures': bench_figures,
+    'webhook': bench_webhook,
+    'registry': bench_registry,
+    'export': bench_export,
+    'shared-store': bench_shared_store,
+    'holdings': bench_holdings,
+    'ingest': bench_ingest,
+    'workbook': bench_workbook,
+    'snapshot': bench_snapshot,
+    'rolling': bench_rolling,
+    'returns': bench_returns,
+    'loader': bench_loader,
+    'quotes': bench_quotes,
+    'replay': bench_replay,
+    'batched-history': bench_batched_history,
+    'price-store': bench_price_store,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS))
+    parser.add_argument('--latency', type=float, default=0.25, help="Simulated provider latency (s)")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--sessions', type=int, default=20, help="Concurrent sessions")
+    parser.add_argument('--fixtures', help="Recorded fixture directory (replay)")
+    parser.add_argument('--profile', help="Recorded latency profile (replay)")
+    parser.add_argument('--tickers', type=int, default=500, help="Synthetic ticker count")
+    parser.add_argument('--threads', type=int, default=8, help="Webhook worker threads")
+    args = parser.parse_args()
+    BENCHMARKS[args.benchmark](args)
+
+
+if __name__ == "__main__":
+    main()
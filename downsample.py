@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+
+def _buckets(start, stop, count):
+    """Split positions [start, stop) into `count` near-equal buckets as a padded index matrix"""
+    edges = np.linspace(start, stop, count + 1).astype(np.int64)
+    sizes = np.diff(edges)
+    offsets = np.arange(sizes.max())
+    valid = offsets < sizes[:, None]
+    index = np.where(valid, edges[:-1, None] + offsets, edges[:-1, None])
+    return index, valid
+
+
+def minmax_indices(y, points):
+    """Positions of the first, last, and each bucket's min and max point (at most `points`)"""
+    n = len(y)
+    if n <= points:
+        return np.arange(n)
+    index, valid = _buckets(1, n - 1, max((points - 2) // 2, 1))
+    values = y[index]
+    missing = ~valid | np.isnan(values)
+    rows = np.arange(len(index))
+    lows = index[rows, np.where(missing, np.inf, values).argmin(axis=1)]
+    highs = index[rows, np.where(missing, -np.inf, values).argmax(axis=1)]
+    return np.unique(np.concatenate([[0, n - 1], lows, highs]))
+
+
+def lttb_indices(x, y, points):
+    """Largest-Triangle-Three-Buckets positions, computed for all buckets at once.
+
+    Classic LTTB anchors each bucket's triangle on the point picked in the
+    previous bucket, which forces a sequential loop; here the anchor is the
+    previous bucket's average (as the right anchor already is the next
+    bucket's), so every bucket is solved in one array operation. The
+    series' overall min and max are always kept, within `points`.
+    """
+    n = len(y)
+    if n <= points:
+        return np.arange(n)
+    index, valid = _buckets(1, n - 1, max(points - 4, 1))
+    xs, ys = x[index], y[index]
+    weights = valid & ~np.isnan(ys)
+    counts = np.maximum(weights.sum(axis=1), 1)
+    mean_x = np.where(weights, xs, 0).sum(axis=1) / counts
+    mean_y = np.where(weights, ys, 0).sum(axis=1) / counts
+    # Left anchor: previous bucket's average (the first point for bucket 0);
+    # right anchor: next bucket's average (the last point for the final bucket)
+    ax = np.concatenate([[x[0]], mean_x[:-1]])[:, None]
+    ay = np.concatenate([[y[0]], mean_y[:-1]])[:, None]
+    cx = np.concatenate([mean_x[1:], [x[-1]]])[:, None]
+    cy = np.concatenate([mean_y[1:], [y[-1]]])[:, None]
+    area = np.abs((ax - cx) * (ys - ay) - (ax - xs) * (cy - ay))
+    picked = index[np.arange(len(index)), np.where(weights, area, -1).argmax(axis=1)]
+    extremes = [np.nanargmin(y), np.nanargmax(y)] if not np.isnan(y).all() else []
+    return np.unique(np.concatenate([[0, n - 1], picked, extremes]).astype(np.int64))
+
+
+def _positions(index):
+    # Time axis in seconds for a DatetimeIndex (gaps such as weekends count), else ordinal
+    if isinstance(index, pd.DatetimeIndex):
+        return ((index - index[0]) / pd.Timedelta(seconds=1)).to_numpy(dtype='float64')
+    return np.arange(len(index), dtype='float64')
+
+
+def downsample(data, points, column=None, method='lttb'):
+    """At most `points` rows of a date-indexed Series/DataFrame, chosen on `column` (default Close)"""
+    if points is None:
+        return data
+    # Below a handful of points the kept first/last/extreme points alone would exceed the cap
+    points = max(int(points), 8)
+    if len(data) <= points:
+        return data
+    if isinstance(data, pd.DataFrame):
+        column = column or ('Close' if 'Close' in data.columns else data.columns[0])
+        values = data[column]
+    else:
+        values = data
+    y = values.to_numpy(dtype='float64', na_value=np.nan)
+    if method == 'minmax':
+        positions = minmax_indices(y, points)
+    elif method == 'lttb':
+        positions = lttb_indices(_positions(data.index), y, points)
+    else:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    return data.iloc[positions]
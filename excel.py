@@ -1,32 +1,180 @@
-import pandas as pd
+"""Profile the ETF workbooks in one streaming pass.
 
-# Load the Excel file
-file_path = "WSHR.NE Details.xlsx"
-xls = pd.ExcelFile(file_path, engine="openpyxl")
+    python excel.py [paths...] [--out report.json]
 
-# Define the sheets we want to analyze
-sheets_to_analyze = ["WSHR.NE Holdings", "WSHR.NE Sector", "WSHR.NE Country"]
+Every sheet is read row by row in openpyxl's read-only mode and each
+column is summarized with single-pass statistics (types, nulls, numeric
+range/mean/std, text lengths), plus weight sums and duplicate securities
+per sheet. Nothing is loaded into pandas, so a new factsheet drop can be
+checked in seconds. Prints a summary with timings and writes a JSON report.
+"""
+import argparse
+import datetime
+import glob
+import json
+import math
+import time
 
-for sheet_name in sheets_to_analyze:
-    print(f"\n🔹 Analyzing Sheet: {sheet_name}")
+import openpyxl
 
-    # Read the specific sheet
-    df = pd.read_excel(xls, sheet_name=sheet_name)
+WEIGHT_COLUMNS = ('Weightings', 'Weight', 'Breakdown')
+SECURITY_COLUMNS = ('Security Name', 'SecurityName', 'Security name')
+# Cached results of failed formulas, as read-only mode returns them
+EXCEL_ERRORS = {'#NULL!', '#DIV/0!', '#VALUE!', '#REF!', '#NAME?', '#NUM!', '#N/A'}
 
-    # Display column names
-    print("\n📌 Column Names:")
-    print(df.columns.tolist())
 
-    # Show the first 12 rows
-    print("\n📊 First 12 Rows:")
-    print(df.head(12))  # Show first 12 rows instead of 5
+class ColumnProfile:
+    """Online statistics for one column"""
 
-    # Show summary statistics (numerical & categorical)
-    print("\n📈 Summary Statistics:")
-    print(df.describe(include="all"))
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.nulls = 0
+        self.types = {}
+        self.numeric = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = None
+        self.max = None
+        self.min_length = None
+        self.max_length = None
 
-    # Show missing values
-    print("\n⚠️ Missing Values:")
-    print(df.isnull().sum())
+    def add(self, value):
+        self.count += 1
+        if value is None or value == '':
+            self.nulls += 1
+            return
+        if isinstance(value, bool):
+            kind = 'bool'
+        elif isinstance(value, (int, float)):
+            kind = 'number'
+        elif isinstance(value, (datetime.date, datetime.time)):
+            kind = 'date'
+        elif value in EXCEL_ERRORS:
+            kind = 'error'
+        else:
+            kind = 'text'
+        self.types[kind] = self.types.get(kind, 0) + 1
+        if kind == 'number':
+            # Welford's update keeps mean and variance in one pass
+            self.numeric += 1
+            delta = value - self.mean
+            self.mean += delta / self.numeric
+            self._m2 += delta * (value - self.mean)
+            self.min = value if self.min is None else min(self.min, value)
+            self.max = value if self.max is None else max(self.max, value)
+        elif kind == 'text':
+            length = len(str(value))
+            self.min_length = length if self.min_length is None else min(self.min_length, length)
+            self.max_length = length if self.max_length is None else max(self.max_length, length)
 
-    print("\n" + "-" * 50)  # Separator for clarity
+    @property
+    def dtype(self):
+        if not self.types:
+            return 'empty'
+        return max(self.types, key=self.types.get) if len(self.types) == 1 else 'mixed'
+
+    def report(self):
+        report = {'dtype': self.dtype, 'types': self.types, 'nulls': self.nulls}
+        if self.numeric:
+            report.update({
+                'min': self.min,
+                'max': self.max,
+                'mean': self.mean,
+                'std': math.sqrt(self._m2 / (self.numeric - 1)) if self.numeric > 1 else 0.0,
+            })
+        if self.min_length is not None:
+            report.update({'min_length': self.min_length, 'max_length': self.max_length})
+        return report
+
+
+def profile_sheet(worksheet):
+    """Stream one worksheet; returns its profile dict"""
+    started = time.perf_counter()
+    worksheet.reset_dimensions()
+    rows = worksheet.iter_rows(values_only=True)
+    header = next(rows, ())
+    names = [
+        str(value) if value is not None else f"Unnamed: {i}" for i, value in enumerate(header)
+    ]
+    columns = [ColumnProfile(name) for name in names]
+    weight_index = next((i for i, name in enumerate(names) if name.strip() in WEIGHT_COLUMNS), None)
+    security_indexes = [i for i, name in enumerate(names) if name.strip() in SECURITY_COLUMNS]
+    weight_sum = 0.0
+    seen, duplicates = set(), {}
+    row_count = 0
+    for row in rows:
+        if not any(value is not None for value in row):
+            continue
+        row_count += 1
+        for i, value in enumerate(row):
+            if i >= len(columns):
+                columns.append(ColumnProfile(f"Unnamed: {i}"))
+                columns[i].count = row_count - 1
+                columns[i].nulls = row_count - 1
+            columns[i].add(value)
+        for column in columns[len(row):]:
+            column.add(None)
+        if weight_index is not None and weight_index < len(row) and isinstance(row[weight_index], (int, float)):
+            weight_sum += row[weight_index]
+        for i in security_indexes:
+            if i < len(row) and isinstance(row[i], str) and row[i] not in EXCEL_ERRORS:
+                security = row[i].strip()
+                if (i, security) in seen:
+                    duplicates[security] = duplicates.get(security, 1) + 1
+                seen.add((i, security))
+
+    warnings = [f"header '{c.name}' has surrounding whitespace" for c in columns if c.name != c.name.strip()]
+    warnings += [f"column '{c.name}' mixes {', '.join(sorted(c.types))}" for c in columns if c.dtype == 'mixed']
+    warnings += [f"column '{c.name}' has {c.types['error']} formula errors" for c in columns if 'error' in c.types]
+    if weight_index is not None and row_count and abs(weight_sum - 1.0) > 0.01:
+        warnings.append(f"weights sum to {weight_sum:.4f}")
+    if duplicates:
+        warnings.append(f"{len(duplicates)} duplicate securities")
+    return {
+        'rows': row_count,
+        'columns': {c.name: c.report() for c in columns},
+        'weight_column': names[weight_index] if weight_index is not None else None,
+        'weight_sum': weight_sum if weight_index is not None else None,
+        'duplicate_securities': duplicates,
+        'warnings': warnings,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def profile_workbook(path):
+    started = time.perf_counter()
+    book = openpyxl.load_workbook(path, read_only=True, data_only=True, keep_links=False)
+    try:
+        sheets = {name: profile_sheet(book[name]) for name in book.sheetnames}
+    finally:
+        book.close()
+    return {'sheets': sheets, 'seconds': time.perf_counter() - started}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('paths', nargs='*', help="Workbooks to profile (default: every Details workbook)")
+    parser.add_argument('--out', default='workbook_profile.json', help="JSON report path")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    report = {'workbooks': {}}
+    for path in args.paths or sorted(glob.glob('*Details.xlsx')):
+        profile = profile_workbook(path)
+        report['workbooks'][path] = profile
+        print(f"\n🔹 {path} ({profile['seconds'] * 1000:.0f} ms)")
+        for name, sheet in profile['sheets'].items():
+            weights = f", weights {sheet['weight_sum']:.4f}" if sheet['weight_sum'] is not None else ''
+            print(f"  {name:20s} {sheet['rows']:5d} rows, {len(sheet['columns']):2d} cols{weights}  "
+                  f"({sheet['seconds'] * 1000:.0f} ms)")
+            for warning in sheet['warnings']:
+                print(f"    ⚠️ {warning}")
+    report['seconds'] = time.perf_counter() - started
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"\n✅ Profiled {len(report['workbooks'])} workbooks in {report['seconds']:.2f}s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Export holdings, sector and country weights for any set of ETFs.
+
+    python export.py [ETF ...] --format csv|parquet|xlsx [--out PATH]
+
+Rows are streamed ETF by ETF from the holdings repository straight into
+the output file; the combined table is never built in memory. XLSX uses
+openpyxl's write-only mode, so memory stays flat however many rows are
+written.
+"""
+import argparse
+import csv
+import io
+
+import openpyxl
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from holdings import EXPOSURES
+
+FORMATS = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+COLUMNS = ['table', 'etf', 'name', 'weight']
+SCHEMA = pa.schema([('table', pa.string()), ('etf', pa.string()), ('name', pa.string()), ('weight', pa.float32())])
+
+
+def iter_chunks(repository, etfs=None, tables=None):
+    """(table, etf, rows) for each requested table and ETF; rows are repository slices"""
+    for table in tables or EXPOSURES:
+        for etf in etfs or repository.etfs:
+            rows = getattr(repository, table)(etf)
+            if len(rows):
+                yield table, etf, rows
+
+
+def _weights(rows):
+    # float32 -> float64 without the float32 noise digits (0.1494 rather than 0.14939999580383301)
+    return rows['weight'].to_numpy().astype('float64').round(7).tolist()
+
+
+def _write_csv(chunks, out):
+    text = io.TextIOWrapper(out, encoding='utf-8', newline='')
+    writer = csv.writer(text)
+    writer.writerow(COLUMNS)
+    count = 0
+    for table, etf, rows in chunks:
+        label = EXPOSURES[table]
+        writer.writerows((table, etf, name, weight) for name, weight in zip(rows[label], _weights(rows)))
+        count += len(rows)
+    text.flush()
+    text.detach()
+    return count
+
+
+def _write_parquet(chunks, out):
+    count = 0
+    with pq.ParquetWriter(out, SCHEMA) as writer:
+        for table, etf, rows in chunks:
+            label = EXPOSURES[table]
+            writer.write_table(pa.table({
+                'table': pa.array([table] * len(rows), pa.string()),
+                'etf': pa.array([etf] * len(rows), pa.string()),
+                'name': pa.array(rows[label].astype('string'), pa.string()),
+                'weight': pa.array(rows['weight'].to_numpy(), pa.float32()),
+            }, schema=SCHEMA))
+            count += len(rows)
+    return count
+
+
+def _write_xlsx(chunks, out):
+    # One sheet per table; write-only sheets flush rows as they are appended
+    book = openpyxl.Workbook(write_only=True)
+    sheets = {}
+    count = 0
+    for table, etf, rows in chunks:
+        if table not in sheets:
+            sheets[table] = book.create_sheet(table.capitalize())
+            sheets[table].append(['ETF', EXPOSURES[table].capitalize(), 'Weight'])
+        sheet = sheets[table]
+        for name, weight in zip(rows[EXPOSURES[table]], _weights(rows)):
+            sheet.append([etf, name, weight])
+        count += len(rows)
+    book.save(out)
+    return count
+
+
+WRITERS = {'csv': _write_csv, 'parquet': _write_parquet, 'xlsx': _write_xlsx}
+
+
+def export(repository, out, fmt='csv', etfs=None, tables=None):
+    """Stream the selected tables for `etfs` to `out` (a path or binary file); returns the row count"""
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    chunks = iter_chunks(repository, etfs, tables)
+    if isinstance(out, str):
+        with open(out, 'wb') as f:
+            return WRITERS[fmt](chunks, f)
+    return WRITERS[fmt](chunks, out)
+
+
+def export_bytes(repository, fmt='csv', etfs=None, tables=None):
+    """Export into memory, e.g. for a download button"""
+    buffer = io.BytesIO()
+    export(repository, buffer, fmt, etfs, tables)
+    return buffer.getvalue()
+
+
+def main():
+    from holdings import HoldingsRepository
+    from watcher import WorkbookWatcher
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('etfs', nargs='*', help="ETFs to export (default: all)")
+    parser.add_argument('--format', choices=sorted(FORMATS), default='csv')
+    parser.add_argument('--tables', nargs='*', choices=list(EXPOSURES), help="Tables to export (default: all)")
+    parser.add_argument('--out', help="Output path (default: holdings.<format>)")
+    args = parser.parse_args()
+
+    repository = HoldingsRepository(WorkbookWatcher().dataset)
+    out = args.out or f"holdings.{args.format}"
+    count = export(repository, out, args.format, args.etfs or None, args.tables)
+    print(f"✅ Exported {count} rows to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import plotly.express as px
+
+
+def build_figure(frame, spec):
+    """Build a Plotly Express chart from a plain-data spec.
+
+    spec: {'kind': 'bar', 'x': ..., 'y': ..., other px kwargs...,
+           'traces': update_traces kwargs, 'layout': update_layout kwargs,
+           'hline': add_hline kwargs}
+    """
+    spec = dict(spec)
+    kind = spec.pop('kind')
+    traces = spec.pop('traces', None)
+    layout = spec.pop('layout', None)
+    hline = spec.pop('hline', None)
+    fig = getattr(px, kind)(frame, **spec)
+    if hline:
+        fig.add_hline(**hline)
+    if traces:
+        fig.update_traces(**traces)
+    if layout:
+        fig.update_layout(**layout)
+    return fig
+
+
+class FigureCache:
+    """Built Plotly figures shared by every session, keyed by (data version, chart spec).
+
+    A chart whose data and spec are unchanged is built once per process
+    instead of on every rerun of every session; callers pass the cached
+    figure straight to st.plotly_chart and must not modify it. At most
+    `max_entries` figures are kept (least recently used are dropped).
+    Build CPU time is recorded so `stats()` can report the time saved.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.build_seconds = 0.0
+
+    def get(self, version, frame, spec):
+        key = (version, json.dumps(spec, sort_keys=True))
+        with self._lock:
+            fig = self._figures.get(key)
+            if fig is not None:
+                self._figures.move_to_end(key)
+                self.hits += 1
+                return fig
+        # Built outside the lock; a concurrent first miss may build the same figure twice
+        started = time.thread_time()
+        fig = build_figure(frame, spec)
+        with self._lock:
+            self.misses += 1
+            self.build_seconds += time.thread_time() - started
+            self._figures[key] = fig
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+        return fig
+
+    def stats(self):
+        with self._lock:
+            mean_build = self.build_seconds / self.misses if self.misses else 0.0
+            return {
+                'figures': len(self._figures),
+                'hits': self.hits,
+                'misses': self.misses,
+                'mean_build_ms': round(mean_build * 1000, 1),
+                'cpu_saved_s': round(self.hits * mean_build, 2),
+            }
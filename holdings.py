@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+# Exposure table -> name of its label column
+EXPOSURES = {'holdings': 'security', 'sectors': 'sector', 'countries': 'country'}
+
+
+def _compact(table, label):
+    """Categorical etf/label codes plus float32 weights, sorted by ETF then weight"""
+    frame = pd.DataFrame({
+        'etf': table['etf'].astype('string').astype('category'),
+        label: table[label].astype('string').astype('category'),
+        'weight': table['weight'].astype('float32'),
+    })
+    return frame.sort_values(['etf', 'weight'], ascending=[True, False], kind='stable', ignore_index=True)
+
+
+class HoldingsRepository:
+    """Every ETF's holdings, sector and country weights in one compact form.
+
+    Built once per dataset version from the normalized tables written by
+    ingest.py. Each table stores its labels as categorical codes and its
+    weights as float32, sorted by ETF, so `holdings(etf)` and friends are
+    row slices (views) of the shared arrays rather than new frames.
+    """
+
+    def __init__(self, tables):
+        self.tables = {name: _compact(tables[name], label) for name, label in EXPOSURES.items()}
+        self._index()
+
+    @classmethod
+    def from_compact(cls, tables):
+        """Wrap tables that are already compact and sorted (e.g. mapped from a SharedStore)"""
+        repository = cls.__new__(cls)
+        repository.tables = {name: tables[name] for name in EXPOSURES}
+        repository._index()
+        return repository
+
+    def _index(self):
+        self._offsets = {}
+        for name, frame in self.tables.items():
+            categories = frame['etf'].cat.categories
+            codes = frame['etf'].cat.codes.to_numpy()
+            starts = np.searchsorted(codes, np.arange(len(categories)), side='left')
+            stops = np.searchsorted(codes, np.arange(len(categories)), side='right')
+            self._offsets[name] = {etf: (start, stop) for etf, start, stop in zip(categories, starts, stops)}
+
+    @property
+    def etfs(self):
+        return sorted(set().union(*(offsets for offsets in self._offsets.values())))
+
+    def _slice(self, name, etf):
+        start, stop = self._offsets[name].get(etf, (0, 0))
+        return self.tables[name].iloc[start:stop]
+
+    def holdings(self, etf):
+        """etf, security, weight rows for one ETF, largest weight first"""
+        return self._slice('holdings', etf)
+
+    def sectors(self, etf):
+        return self._slice('sectors', etf)
+
+    def countries(self, etf):
+        return self._slice('countries', etf)
+
+    def memory_usage(self):
+        """Bytes held per table"""
+        return {name: int(frame.memory_usage(deep=True).sum()) for name, frame in self.tables.items()}
@@ -0,0 +1,201 @@
+"""Compile the ETF workbooks into one normalized dataset.
+
+    python ingest.py [paths...] [--workers N] [--out data/dataset]
+
+Every workbook is parsed in its own worker process (through the snapshot
+cache, so unchanged workbooks are not re-parsed) and the results are
+combined into holdings, sectors, countries and returns tables plus the
+sector/country reference mappings, written as Parquet with a manifest.
+Run it at deploy time so no page load has to parse Excel.
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from snapshots import DEFAULT_SNAPSHOT_DIR, SnapshotCache, file_hash
+
+DEFAULT_DATASET_DIR = os.getenv('DATASET_DIR', os.path.join('data', 'dataset'))
+REFERENCE_WORKBOOK = '0- Reference Sheet.xlsx'
+DEFAULT_WORKBOOKS = sorted(glob.glob('*Details.xlsx')) + [REFERENCE_WORKBOOK, 'book2.xlsx']
+
+# Table -> {column: dtype}
+TABLES = {
+    'holdings': {'etf': 'string', 'security': 'string', 'weight': 'float64'},
+    'sectors': {'etf': 'string', 'sector': 'string', 'weight': 'float64'},
+    'countries': {'etf': 'string', 'country': 'string', 'weight': 'float64'},
+    'returns': {'etf': 'string', 'period': 'string', 'etf_return': 'float64', 'benchmark_return': 'float64'},
+    'sector_reference': {'source': 'string', 'sector': 'string'},
+    'country_reference': {'code': 'string', 'country': 'string'},
+}
+
+
+def empty_table(name):
+    return pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in TABLES[name].items()})
+
+
+def workbook_etf(path):
+    """ETF code from a Details workbook name ('8-WSHR.NE Details.xlsx' -> 'WSHR')"""
+    match = re.match(r'^\d+-\s*([A-Z]+)(?:\.[A-Z]+)? Details\.xlsx$', os.path.basename(path))
+    return match.group(1) if match else None
+
+
+def _column(frame, prefix, exclude=()):
+    # Best-filled column whose name starts with `prefix`, preferring later ones
+    # (the classified 'Sector' after 'Sector Formula', UMMA's 'Sector.1')
+    matches = [c for c in frame.columns if str(c).strip().startswith(prefix) and str(c).strip() not in exclude]
+    if not matches:
+        return None
+    return max(matches, key=lambda c: (frame[c].notna().sum(), list(frame.columns).index(c)))
+
+
+def _weights(frame, etf, table_name, label):
+    column = _column(frame, label.capitalize(), exclude=('Sector Formula',))
+    if column is None or 'Weightings' not in frame.columns:
+        return empty_table(table_name)
+    table = pd.DataFrame({
+        label: frame[column].astype('string').str.strip(),
+        'weight': pd.to_numeric(frame['Weightings'], errors='coerce'),
+    }).dropna()
+    table = table.groupby(label, sort=False, as_index=False)['weight'].sum()
+    table.insert(0, 'etf', etf)
+    return table
+
+
+def normalize_details(etf, sheets):
+    """{table: DataFrame} for one ETF's Details workbook"""
+    prefixes = [name[:-len(' Holdings')] for name in sheets if name.endswith(' Holdings')]
+    tables = {}
+    if not prefixes:
+        return tables
+    prefix = prefixes[0]
+    holdings = sheets[f"{prefix} Holdings"]
+    name_column = _column(holdings, 'Security')
+    if name_column is not None and 'Weightings' in holdings.columns:
+        table = pd.DataFrame({
+            'etf': etf,
+            'security': holdings[name_column].astype('string').str.strip(),
+            'weight': pd.to_numeric(holdings['Weightings'], errors='coerce'),
+        }).dropna(subset=['security', 'weight'])
+        tables['holdings'] = table.reset_index(drop=True)
+    if f"{prefix} Sector" in sheets:
+        tables['sectors'] = _weights(sheets[f"{prefix} Sector"], etf, 'sectors', 'sector')
+    if f"{prefix} Country" in sheets:
+        tables['countries'] = _weights(sheets[f"{prefix} Country"], etf, 'countries', 'country')
+    returns = sheets.get(f"{prefix} Returns")
+    if returns is not None and {'Period', 'S&P 500 Return (%)'} <= set(returns.columns):
+        etf_column = next((c for c in returns.columns if c.endswith(' Return (%)') and not c.startswith('S&P')), None)
+        if etf_column is not None:
+            tables['returns'] = pd.DataFrame({
+                'etf': etf,
+                'period': returns['Period'].astype('string'),
+                'etf_return': pd.to_numeric(returns[etf_column], errors='coerce'),
+                'benchmark_return': pd.to_numeric(returns['S&P 500 Return (%)'], errors='coerce'),
+            })
+    return tables
+
+
+def normalize_reference(sheets):
+    """Sector and country mapping tables from the Reference Sheet"""
+    tables = {}
+    sectors = sheets.get('Sector Reference')
+    if sectors is not None and len(sectors.columns) >= 2:
+        tables['sector_reference'] = pd.DataFrame({
+            'source': sectors.iloc[:, 0].astype('string').str.strip(),
+            'sector': sectors.iloc[:, 1].astype('string').str.strip(),
+        }).dropna()
+    countries = sheets.get('Reference Country')
+    if countries is not None and len(countries.columns) >= 2:
+        tables['country_reference'] = pd.DataFrame({
+            'code': countries.iloc[:, 0].astype('string').str.strip(),
+            'country': countries.iloc[:, 1].astype('string').str.strip(),
+        }).dropna()
+    return tables
+
+
+def ingest_workbook(path, snapshot_dir=DEFAULT_SNAPSHOT_DIR):
+    """Parse (or load the snapshot of) one workbook and normalize it; runs in a worker process"""
+    started = time.perf_counter()
+    cache = SnapshotCache(snapshot_dir)
+    compiled = not os.path.exists(os.path.join(cache.snapshot_dir(path), 'manifest.json'))
+    sheets = cache.load(path)
+    etf = workbook_etf(path)
+    if etf is not None:
+        tables = normalize_details(etf, sheets)
+    elif os.path.basename(path) == REFERENCE_WORKBOOK:
+        tables = normalize_reference(sheets)
+    else:
+        # Scratch workbooks (e.g. book2.xlsx) carry no ETF identity to attach rows to
+        tables = {}
+    return {
+        'path': path,
+        'etf': etf,
+        'sha256': file_hash(path),
+        'parsed': compiled,
+        'rows': {name: len(table) for name, table in tables.items()},
+        'seconds': time.perf_counter() - started,
+        'tables': tables,
+    }
+
+
+def combine(results):
+    """Concatenate per-workbook tables into one frame per dataset table"""
+    dataset = {}
+    for name, dtypes in TABLES.items():
+        parts = [r['tables'][name] for r in results if name in r['tables'] and len(r['tables'][name])]
+        dataset[name] = pd.concat(parts, ignore_index=True).astype(dtypes) if parts else empty_table(name)
+    return dataset
+
+
+def write_dataset(dataset, results, out_dir=DEFAULT_DATASET_DIR):
+    os.makedirs(out_dir, exist_ok=True)
+    for name, table in dataset.items():
+        tmp_path = os.path.join(out_dir, f".{name}.parquet.tmp")
+        table.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, os.path.join(out_dir, f"{name}.parquet"))
+    manifest = {
+        'workbooks': {
+            r['path']: {'etf': r['etf'], 'sha256': r['sha256'], 'rows': r['rows']} for r in results
+        },
+        'tables': {name: len(table) for name, table in dataset.items()},
+    }
+    with open(os.path.join(out_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def ingest(paths=None, workers=None, out_dir=DEFAULT_DATASET_DIR, snapshot_dir=DEFAULT_SNAPSHOT_DIR):
+    """Ingest workbooks in a process pool; returns (dataset, per-file results, wall seconds)"""
+    paths = list(paths or DEFAULT_WORKBOOKS)
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(ingest_workbook, paths, [snapshot_dir] * len(paths)))
+    dataset = combine(results)
+    if out_dir is not None:
+        write_dataset(dataset, results, out_dir)
+    return dataset, results, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('paths', nargs='*', help="Workbooks to ingest (default: all in the repo)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--out', default=DEFAULT_DATASET_DIR)
+    parser.add_argument('--snapshots', default=DEFAULT_SNAPSHOT_DIR)
+    args = parser.parse_args()
+
+    dataset, results, elapsed = ingest(args.paths, args.workers, args.out, args.snapshots)
+    for r in results:
+        source = 'parsed' if r['parsed'] else 'snapshot'
+        rows = ', '.join(f"{name} {count}" for name, count in r['rows'].items()) or 'no ETF data'
+        print(f"{r['path']:28s} {r['seconds'] * 1000:8.1f} ms  ({source}; {rows})")
+    totals = ', '.join(f"{name} {len(table)}" for name, table in dataset.items())
+    print(f"✅ Ingested {len(results)} workbooks in {elapsed:.2f}s -> {args.out} ({totals})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open"""
+
+
+class CircuitBreaker:
+    """Stops calling a dependency after repeated failures.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls fail fast for `reset_timeout` seconds; then a single trial call
+    is let through (half-open) and its outcome closes or re-opens it.
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.time() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.time()
+
+
+@dataclass
+class Task:
+    """One independent fetch for the loader"""
+    name: str
+    fn: object
+    args: tuple = ()
+    timeout: float = 10.0
+    retries: int = 2
+    backoff: float = 0.25
+
+
+@dataclass
+class LoadResult:
+    value: object = None
+    error: Exception = None
+    elapsed: float = 0.0
+    attempts: int = 0
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class ConcurrentLoader:
+    """Runs independent fetches concurrently on a bounded thread pool.
+
+    Every call gets a per-attempt timeout, exponential-backoff retries and
+    a circuit breaker shared by all calls to the same task name, so a page
+    waits roughly as long as its slowest dependency, not the sum of them.
+    A timed-out call keeps running in its thread but its result is ignored.
+    """
+
+    def __init__(self, max_workers=8, failure_threshold=3, reset_timeout=30):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='loader')
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._breakers = {}
+        self._breakers_lock = threading.Lock()
+
+    def breaker(self, name):
+        with self._breakers_lock:
+            if name not in self._breakers:
+                self._breakers[name] = CircuitBreaker(self._failure_threshold, self._reset_timeout)
+            return self._breakers[name]
+
+    async def _run(self, task):
+        loop = asyncio.get_running_loop()
+        breaker = self.breaker(task.name)
+        started = time.perf_counter()
+        result = LoadResult()
+        for attempt in range(task.retries + 1):
+            if not breaker.allow():
+                result.error = CircuitOpenError(f"{task.name}: circuit open")
+                break
+            result.attempts = attempt + 1
+            try:
+                result.value = await asyncio.wait_for(
+                    loop.run_in_executor(self._executor, task.fn, *task.args), task.timeout
+                )
+                result.error = None
+                breaker.record_success()
+                break
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    e = TimeoutError(f"{task.name}: no response within {task.timeout}s")
+                result.error = e
+                breaker.record_failure()
+                if attempt < task.retries:
+                    await asyncio.sleep(task.backoff * 2 ** attempt)
+        result.elapsed = time.perf_counter() - started
+        return result
+
+    async def load_async(self, tasks):
+        results = await asyncio.gather(*(self._run(task) for task in tasks))
+        return {task.name: result for task, result in zip(tasks, results)}
+
+    def load(self, tasks):
+        """Run `tasks` concurrently and return {name: LoadResult} once all have settled"""
+        return asyncio.run(self.load_async(tasks))
@@ -0,0 +1,333 @@
+"""Market data providers.
+
+Everything the dashboard needs from the market goes through a provider:
+daily OHLCV histories (`history`, `download`) and quote/summary fields
+(`info`, or `quotes` for a batch). Three backends are available, chosen with environment variables:
+
+    MARKET_DATA_PROVIDER=yfinance   live Yahoo Finance (default)
+    MARKET_DATA_PROVIDER=fixture    recorded data from MARKET_DATA_FIXTURES
+    MARKET_DATA_PROVIDER=replay     fixture data with the latency/error profile
+                                    in MARKET_DATA_REPLAY_PROFILE
+
+Fixtures and profiles are recorded against the live backend with
+`python market_data.py record --out fixtures SPUS HLAL ...`.
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+
+import pandas as pd
+import yfinance as yf
+from yfinance.const import _QUERY1_URL_
+from yfinance.data import YfData
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+# Corporate actions reported alongside the bars (0 on days without one)
+ACTION_COLUMNS = ['Dividends', 'Stock Splits']
+
+# `Ticker.info` field -> v7 quote endpoint field, where the names differ
+V7_QUOTE_FIELDS = {
+    'dayLow': 'regularMarketDayLow',
+    'dayHigh': 'regularMarketDayHigh',
+    'volume': 'regularMarketVolume',
+    'averageVolume': 'averageDailyVolume3Month',
+}
+
+
+class ProviderError(Exception):
+    """Raised when a provider cannot serve a request"""
+
+
+def normalize_history(data):
+    """Return an OHLCV frame (plus ACTION_COLUMNS when present) indexed by tz-naive trading dates"""
+    if data is None or data.empty:
+        return pd.DataFrame(columns=OHLCV_COLUMNS, index=pd.DatetimeIndex([], name='Date'))
+    data = data[[col for col in OHLCV_COLUMNS + ACTION_COLUMNS if col in data.columns]].copy()
+    index = pd.DatetimeIndex(data.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    data.index = index.normalize().rename('Date')
+    data = data[~data.index.duplicated(keep='last')].sort_index()
+    return data.astype('float64')
+
+
+class MarketDataProvider:
+    """Interface every market data backend implements"""
+
+    def history(self, ticker, start=None):
+        """Daily dividend/split-adjusted OHLCV bars from `start` (inclusive), or the full history.
+
+        Backends that know about corporate actions also return ACTION_COLUMNS.
+        """
+        raise NotImplementedError
+
+    def download(self, tickers, start=None):
+        """Daily OHLCV bars for several tickers, keyed by ticker; tickers that fail are left out"""
+        frames = {}
+        for ticker in tickers:
+            try:
+                frames[ticker] = self.history(ticker, start=start)
+            except ProviderError as e:
+                print(f"⚠️ No history for {ticker}: {e}")
+        return frames
+
+    def info(self, ticker):
+        """Quote and summary fields for a ticker as a plain dict"""
+        raise NotImplementedError
+
+    def quotes(self, tickers, fields):
+        """Selected info fields for several tickers, keyed by ticker"""
+        quotes = {}
+        for ticker in tickers:
+            try:
+                info = self.info(ticker)
+            except ProviderError as e:
+                print(f"⚠️ No quote for {ticker}: {e}")
+                continue
+            quotes[ticker] = {field: info.get(field) for field in fields}
+        return quotes
+
+    def profiles(self, tickers, fields):
+        """Slow-changing fund profile fields (NAV, expense ratio, ...) for several tickers"""
+        return self.quotes(tickers, fields)
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Market data straight from Yahoo Finance"""
+
+    def history(self, ticker, start=None):
+        kwargs = {'period': "max"} if start is None else {'start': start}
+        data = yf.Ticker(ticker).history(auto_adjust=True, actions=True, **kwargs)
+        return normalize_history(data)
+
+    def download(self, tickers, start=None):
+        """One request for all tickers instead of one per ticker"""
+        kwargs = {'period': "max"} if start is None else {'start': start}
+        data = yf.download(
+            list(tickers), group_by='ticker', auto_adjust=True, actions=True,
+            progress=False, threads=True, **kwargs
+        )
+        frames = {}
+        for ticker in tickers:
+            if data is not None and ticker in data.columns.get_level_values(0):
+                frames[ticker] = normalize_history(data[ticker].dropna(how='all'))
+            else:
+                frames[ticker] = normalize_history(None)
+        return frames
+
+    def info(self, ticker):
+        return yf.Ticker(ticker).info
+
+    def quotes(self, tickers, fields):
+        """All tickers in one v7 quote request, asking only for `fields`.
+
+        The quote endpoint names a few fields differently from `Ticker.info`.
+        Fields it does not return (fund profile data such as NAV or expense
+        ratio) are None; `profiles` fetches those.
+        """
+        requested = [V7_QUOTE_FIELDS.get(field, field) for field in fields]
+        response = YfData().get_raw_json(
+            f"{_QUERY1_URL_}/v7/finance/quote",
+            params={'symbols': ','.join(tickers), 'fields': ','.join(requested), 'formatted': 'false'}
+        )
+        rows = {row.get('symbol'): row for row in response.get('quoteResponse', {}).get('result') or []}
+        quotes = {}
+        for ticker in tickers:
+            row = rows.get(ticker, {})
+            quotes[ticker] = {field: row.get(V7_QUOTE_FIELDS.get(field, field)) for field in fields}
+        return quotes
+
+    def profiles(self, tickers, fields):
+        """Fund profile fields from `Ticker.info`, one request per ticker"""
+        profiles = {}
+        for ticker in tickers:
+            try:
+                info = self.info(ticker)
+            except Exception as e:
+                print(f"⚠️ No fund profile for {ticker}: {e}")
+                continue
+            profiles[ticker] = {field: info.get(field) for field in fields}
+        return profiles
+
+
+def _fixture_name(ticker):
+    return ticker.replace('^', '_').replace('/', '_')
+
+
+class FixtureProvider(MarketDataProvider):
+    """Recorded market data read from disk, for offline runs.
+
+    Layout: `<root>/history/<ticker>.parquet` (or `.csv`) and
+    `<root>/info/<ticker>.json`; `^` in index symbols is stored as `_`.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._histories = {}
+
+    def _load_history(self, ticker):
+        if ticker not in self._histories:
+            base = os.path.join(self.root, 'history', _fixture_name(ticker))
+            if os.path.exists(base + '.parquet'):
+                data = pd.read_parquet(base + '.parquet')
+            elif os.path.exists(base + '.csv'):
+                data = pd.read_csv(base + '.csv', index_col=0, parse_dates=True)
+            else:
+                raise ProviderError(f"No recorded history for {ticker} in {self.root}")
+            self._histories[ticker] = normalize_history(data)
+        return self._histories[ticker]
+
+    def history(self, ticker, start=None):
+        data = self._load_history(ticker)
+        return data if start is None else data[data.index >= pd.Timestamp(start)]
+
+    def info(self, ticker):
+        path = os.path.join(self.root, 'info', _fixture_name(ticker) + '.json')
+        if not os.path.exists(path):
+            raise ProviderError(f"No recorded info for {ticker} in {self.root}")
+        with open(path) as f:
+            return json.load(f)
+
+
+class ReplayProvider(MarketDataProvider):
+    """Wraps another provider and replays a recorded latency/error profile.
+
+    The profile maps each call type (`history`, `download`, `info`, `quotes`,
+    `profiles`) to `{"latency_ms": [samples...], "error_rate": 0.02}`; every
+    call sleeps for a latency drawn from the samples and fails with the
+    recorded error rate.
+    """
+
+    def __init__(self, inner, profile, seed=None, sleep=time.sleep):
+        self.inner = inner
+        self.profile = profile
+        self.sleep = sleep
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, inner, path, seed=None):
+        with open(path) as f:
+            return cls(inner, json.load(f), seed=seed)
+
+    def _replay(self, call):
+        spec = self.profile.get(call, {})
+        with self._random_lock:
+            samples = spec.get('latency_ms') or [0]
+            latency = self._random.choice(samples) / 1000
+            failed = self._random.random() < spec.get('error_rate', 0)
+        self.sleep(latency)
+        if failed:
+            raise ProviderError(f"Replayed {call} failure")
+
+    def history(self, ticker, start=None):
+        self._replay('history')
+        return self.inner.history(ticker, start=start)
+
+    def download(self, tickers, start=None):
+        self._replay('download')
+        return self.inner.download(tickers, start=start)
+
+    def info(self, ticker):
+        self._replay('info')
+        return self.inner.info(ticker)
+
+    def quotes(self, tickers, fields):
+        self._replay('quotes')
+        return self.inner.quotes(tickers, fields)
+
+    def profiles(self, tickers, fields):
+        self._replay('profiles')
+        return self.inner.profiles(tickers, fields)
+
+
+class RecordingProvider(MarketDataProvider):
+    """Wraps another provider and records per-call latency and errors"""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.calls = {}
+
+    def _record(self, call, fn, *args, **kwargs):
+        stats = self.calls.setdefault(call, {'latency_ms': [], 'errors': 0})
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            stats['errors'] += 1
+            raise
+        finally:
+            stats['latency_ms'].append(round((time.perf_counter() - started) * 1000, 1))
+
+    def history(self, ticker, start=None):
+        return self._record('history', self.inner.history, ticker, start=start)
+
+    def download(self, tickers, start=None):
+        return self._record('download', self.inner.download, tickers, start=start)
+
+    def info(self, ticker):
+        return self._record('info', self.inner.info, ticker)
+
+    def quotes(self, tickers, fields):
+        return self._record('quotes', self.inner.quotes, tickers, fields)
+
+    def profiles(self, tickers, fields):
+        return self._record('profiles', self.inner.profiles, tickers, fields)
+
+    def profile(self):
+        """Latency/error profile in the format ReplayProvider expects"""
+        return {
+            call: {
+                'latency_ms': stats['latency_ms'],
+                'error_rate': stats['errors'] / len(stats['latency_ms']),
+            }
+            for call, stats in self.calls.items() if stats['latency_ms']
+        }
+
+
+def record_fixtures(tickers, out_dir, provider=None):
+    """Record histories, info and a latency profile for offline replay"""
+    recorder = RecordingProvider(provider or YFinanceProvider())
+    os.makedirs(os.path.join(out_dir, 'history'), exist_ok=True)
+    os.makedirs(os.path.join(out_dir, 'info'), exist_ok=True)
+    recorder.download(tickers)
+    for ticker in tickers:
+        try:
+            history = recorder.history(ticker)
+            history.to_parquet(os.path.join(out_dir, 'history', _fixture_name(ticker) + '.parquet'))
+            info = recorder.info(ticker)
+            with open(os.path.join(out_dir, 'info', _fixture_name(ticker) + '.json'), 'w') as f:
+                json.dump(info, f, default=str)
+            print(f"✅ Recorded {ticker}: {len(history)} bars")
+        except Exception as e:
+            print(f"❌ Failed to record {ticker}: {e}")
+    with open(os.path.join(out_dir, 'profile.json'), 'w') as f:
+        json.dump(recorder.profile(), f)
+    return recorder.profile()
+
+
+def get_provider():
+    """Build the provider selected by the MARKET_DATA_* environment variables"""
+    backend = os.getenv('MARKET_DATA_PROVIDER', 'yfinance').lower()
+    if backend == 'yfinance':
+        return YFinanceProvider()
+    fixtures = os.getenv('MARKET_DATA_FIXTURES', 'fixtures')
+    if backend == 'fixture':
+        return FixtureProvider(fixtures)
+    if backend == 'replay':
+        profile = os.getenv('MARKET_DATA_REPLAY_PROFILE', os.path.join(fixtures, 'profile.json'))
+        return ReplayProvider.from_file(FixtureProvider(fixtures), profile)
+    raise ValueError(f"Unknown MARKET_DATA_PROVIDER: {backend}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record market data fixtures for offline runs")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    record = subparsers.add_parser('record')
+    record.add_argument('tickers', nargs='+')
+    record.add_argument('--out', default='fixtures')
+    args = parser.parse_args()
+    record_fixtures(args.tickers, args.out)
@@ -0,0 +1,186 @@
+import functools
+import os
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+
+
+class Timings:
+    """Wall-clock durations per label, keeping the last `window` samples of each"""
+
+    def __init__(self, window=200):
+        self.window = window
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+        self._lock = threading.Lock()
+
+    def record(self, label, seconds):
+        with self._lock:
+            self._samples[label].append(seconds)
+
+    @contextmanager
+    def timed(self, label):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(label, time.perf_counter() - started)
+
+    def stats(self):
+        with self._lock:
+            samples = {label: np.array(values) * 1000 for label, values in self._samples.items() if values}
+        return {
+            label: {
+                'count': len(ms),
+                'last_ms': round(float(ms[-1]), 1),
+                'p50_ms': round(float(np.percentile(ms, 50)), 1),
+                'p95_ms': round(float(np.percentile(ms, 95)), 1),
+            }
+            for label, ms in samples.items()
+        }
+
+
+class Prefetcher:
+    """Warms the caches of the view a user is likely to open next.
+
+    Navigation between views is counted process-wide, so the prediction
+    for a view is whichever view users most often went to from it (its
+    successor in `views` until anything has been observed). Warm-ups run
+    on one background thread after the active view has rendered, and a
+    view is warmed at most once per `ttl` seconds.
+    """
+
+    def __init__(self, views, warmers, ttl=60):
+        self.views = list(views)
+        self.warmers = warmers
+        self.ttl = ttl
+        self.transitions = defaultdict(lambda: defaultdict(int))
+        self._warmed = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='prefetch')
+
+    def visit(self, previous, view):
+        if previous is not None and previous != view:
+            with self._lock:
+                self.transitions[previous][view] += 1
+
+    def predict(self, view):
+        with self._lock:
+            counts = self.transitions.get(view)
+            if counts:
+                return max(counts, key=counts.get)
+        return self.views[(self.views.index(view) + 1) % len(self.views)]
+
+    def hint(self, view, allowed=None, wrap=None):
+        """Warm the predicted next view in the background; returns it if a warm-up was queued"""
+        target = self.predict(view)
+        warmer = self.warmers.get(target)
+        with self._lock:
+            if warmer is None or (allowed is not None and target not in allowed):
+                return None
+            if time.time() - self._warmed.get(target, 0) < self.ttl:
+                return None
+            self._warmed[target] = time.time()
+        self._executor.submit(self._warm, target, wrap(warmer) if wrap else warmer)
+        return target
+
+    def _warm(self, view, warmer):
+        started = time.perf_counter()
+        try:
+            warmer()
+            print(f"🔮 Prefetched {view} in {(time.perf_counter() - started) * 1000:.0f} ms")
+        except Exception as e:
+            print(f"⚠️ Prefetching {view} failed: {e}")
+
+    def stats(self):
+        with self._lock:
+            return {
+                'transitions': {view: dict(counts) for view, counts in self.transitions.items()},
+                'warmed': {view: round(time.time() - at) for view, at in self._warmed.items()},
+            }
+
+
+class CallCounter:
+    """Counts calls to this repo's functions per script run or fragment rerun.
+
+    `start(label)`/`stop()` bracket a whole run and `counting(label)` (or the
+    `counted` decorator) brackets a fragment; scopes nest, so a full run's
+    count includes the fragments it renders, while a fragment rerun only
+    counts the fragment. Calls are seen through a profiler hook on the
+    script thread (worker threads are not counted), which slows the run
+    down, so the counter does nothing unless `enabled`.
+    """
+
+    def __init__(self, root=None, enabled=False, window=50):
+        self.root = os.path.abspath(root or os.path.dirname(__file__)) + os.sep
+        self.enabled = enabled
+        self.window = window
+        self._counts = defaultdict(lambda: deque(maxlen=self.window))
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _hook(self, frame, event, arg):
+        if event == 'call':
+            filename = frame.f_code.co_filename
+            if filename.startswith(self.root) and 'site-packages' not in filename:
+                self._local.calls += 1
+
+    def start(self, label):
+        if not self.enabled:
+            return
+        # A run stopped by st.rerun/st.stop never reached stop(); start afresh
+        self._local.calls = 0
+        self._local.scopes = [(label, 0)]
+        sys.setprofile(self._hook)
+
+    def stop(self):
+        if not self.enabled or not getattr(self._local, 'scopes', None):
+            return
+        sys.setprofile(None)
+        label, started = self._local.scopes.pop()
+        self._record(label, self._local.calls - started)
+        self._local.scopes = []
+
+    def _record(self, label, calls):
+        with self._lock:
+            self._counts[label].append(calls)
+
+    @contextmanager
+    def counting(self, label):
+        if not self.enabled:
+            yield
+            return
+        outer = bool(getattr(self._local, 'scopes', None))
+        if outer:
+            self._local.scopes.append((label, self._local.calls))
+        else:
+            self.start(label)
+        try:
+            yield
+        finally:
+            if outer:
+                label, started = self._local.scopes.pop()
+                self._record(label, self._local.calls - started)
+            else:
+                self.stop()
+
+    def counted(self, label):
+        """Decorator form of `counting`"""
+        def decorate(fn):
+            @functools.wraps(fn)
+            def run(*args, **kwargs):
+                with self.counting(label):
+                    return fn(*args, **kwargs)
+            return run
+        return decorate
+
+    def stats(self):
+        with self._lock:
+            return {
+                label: {'runs': len(counts), 'last_calls': counts[-1], 'median_calls': int(np.median(counts))}
+                for label, counts in self._counts.items() if counts
+            }
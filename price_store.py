@@ -0,0 +1,274 @@
+import os
+import re
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from market_data import ACTION_COLUMNS, OHLCV_COLUMNS, ProviderError, YFinanceProvider, normalize_history
+
+DEFAULT_STORE_DIR = os.getenv('PRICE_STORE_DIR', os.path.join('data', 'prices'))
+
+# Calendar offsets for the yfinance-style period strings used by the charts
+PERIOD_OFFSETS = {
+    "1d": pd.DateOffset(days=1),
+    "5d": pd.DateOffset(days=5),
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "3y": pd.DateOffset(years=3),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+
+# Selector labels used across the dashboard, mapped to yfinance-style periods
+PERIOD_ALIASES = {
+    "1D": "1d", "5D": "5d", "1M": "1mo", "3M": "3mo", "6M": "6mo",
+    "YTD": "ytd", "1Y": "1y", "5Y": "5y", "All": "max",
+}
+
+
+def period_start(period, last_date):
+    """First date covered by a period (yfinance-style or selector label) ending at `last_date`"""
+    period = PERIOD_ALIASES.get(period, period)
+    if period in (None, "max"):
+        return None
+    if period == "ytd":
+        return pd.Timestamp(year=last_date.year, month=1, day=1)
+    if period not in PERIOD_OFFSETS:
+        raise ValueError(f"Unknown period: {period}")
+    return last_date - PERIOD_OFFSETS[period]
+
+
+def frame_version(data):
+    """Cheap content version of a price frame, for memoizing derived results"""
+    if data.empty:
+        return (tuple(data.columns), 0)
+    last_row = tuple(np.round(data.iloc[-1].to_numpy(dtype='float64', na_value=np.nan), 6))
+    return (tuple(data.columns), len(data), str(data.index[0]), str(data.index[-1]), last_row)
+
+
+def slice_period(data, period):
+    """Trailing `period` of a date-indexed frame as a positional slice (no copy)"""
+    if data.empty:
+        return data
+    start = period_start(period, data.index[-1])
+    if start is None:
+        return data
+    return data.iloc[data.index.searchsorted(start):]
+
+
+def has_corporate_action(bars, after):
+    """True if `bars` report a dividend or split dated after `after`"""
+    columns = [col for col in ACTION_COLUMNS if col in bars.columns]
+    actions = bars.loc[bars.index > after, columns].fillna(0).to_numpy()
+    return bool((actions != 0).any())
+
+
+def _gap(stored, bars):
+    # The part of freshly fetched `bars` that is new or restated relative to `stored`
+    if stored.empty:
+        return bars
+    bars = bars[bars.index >= stored.index[-1]]
+    # Skip the write when the newest bar is unchanged
+    if len(bars) == 1 and bars[OHLCV_COLUMNS].iloc[0].equals(stored.iloc[-1]):
+        return bars.iloc[0:0]
+    return bars
+
+
+class PriceStore:
+    """On-disk daily OHLCV store with one append-only Parquet directory per ticker.
+
+    Every gap-fill writes a new segment holding only the bars at or after the
+    last stored date, so the network is only asked for what we don't have.
+    Reads merge the segments with last-write-wins on duplicate dates, which
+    lets the newest fetch restate a partially-traded final bar.
+
+    Bars are dividend/split-adjusted, and the provider re-adjusts every
+    earlier bar when a corporate action goes ex. When the gap since the
+    last stored bar contains one, the ticker's whole history is fetched
+    again and replaces what is stored instead of being appended to it.
+    """
+
+    def __init__(self, root=DEFAULT_STORE_DIR, provider=None, refresh_interval=900, max_segments=16):
+        self.root = root
+        self.provider = provider or YFinanceProvider()
+        self.refresh_interval = refresh_interval
+        self.max_segments = max_segments
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self._checked = {}
+        os.makedirs(self.root, exist_ok=True)
+
+    def _lock(self, ticker):
+        with self._locks_guard:
+            return self._locks.setdefault(ticker, threading.RLock())
+
+    def _ticker_dir(self, ticker):
+        return os.path.join(self.root, re.sub(r'[^A-Za-z0-9._-]', '_', ticker))
+
+    def _segments(self, ticker):
+        path = self._ticker_dir(ticker)
+        if not os.path.isdir(path):
+            return []
+        return sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.startswith('part-') and name.endswith('.parquet')
+        )
+
+    def load(self, ticker):
+        """Read every stored bar for a ticker without touching the network"""
+        segments = self._segments(ticker)
+        if not segments:
+            return normalize_history(None)
+        data = pd.concat([pd.read_parquet(path) for path in segments])
+        data = data[~data.index.duplicated(keep='last')].sort_index()
+        return data[OHLCV_COLUMNS]
+
+    def append(self, ticker, bars):
+        """Write `bars` as a new segment, compacting past `max_segments`; returns rows written"""
+        if bars.empty:
+            return 0
+        path = self._ticker_dir(ticker)
+        os.makedirs(path, exist_ok=True)
+        segments = self._segments(ticker)
+        number = int(os.path.basename(segments[-1])[5:10]) + 1 if segments else 0
+        segment = os.path.join(path, f"part-{number:05d}.parquet")
+        tmp_path = segment + '.tmp'
+        bars[OHLCV_COLUMNS].to_parquet(tmp_path)
+        os.replace(tmp_path, segment)
+        # Intraday refreshes each add a segment; keep reads from growing without bound
+        if len(segments) + 1 > self.max_segments:
+            self.compact(ticker)
+        return len(bars)
+
+    def _replace(self, ticker, data):
+        # Store `data` as the ticker's only segment. Later segments go first, so
+        # a crash part-way leaves an older prefix that the next update gap-fills.
+        path = self._ticker_dir(ticker)
+        os.makedirs(path, exist_ok=True)
+        first = os.path.join(path, 'part-00000.parquet')
+        tmp_path = first + '.tmp'
+        data[OHLCV_COLUMNS].to_parquet(tmp_path)
+        for segment in self._segments(ticker):
+            if segment != first:
+                os.remove(segment)
+        os.replace(tmp_path, first)
+        return len(data)
+
+    def rewrite(self, ticker, bars):
+        """Replace a ticker's stored history with `bars`; returns the number of rows written"""
+        if bars.empty:
+            return 0
+        with self._lock(ticker):
+            return self._replace(ticker, bars)
+
+    def compact(self, ticker):
+        """Merge all segments of a ticker into a single one"""
+        with self._lock(ticker):
+            if len(self._segments(ticker)) > 1:
+                self._replace(ticker, self.load(ticker))
+
+    def expire(self, ticker=None):
+        """Force the next read of `ticker` (or every ticker) to gap-fill"""
+        if ticker is None:
+            self._checked.clear()
+        else:
+            self._checked.pop(ticker, None)
+
+    def last_date(self, ticker):
+        data = self.load(ticker)
+        return data.index[-1] if not data.empty else None
+
+    def update(self, ticker, force=False):
+        """Gap-fill a ticker from its last stored bar; returns rows appended"""
+        with self._lock(ticker):
+            checked = self._checked.get(ticker)
+            if not force and checked and time.time() - checked < self.refresh_interval:
+                return 0
+            stored = self.load(ticker)
+            start = stored.index[-1] if not stored.empty else None
+            bars = self.provider.history(ticker, start=start)
+            if start is not None and has_corporate_action(bars, start):
+                print(f"🔄 Corporate action for {ticker} since {start.date()}, refetching its history")
+                written = self.rewrite(ticker, self.provider.history(ticker))
+            else:
+                written = self.append(ticker, _gap(stored, bars))
+            self._checked[ticker] = time.time()
+            return written
+
+    def _fetch_many(self, tickers, start):
+        download = getattr(self.provider, 'download', None)
+        if download is not None:
+            return download(tickers, start=start)
+        frames = {}
+        for ticker in tickers:
+            # One unknown symbol must not fail the whole batch
+            try:
+                frames[ticker] = self.provider.history(ticker, start=start)
+            except ProviderError as e:
+                print(f"⚠️ No history for {ticker}: {e}")
+        return frames
+
+    def update_many(self, tickers, force=False):
+        """Gap-fill several tickers with a single provider request.
+
+        The request starts at the oldest last-stored date among the stale
+        tickers (or covers the full history if any ticker is new) and each
+        ticker keeps only the bars at or after its own last stored date,
+        unless a corporate action means its history has to be refetched.
+        """
+        now = time.time()
+        stale = [
+            ticker for ticker in dict.fromkeys(tickers)
+            if force or not self._checked.get(ticker)
+            or now - self._checked[ticker] >= self.refresh_interval
+        ]
+        if not stale:
+            return {}
+        stored = {ticker: self.load(ticker) for ticker in stale}
+        starts = {ticker: data.index[-1] if not data.empty else None for ticker, data in stored.items()}
+        start = None if None in starts.values() else min(starts.values())
+        frames = self._fetch_many(stale, start)
+        # Tickers with a dividend or split in their gap are refetched in full
+        restated = [
+            ticker for ticker in stale if starts[ticker] is not None
+            and has_corporate_action(frames.get(ticker, normalize_history(None)), starts[ticker])
+        ]
+        if restated:
+            print(f"🔄 Corporate actions for {', '.join(restated)}, refetching their histories")
+            frames.update(self._fetch_many(restated, None))
+        written = {}
+        for ticker in stale:
+            with self._lock(ticker):
+                bars = frames.get(ticker, normalize_history(None))
+                if ticker in restated:
+                    written[ticker] = self.rewrite(ticker, bars)
+                else:
+                    written[ticker] = self.append(ticker, _gap(stored[ticker], bars))
+                self._checked[ticker] = now
+        return written
+
+    def history_many(self, tickers, period="max", field='Close'):
+        """One aligned wide frame (dates x tickers) of `field`, gap-filled in one request"""
+        try:
+            self.update_many(tickers)
+        except Exception as e:
+            print(f"⚠️ Batched price update failed for {', '.join(tickers)}: {e}")
+        columns = {ticker: self.load(ticker)[field] for ticker in dict.fromkeys(tickers)}
+        wide = pd.DataFrame(columns, columns=list(columns))
+        wide.index.name = 'Date'
+        return slice_period(wide, period)
+
+    def history(self, ticker, period="max"):
+        """Stored bars for a yfinance-style period, gap-filled first"""
+        try:
+            self.update(ticker)
+        except Exception as e:
+            # Serve whatever is on disk when the provider is unreachable
+            print(f"⚠️ Price update failed for {ticker}: {e}")
+        return slice_period(self.load(ticker), period)
@@ -0,0 +1,136 @@
+import math
+import threading
+import time
+from dataclasses import dataclass, fields
+
+# Quote attribute -> Yahoo Finance info key
+QUOTE_FIELDS = {
+    'name': 'longName',
+    'price': 'regularMarketPrice',
+    'previous_close': 'regularMarketPreviousClose',
+    'open': 'regularMarketOpen',
+    'bid': 'bid',
+    'ask': 'ask',
+    'day_low': 'dayLow',
+    'day_high': 'dayHigh',
+    'year_low': 'fiftyTwoWeekLow',
+    'year_high': 'fiftyTwoWeekHigh',
+    'volume': 'volume',
+    'average_volume': 'averageVolume',
+    'net_assets': 'totalAssets',
+    'nav': 'navPrice',
+    'pe_ratio': 'trailingPE',
+    'dividend_yield': 'yield',
+    'ytd_return': 'ytdReturn',
+    'expense_ratio': 'annualReportExpenseRatio',
+}
+
+# Fund profile fields: slow-changing, and not served by batched quote endpoints
+PROFILE_FIELDS = ('net_assets', 'nav', 'pe_ratio', 'dividend_yield', 'expense_ratio')
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+@dataclass(frozen=True, slots=True)
+class Quote:
+    """Compact quote snapshot for one ticker; missing numbers are NaN"""
+    symbol: str
+    name: str
+    price: float
+    previous_close: float
+    open: float
+    bid: float
+    ask: float
+    day_low: float
+    day_high: float
+    year_low: float
+    year_high: float
+    volume: float
+    average_volume: float
+    net_assets: float
+    nav: float
+    pe_ratio: float
+    dividend_yield: float
+    ytd_return: float
+    expense_ratio: float
+
+    @classmethod
+    def from_info(cls, symbol, info):
+        """Project a provider info dict down to the quote fields"""
+        values = {
+            attr: _to_float(info.get(key)) for attr, key in QUOTE_FIELDS.items() if attr != 'name'
+        }
+        return cls(symbol=symbol, name=info.get('longName') or symbol, **values)
+
+    @classmethod
+    def missing(cls, symbol):
+        return cls.from_info(symbol, {})
+
+    def has(self, attr):
+        """True when a numeric field was provided"""
+        return not math.isnan(getattr(self, attr))
+
+
+QUOTE_NUMERIC_FIELDS = tuple(f.name for f in fields(Quote) if f.name not in ('symbol', 'name'))
+
+
+class QuoteService:
+    """Batched quote snapshots for the tracked tickers, shared process-wide.
+
+    One provider request fetches only the quote fields for every tracked
+    ticker; the large info dicts are dropped as soon as they are projected.
+    Fund profile fields the quote request leaves empty are fetched with a
+    separate `profiles` request, only for the tickers missing them, and
+    reused for `profile_ttl` seconds.
+    """
+
+    def __init__(self, provider, tickers, profile_ttl=6 * 3600):
+        self.provider = provider
+        self.tickers = list(dict.fromkeys(tickers))
+        self.profile_ttl = profile_ttl
+        self._profiles = {}
+        self._lock = threading.Lock()
+
+    def _profile(self, raw):
+        # Profile fields for every ticker, refreshing those that are missing and stale
+        keys = [QUOTE_FIELDS[attr] for attr in PROFILE_FIELDS]
+        now = time.time()
+        with self._lock:
+            stale = [
+                ticker for ticker in self.tickers
+                if any(raw.get(ticker, {}).get(key) is None for key in keys)
+                and now - self._profiles.get(ticker, (0, {}))[0] >= self.profile_ttl
+            ]
+        if stale:
+            try:
+                fetched = self.provider.profiles(stale, keys)
+            except Exception as e:
+                print(f"⚠️ Fund profile fetch failed for {', '.join(stale)}: {e}")
+                fetched = {}
+            with self._lock:
+                for ticker in stale:
+                    if ticker in fetched:
+                        self._profiles[ticker] = (now, fetched[ticker])
+        with self._lock:
+            return {ticker: profile for ticker, (_, profile) in self._profiles.items()}
+
+    def fetch(self):
+        """Fresh snapshot of every tracked ticker, keyed by symbol"""
+        raw = self.provider.quotes(self.tickers, list(QUOTE_FIELDS.values()))
+        profiles = self._profile(raw)
+        snapshot = {}
+        for ticker in self.tickers:
+            if ticker not in raw:
+                snapshot[ticker] = Quote.missing(ticker)
+                continue
+            info = dict(raw[ticker])
+            for key, value in profiles.get(ticker, {}).items():
+                if info.get(key) is None:
+                    info[key] = value
+            snapshot[ticker] = Quote.from_info(ticker, info)
+        return snapshot
@@ -0,0 +1,205 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from ingest import DEFAULT_WORKBOOKS, REFERENCE_WORKBOOK, workbook_etf
+from workbook import WorkbookReader
+
+# Sheet of the reference workbook that lists the ETF universe (one row per ETF)
+UNIVERSE_SHEET = 'ETF Universe'
+NUMERIC_COLUMNS = ['AUM (M)', 'Expense Ratio', 'YTD Return', '1-Year Return', '3-Year Return']
+RISK_LEVELS = ['Low', 'Medium', 'High']
+
+# Used until the reference workbook carries an ETF Universe sheet; percent
+# figures are floats (0.45 means 0.45%) with NaN where a fund has no figure
+DEFAULT_UNIVERSE = pd.DataFrame({
+    'ETF': ['SPUS', 'SPWO', 'UMMA', 'HLAL', 'ISDU', 'ISDE', 'WSHR'],
+    'Yahoo Ticker': ['SPUS', 'SPWO', 'UMMA', 'HLAL', 'ISDU.L', 'ISDE.L', 'WSHR.NE'],
+    'Full Name': [
+        'SP Funds S&P 500 Sharia Industry Exclusions ETF',
+        'SP Funds Dow Jones World ETF',
+        'UMMA Islamic Values ETF',
+        'Wahed FTSE USA Shariah ETF',
+        'iShares MSCI USA Islamic UCITS ETF',
+        'iShares MSCI World Islamic UCITS ETF',
+        'Wealthsimple Shariah World Equity Index ETF'
+    ],
+    'Focus': [
+        'US Large Cap',
+        'Global Equity',
+        'Global Islamic',
+        'US All Cap',
+        'US Islamic',
+        'Global Islamic',
+        'Global Islamic'
+    ],
+    'AUM (M)': [1101, 36.50, 245.86, 595.45, 325.50, 36.50, 313.70],
+    'Expense Ratio': [0.45, 0.55, 0.50, 0.50, 0.60, 0.60, 0.64],
+    'Shariah Advisory': [
+        'Ratings Intelligence',
+        'Ratings Intelligence',
+        'Yasaar Limited',
+        'Yasaar Limited',
+        'Amanie Advisors',
+        'Amanie Advisors',
+        'Ratings Intelligence'
+    ],
+    'Risk': ['Low', 'High', 'Medium', 'Low', 'Medium', 'Medium', 'High'],
+    'YTD Return': [3.40, 1.07, 2.80, 1.90, 2.45, 2.10, 2.30],
+    '1-Year Return': [26.70, 14.11, 20.50, 17.10, 22.45, 18.89, 14.01],
+    '3-Year Return': [14.90, np.nan, np.nan, 11.30, 14.14, 10.50, np.nan],
+    'Investment Style': [
+        'Large Cap Value',
+        'Global Equity',
+        'Global Islamic',
+        'US All Cap',
+        'US Islamic',
+        'Global Islamic',
+        'Global Islamic'
+    ],
+    'Screening Method': [
+        'AAOIFI Standards',
+        'AAOIFI Standards',
+        'Custom Islamic',
+        'FTSE Shariah',
+        'MSCI Islamic',
+        'MSCI Islamic',
+        'Custom Islamic'
+    ],
+    'Rebalancing': [
+        'Quarterly',
+        'Quarterly',
+        'Semi-Annual',
+        'Quarterly',
+        'Quarterly',
+        'Quarterly',
+        'Semi-Annual'
+    ],
+    'Key Features': [
+        'Low cost, S&P 500 based',
+        'Global diversification',
+        'ESG integration',
+        'US market focus',
+        'MSCI methodology',
+        'Global exposure',
+        'ESG focused'
+    ]
+})
+OVERVIEW_COLUMNS = ['ETF', 'Full Name', 'Focus', 'AUM (M)', 'Expense Ratio', 'Shariah Advisory',
+                    'YTD Return', '1-Year Return', '3-Year Return']
+APPROACH_COLUMNS = ['ETF', 'Investment Style', 'Screening Method', 'Rebalancing', 'Key Features']
+
+
+def _percent(column):
+    # '0.45%' / 0.45 -> 0.45; 'N/A' and blanks -> NaN
+    if not pd.api.types.is_numeric_dtype(column):
+        column = column.astype(str).str.strip().str.rstrip('%')
+    return pd.to_numeric(column, errors='coerce').astype('float64')
+
+
+def read_universe(path=REFERENCE_WORKBOOK):
+    """The reference workbook's ETF Universe sheet, or DEFAULT_UNIVERSE if it has none"""
+    if os.path.exists(path):
+        with WorkbookReader(path) as reader:
+            if UNIVERSE_SHEET in reader.sheet_names:
+                universe = reader.sheet(UNIVERSE_SHEET)
+                universe.columns = [str(column).strip() for column in universe.columns]
+                return universe
+    return DEFAULT_UNIVERSE
+
+
+class ETFRegistry:
+    """The ETF universe, parsed once and indexed for lookups and range filters.
+
+    Rows are typed when the registry is built (floats with NaN for
+    missing figures). `get(ticker)` is a dict lookup, and each numeric
+    column has a precomputed sort order, so `between('Expense Ratio', hi=0.6)`
+    is two binary searches plus a slice however large the universe is.
+    Details workbooks are matched to tickers so `workbook(ticker)` says
+    where an ETF's holdings come from; workbooks for ETFs missing from the
+    universe are listed in `unlisted`.
+    """
+
+    def __init__(self, universe, workbooks=None):
+        frame = universe.copy()
+        frame['ETF'] = frame['ETF'].astype(str).str.strip().str.upper()
+        frame = frame.drop_duplicates('ETF', keep='last').reset_index(drop=True)
+        if 'Yahoo Ticker' not in frame.columns:
+            frame['Yahoo Ticker'] = frame['ETF']
+        frame['Yahoo Ticker'] = frame['Yahoo Ticker'].where(frame['Yahoo Ticker'].notna(), frame['ETF'])
+        for column in NUMERIC_COLUMNS:
+            frame[column] = _percent(frame[column]) if column in frame.columns else np.nan
+        self.frame = frame
+        self._rows = {ticker: i for i, ticker in enumerate(frame['ETF'])}
+        self._sorted = {}
+        for column in NUMERIC_COLUMNS:
+            values = frame[column].to_numpy()
+            present = np.flatnonzero(~np.isnan(values))
+            order = present[np.argsort(values[present], kind='stable')]
+            self._sorted[column] = (values[order], frame['ETF'].to_numpy()[order])
+        self._workbooks = {}
+        self.unlisted = []
+        for path in workbooks if workbooks is not None else DEFAULT_WORKBOOKS:
+            ticker = workbook_etf(path)
+            if ticker is None:
+                continue
+            if ticker in self._rows:
+                self._workbooks[ticker] = path
+            else:
+                self.unlisted.append(ticker)
+
+    @classmethod
+    def load(cls, path=REFERENCE_WORKBOOK, workbooks=None):
+        registry = cls(read_universe(path), workbooks)
+        print(f"✅ Loaded ETF registry: {len(registry)} ETFs"
+              + (f" (workbooks without metadata: {', '.join(registry.unlisted)})" if registry.unlisted else ""))
+        return registry
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, ticker):
+        return ticker in self._rows
+
+    @property
+    def tickers(self):
+        return list(self.frame['ETF'])
+
+    def get(self, ticker):
+        """One ETF's row as a dict, or None"""
+        row = self._rows.get(ticker)
+        return None if row is None else self.frame.iloc[row].to_dict()
+
+    def value(self, ticker, column):
+        return self.frame.at[self._rows[ticker], column]
+
+    def yahoo_ticker(self, ticker):
+        return self.value(ticker, 'Yahoo Ticker')
+
+    @property
+    def yahoo_tickers(self):
+        return dict(zip(self.frame['ETF'], self.frame['Yahoo Ticker']))
+
+    def workbook(self, ticker):
+        return self._workbooks.get(ticker)
+
+    def between(self, column, lo=None, hi=None):
+        """Tickers with lo <= column <= hi (inclusive, either bound optional), in ascending order"""
+        values, tickers = self._sorted[column]
+        start = 0 if lo is None else np.searchsorted(values, lo, side='left')
+        stop = len(values) if hi is None else np.searchsorted(values, hi, side='right')
+        return tickers[start:stop].tolist()
+
+    def in_order(self, tickers):
+        """`tickers` in the registry's listing order"""
+        return sorted(tickers, key=self._rows.__getitem__)
+
+    def columns(self, columns):
+        """The universe restricted to `columns` (missing ones filled with None)"""
+        return self.frame.reindex(columns=columns)
+
+    def by_risk(self, level):
+        if 'Risk' not in self.frame.columns:
+            return []
+        return self.frame.loc[self.frame['Risk'] == level, 'ETF'].tolist()
@@ -0,0 +1,93 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+
+def _years_back(years):
+    return lambda as_of: as_of - pd.DateOffset(years=years)
+
+
+def _months_back(months):
+    return lambda as_of: as_of - pd.DateOffset(months=months)
+
+
+def _prior_year_end(as_of):
+    return as_of.to_period('Y').to_timestamp() - pd.Timedelta(days=1)
+
+
+# Horizon name -> function mapping each ticker's as-of dates to its start dates.
+# None means since inception (the first available price).
+HORIZONS = {
+    '1M': _months_back(1),
+    '3M': _months_back(3),
+    'YTD': _prior_year_end,
+    '1Y': _years_back(1),
+    '3Y': _years_back(3),
+    '5Y': _years_back(5),
+    'Since Inception': None,
+}
+
+TrailingReturns = namedtuple('TrailingReturns', ['returns', 'start_prices', 'end_prices'])
+
+
+def compute_trailing(prices, horizons=None):
+    """Trailing returns for every ticker x horizon in one vectorized pass.
+
+    `prices` is a wide frame of close prices (dates x tickers, NaN where a
+    ticker has no bar). Each ticker is measured from its own last price; a
+    horizon starts at the last bar on or before the calendar start date,
+    found with `searchsorted`. Horizons longer than a ticker's history are
+    NaN rather than silently falling back to the first price.
+
+    Returns percent returns plus the start prices (tickers x horizons) and
+    end prices (per ticker) they were computed from.
+    """
+    horizons = HORIZONS if horizons is None else horizons
+    tickers = list(prices.columns)
+    names = list(horizons)
+    values = prices.to_numpy(dtype='float64', na_value=np.nan)
+    n_rows = len(values)
+    if n_rows == 0 or not tickers:
+        empty = pd.DataFrame(np.nan, index=tickers, columns=names)
+        return TrailingReturns(empty, empty.copy(), pd.Series(np.nan, index=tickers))
+
+    valid = ~np.isnan(values)
+    has_data = valid.any(axis=0)
+    first_pos = valid.argmax(axis=0)
+    last_pos = n_rows - 1 - valid[::-1].argmax(axis=0)
+    # Row of the latest valid price at or before each row (forward fill by position)
+    filled_pos = np.maximum.accumulate(np.where(valid, np.arange(n_rows)[:, None], -1), axis=0)
+
+    columns = np.arange(len(tickers))
+    end_prices = values[last_pos, columns]
+    dates = prices.index.values
+    as_of = pd.DatetimeIndex(dates[last_pos])
+
+    start_prices = np.full((len(tickers), len(names)), np.nan)
+    for j, name in enumerate(names):
+        to_start = horizons[name]
+        if to_start is None:
+            start_prices[:, j] = values[first_pos, columns]
+            continue
+        targets = pd.DatetimeIndex(to_start(as_of)).values
+        rows = np.searchsorted(dates, targets, side='right') - 1
+        in_range = rows >= first_pos
+        source = filled_pos[np.clip(rows, 0, None), columns]
+        start_prices[:, j] = np.where(in_range, values[np.clip(source, 0, None), columns], np.nan)
+
+    start_prices[~has_data] = np.nan
+    end_prices = np.where(has_data, end_prices, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = (end_prices[:, None] / start_prices - 1.0) * 100.0
+
+    return TrailingReturns(
+        pd.DataFrame(returns, index=tickers, columns=names),
+        pd.DataFrame(start_prices, index=tickers, columns=names),
+        pd.Series(end_prices, index=tickers),
+    )
+
+
+def trailing_returns(prices, horizons=None):
+    """Percent trailing returns as a numeric tickers x horizons frame"""
+    return compute_trailing(prices, horizons).returns
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+RISK_COLUMNS = ['Beta', 'Volatility (%)', 'Sharpe', 'Sortino', 'Max Drawdown (%)', 'Tracking Error (%)']
+
+
+def _ffill(values):
+    # Forward-fill NaNs down each column (leading NaNs stay NaN)
+    return pd.DataFrame(values).ffill().to_numpy().reshape(values.shape)
+
+
+def risk_metrics(prices, benchmark='^GSPC', risk_free_rate=0.0):
+    """Risk metrics for every ticker in a wide close-price frame at once.
+
+    `prices` is dates x tickers and must include the `benchmark` column.
+    Daily returns are computed once, each column against its own previous
+    bar (so a holiday in one market does not drop the next day's return
+    from the union-of-dates frame); each ticker's beta and tracking error
+    use only the days where both it and the benchmark traded, via masked
+    matrix operations rather than a per-ticker loop. `risk_free_rate` is
+    annual (0.04 for 4%). Returns a tickers x RISK_COLUMNS float frame.
+    """
+    tickers = [ticker for ticker in prices.columns if ticker != benchmark]
+    values = prices[tickers].to_numpy(dtype='float64', na_value=np.nan)
+    bench = prices[benchmark].to_numpy(dtype='float64', na_value=np.nan)
+    if len(values) < 3:
+        return pd.DataFrame(np.nan, index=tickers, columns=RISK_COLUMNS)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Dividing by the forward-filled previous price gives each column's
+        # returns on its own bars, aligned on the date of the later bar
+        returns = values[1:] / _ffill(values)[:-1] - 1.0
+        bench_returns = bench[1:] / _ffill(bench)[:-1] - 1.0
+        daily_rf = risk_free_rate / TRADING_DAYS
+
+        # Own-history statistics
+        own = ~np.isnan(returns)
+        own_count = own.sum(axis=0)
+        own_values = np.where(own, returns, 0.0)
+        own_mean = own_values.sum(axis=0) / own_count
+        own_dev = np.where(own, returns - own_mean, 0.0)
+        own_std = np.sqrt((own_dev ** 2).sum(axis=0) / (own_count - 1))
+        excess = np.where(own, returns - daily_rf, 0.0)
+        downside = np.sqrt((np.minimum(excess, 0.0) ** 2).sum(axis=0) / own_count)
+
+        # Statistics against the benchmark on common trading days
+        both = own & ~np.isnan(bench_returns)[:, None]
+        both_count = both.sum(axis=0)
+        r = np.where(both, returns, 0.0)
+        b = np.where(both, bench_returns[:, None], 0.0)
+        r_dev = np.where(both, r - r.sum(axis=0) / both_count, 0.0)
+        b_dev = np.where(both, b - b.sum(axis=0) / both_count, 0.0)
+        covariance = (r_dev * b_dev).sum(axis=0) / (both_count - 1)
+        bench_variance = (b_dev ** 2).sum(axis=0) / (both_count - 1)
+        active = np.where(both, r - b, 0.0)
+        active_dev = np.where(both, active - active.sum(axis=0) / both_count, 0.0)
+        tracking_error = np.sqrt((active_dev ** 2).sum(axis=0) / (both_count - 1))
+
+        # Drawdown from the running peak, ignoring missing bars
+        peaks = np.fmax.accumulate(values, axis=0)
+        max_drawdown = np.nanmin(np.where(np.isnan(values), 0.0, values / peaks - 1.0), axis=0)
+
+        annual_std = own_std * np.sqrt(TRADING_DAYS)
+        annual_excess = (own_mean - daily_rf) * TRADING_DAYS
+        metrics = np.column_stack([
+            covariance / bench_variance,
+            annual_std * 100,
+            annual_excess / annual_std,
+            annual_excess / (downside * np.sqrt(TRADING_DAYS)),
+            max_drawdown * 100,
+            tracking_error * np.sqrt(TRADING_DAYS) * 100,
+        ])
+    metrics[~np.isfinite(metrics)] = np.nan
+    metrics[own_count == 0] = np.nan
+    return pd.DataFrame(metrics, index=tickers, columns=RISK_COLUMNS)
@@ -0,0 +1,276 @@
+import math
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+ROLLING_WINDOWS = (30, 90, 252)
+METRICS = ('vol', 'beta', 'corr')
+
+
+class RollingMoments:
+    """Running sums and co-moments of (x, y) over a fixed trailing window.
+
+    Each push adds the new pair and removes the one leaving the window in
+    O(1). Like pandas' default `min_periods=window`, a statistic is NaN
+    until the window is full or while it contains a missing value. The
+    sums are rebuilt from the window once every `window` pushes (O(1)
+    amortized) so floating-point drift from add/remove never accumulates.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self._pairs = deque()
+        self._evicted = None
+        self._pushes_since_anchor = 0
+        self._reset_sums()
+
+    def _reset_sums(self):
+        self.missing_x = 0
+        self.missing_pairs = 0
+        self.sx = self.sxx = 0.0
+        self.px = self.py = self.pxx = self.pyy = self.pxy = 0.0
+
+    def _apply(self, x, y, sign):
+        if math.isnan(x):
+            self.missing_x += sign
+        else:
+            self.sx += sign * x
+            self.sxx += sign * x * x
+        if math.isnan(x) or math.isnan(y):
+            self.missing_pairs += sign
+        else:
+            self.px += sign * x
+            self.py += sign * y
+            self.pxx += sign * x * x
+            self.pyy += sign * y * y
+            self.pxy += sign * x * y
+
+    def _reanchor(self):
+        self._reset_sums()
+        for x, y in self._pairs:
+            self._apply(x, y, 1)
+        self._pushes_since_anchor = 0
+
+    def push(self, x, y=math.nan):
+        """Append one observation, evicting the oldest once the window is full"""
+        self._evicted = None
+        if len(self._pairs) == self.window:
+            self._evicted = self._pairs.popleft()
+            self._apply(*self._evicted, -1)
+        self._pairs.append((x, y))
+        self._apply(x, y, 1)
+        self._pushes_since_anchor += 1
+        if self._pushes_since_anchor >= self.window:
+            self._reanchor()
+
+    def replace_last(self, x, y=math.nan):
+        """Restate the newest observation (e.g. a partially-traded final bar)"""
+        self._apply(*self._pairs.pop(), -1)
+        if self._evicted is not None:
+            self._pairs.appendleft(self._evicted)
+            self._apply(*self._evicted, 1)
+        self._pushes_since_anchor -= 1
+        self.push(x, y)
+
+    def _full(self, missing):
+        return len(self._pairs) == self.window and missing == 0
+
+    def variance_x(self):
+        if not self._full(self.missing_x):
+            return math.nan
+        n = self.window
+        return max((self.sxx - self.sx * self.sx / n) / (n - 1), 0.0)
+
+    def pair_moments(self):
+        """(var_x, var_y, cov) over the window's paired observations"""
+        if not self._full(self.missing_pairs):
+            return math.nan, math.nan, math.nan
+        n = self.window
+        var_x = max((self.pxx - self.px * self.px / n) / (n - 1), 0.0)
+        var_y = max((self.pyy - self.py * self.py / n) / (n - 1), 0.0)
+        cov = (self.pxy - self.px * self.py / n) / (n - 1)
+        return var_x, var_y, cov
+
+
+class RollingAnalytics:
+    """Rolling volatility, beta and correlation per ticker, updated incrementally.
+
+    State is kept per ticker across reruns. The first `update` for a
+    ticker is computed with vectorized pandas rolling windows; later ones
+    only feed the bars appended since the previous call (and restate the
+    last bar if it changed), so the Python-level work of a rerun is
+    O(new bars); the history is only compared with the inputs the state was
+    built from, in one vectorized check. Callers should feed one canonical
+    history per ticker: an older copy of it is answered from the state,
+    anything else (including a restatement of earlier bars, e.g. after a
+    split) rebuilds it. Returned frames are read-only views of the state's
+    buffers and never change afterwards: restating the last bar writes to a
+    fresh copy of the values.
+    """
+
+    def __init__(self, windows=ROLLING_WINDOWS):
+        self.windows = tuple(windows)
+        self.columns = pd.MultiIndex.from_tuples(
+            [(metric, window) for window in self.windows for metric in METRICS],
+            names=['metric', 'window']
+        )
+        self._state = {}
+        self._lock = threading.Lock()
+
+    def _new_state(self, capacity=1024):
+        return {
+            'size': 0,
+            'dates': np.empty(capacity, dtype='datetime64[ns]'),
+            'values': np.empty((capacity, len(self.columns))),
+            'inputs': np.empty((capacity, 2)),
+            'last': None,
+            'frame': None,
+            'moments': {window: RollingMoments(window) for window in self.windows},
+        }
+
+    def _grow(self, state):
+        # Double the buffers so appends stay amortized O(1)
+        capacity = 2 * len(state['dates'])
+        dates = np.empty(capacity, dtype='datetime64[ns]')
+        values = np.empty((capacity, state['values'].shape[1]))
+        inputs = np.empty((capacity, 2))
+        dates[:state['size']] = state['dates'][:state['size']]
+        values[:state['size']] = state['values'][:state['size']]
+        inputs[:state['size']] = state['inputs'][:state['size']]
+        state['dates'], state['values'], state['inputs'] = dates, values, inputs
+
+    def _record(self, state, row):
+        values = state['values'][row]
+        for i, window in enumerate(self.windows):
+            moments = state['moments'][window]
+            var_x = moments.variance_x()
+            pair_var_x, pair_var_y, cov = moments.pair_moments()
+            values[len(METRICS) * i] = math.sqrt(var_x * TRADING_DAYS) * 100 if not math.isnan(var_x) else math.nan
+            values[len(METRICS) * i + 1] = cov / pair_var_y if pair_var_y > 0 else math.nan
+            values[len(METRICS) * i + 2] = (
+                cov / math.sqrt(pair_var_x * pair_var_y) if pair_var_x > 0 and pair_var_y > 0 else math.nan
+            )
+
+    def _seed(self, returns, benchmark_returns):
+        # Whole-history build: vectorized pandas for the values, then the
+        # moments are loaded with each window's trailing pairs
+        size = len(returns)
+        state = self._new_state(max(1024, 2 * size))
+        reference = pandas_rolling(returns, benchmark_returns, self.windows)[self.columns]
+        state['values'][:size] = reference.to_numpy(dtype='float64', na_value=np.nan)
+        state['dates'][:size] = returns.index.to_numpy()
+        state['inputs'][:size, 0] = returns.to_numpy(dtype='float64', na_value=np.nan)
+        state['inputs'][:size, 1] = benchmark_returns.to_numpy(dtype='float64', na_value=np.nan)
+        state['size'] = size
+        x, y = state['inputs'][max(0, size - max(self.windows)):size].T
+        for window, moments in state['moments'].items():
+            for pair in zip(x[-window:], y[-window:]):
+                moments.push(*pair)
+        return state
+
+    def _extend(self, state, position, returns, benchmark_returns):
+        # Restate the bar at `position` (the last one seen) if it changed, then push the rest
+        x = returns.iloc[position:].to_numpy(dtype='float64', na_value=np.nan)
+        y = benchmark_returns.iloc[position:].to_numpy(dtype='float64', na_value=np.nan)
+        dates = returns.index[position:].to_numpy()
+        if not np.array_equal((x[0], y[0]), state['inputs'][position], equal_nan=True):
+            for moments in state['moments'].values():
+                moments.replace_last(x[0], y[0])
+            # Frames already returned view the old buffer and keep their values
+            state['values'] = state['values'].copy()
+            self._record(state, position)
+            state['inputs'][position] = (x[0], y[0])
+            state['frame'] = None
+        for i in range(1, len(x)):
+            if state['size'] == len(state['dates']):
+                self._grow(state)
+            for moments in state['moments'].values():
+                moments.push(x[i], y[i])
+            self._record(state, state['size'])
+            state['dates'][state['size']] = dates[i]
+            state['inputs'][state['size']] = (x[i], y[i])
+            state['size'] += 1
+            state['frame'] = None
+
+    def update(self, ticker, returns, benchmark_returns):
+        """Feed a ticker's daily returns and the benchmark's on the same date index.
+
+        Both series are the full history; only dates after the last one
+        seen are pushed, and the last one seen is restated if it changed. A
+        history that ends before the last date seen but matches the state up
+        to its end gets that prefix of the state; one whose dates or values
+        differ from the state's anywhere before its last bar is recomputed.
+        """
+        with self._lock:
+            state = self._state.get(ticker)
+            dates = returns.index
+            position = None
+            if state is not None and state['size'] and len(dates):
+                last_date = state['last']
+                position = dates.searchsorted(last_date)
+                if position == len(dates) and len(dates) <= state['size'] \
+                        and state['dates'][len(dates) - 1] == dates[-1].to_datetime64() \
+                        and self._unchanged(state, returns, benchmark_returns, len(dates)):
+                    return self._view(state).iloc[:len(dates)]
+                if position != state['size'] - 1 or position >= len(dates) or dates[position] != last_date \
+                        or not self._unchanged(state, returns, benchmark_returns, position):
+                    state = None
+            if state is None:
+                state = self._seed(returns, benchmark_returns)
+            else:
+                self._extend(state, position, returns, benchmark_returns)
+            if len(dates):
+                state['last'] = dates[-1]
+            self._state[ticker] = state
+            return self._view(state)
+
+    def _unchanged(self, state, returns, benchmark_returns, end):
+        # The first `end` bars are the ones the state was built from
+        inputs = state['inputs'][:end]
+        return (
+            np.array_equal(returns.index[:end].to_numpy(), state['dates'][:end])
+            and np.array_equal(returns.iloc[:end].to_numpy(dtype='float64', na_value=np.nan), inputs[:, 0], equal_nan=True)
+            and np.array_equal(benchmark_returns.iloc[:end].to_numpy(dtype='float64', na_value=np.nan), inputs[:, 1], equal_nan=True)
+        )
+
+    def _view(self, state):
+        if state['frame'] is None:
+            size = state['size']
+            values = state['values'][:size]
+            values.flags.writeable = False
+            state['frame'] = pd.DataFrame(
+                values,
+                index=pd.DatetimeIndex(state['dates'][:size], name='Date'),
+                columns=self.columns,
+                copy=False
+            )
+        return state['frame']
+
+
+def pair_returns(closes, benchmark_closes):
+    """Daily returns of a ticker and of the benchmark over the ticker's own trading days.
+
+    Each return runs from the ticker's previous bar to this one, and the
+    benchmark's covers the same interval (its last close on or before each
+    date), so a holiday on either calendar never leaves a missing return
+    that would blank every window containing it.
+    """
+    closes = closes.dropna()
+    benchmark = benchmark_closes.dropna()
+    benchmark = benchmark.reindex(benchmark.index.union(closes.index)).ffill().reindex(closes.index)
+    return closes.pct_change(), benchmark.pct_change(fill_method=None)
+
+
+def pandas_rolling(returns, benchmark_returns, windows=ROLLING_WINDOWS):
+    """Reference full recomputation with pandas, in the same layout as RollingAnalytics"""
+    columns = {}
+    for window in windows:
+        columns[('vol', window)] = returns.rolling(window).std() * math.sqrt(TRADING_DAYS) * 100
+        columns[('beta', window)] = returns.rolling(window).cov(benchmark_returns) / benchmark_returns.rolling(window).var()
+        columns[('corr', window)] = returns.rolling(window).corr(benchmark_returns)
+    frame = pd.DataFrame(columns)
+    frame.columns = pd.MultiIndex.from_tuples(frame.columns, names=['metric', 'window'])
+    return frame
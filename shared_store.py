@@ -0,0 +1,153 @@
+import hashlib
+import os
+import re
+import shutil
+import threading
+
+import pandas as pd
+import pyarrow as pa
+
+DEFAULT_SHARED_DIR = os.getenv('SHARED_STORE_DIR', os.path.join('data', 'shared'))
+
+
+def content_version(frame):
+    """Short content hash of a frame (values, index and column names)"""
+    digest = hashlib.sha256(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    digest.update(repr(list(frame.columns)).encode())
+    return digest.hexdigest()[:16]
+
+
+def _to_arrow(frame):
+    # from_pandas turns NaN into nulls, and a float column with nulls is
+    # copied on the way back to pandas; keep NaN as a value instead
+    table = pa.Table.from_pandas(frame)
+    for i, column in enumerate(frame.columns):
+        values = frame.iloc[:, i]
+        if pd.api.types.is_float_dtype(values.dtype) and values.hasnans:
+            field = table.schema.field(i)
+            table = table.set_column(i, field, pa.array(values.to_numpy(), type=field.type, from_pandas=False))
+    return table
+
+
+class SharedStore:
+    """Datasets published once as Arrow IPC files and memory-mapped read-only.
+
+    Every Streamlit server process that opens a dataset maps the same file,
+    so its pages live once in the OS page cache instead of once per
+    process. Numeric and categorical columns are zero-copy views of the
+    mapping (and therefore read-only).
+
+    Each dataset is a directory of immutable `<version>.arrow` files plus a
+    `CURRENT` pointer that `publish` swaps with an atomic rename; readers
+    see either the old or the new version, never a partial file. The
+    version is a content hash, so processes publishing identical data
+    share one file. Superseded files are unlinked after `keep` versions;
+    mappings that still use them stay valid until dropped. `retire` bounds
+    the number of datasets in a family (e.g. one per ticker selection).
+    """
+
+    def __init__(self, root=DEFAULT_SHARED_DIR, keep=2):
+        self.root = root
+        self.keep = keep
+        self._mapped = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def _dir(self, name):
+        return os.path.join(self.root, re.sub(r'[^A-Za-z0-9._-]', '_', name))
+
+    def version(self, name):
+        """Version currently published under `name`, or None"""
+        try:
+            with open(os.path.join(self._dir(name), 'CURRENT')) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def publish(self, name, frame):
+        """Write `frame` (if this content is new) and make it the current version"""
+        directory = self._dir(name)
+        os.makedirs(directory, exist_ok=True)
+        version = content_version(frame)
+        path = os.path.join(directory, f"{version}.arrow")
+        if not os.path.exists(path):
+            table = _to_arrow(frame)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with pa.OSFile(tmp_path, 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_path, path)
+        if self.version(name) != version:
+            pointer = os.path.join(directory, f"CURRENT.{os.getpid()}.tmp")
+            with open(pointer, 'w') as f:
+                f.write(version)
+            os.replace(pointer, os.path.join(directory, 'CURRENT'))
+            self._prune(directory, version)
+        else:
+            # Mark the dataset as recently used for `retire`
+            os.utime(os.path.join(directory, 'CURRENT'))
+        return version
+
+    def _prune(self, directory, current):
+        files = sorted(
+            (entry for entry in os.scandir(directory) if entry.name.endswith('.arrow')),
+            key=lambda entry: entry.stat().st_mtime_ns, reverse=True
+        )
+        for entry in files[self.keep:]:
+            if entry.name != f"{current}.arrow":
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+    def retire(self, prefix, keep):
+        """Remove all but the `keep` most recently published datasets whose name starts with `prefix`"""
+        prefix = re.sub(r'[^A-Za-z0-9._-]', '_', prefix)
+        published = []
+        for entry in os.scandir(self.root):
+            if entry.is_dir() and entry.name.startswith(prefix):
+                try:
+                    published.append((os.stat(os.path.join(entry.path, 'CURRENT')).st_mtime_ns, entry.path))
+                except FileNotFoundError:
+                    continue
+        for _, path in sorted(published, reverse=True)[keep:]:
+            # Processes still mapping its files keep them until they drop them
+            shutil.rmtree(path, ignore_errors=True)
+
+    def _map(self, name, version):
+        # (version, table, frame) for `version` (or the current one), mapping it if needed
+        for _ in range(3):
+            wanted = version or self.version(name)
+            if wanted is None:
+                return None
+            with self._lock:
+                mapped = self._mapped.get(name)
+                if mapped is not None and mapped[0] == wanted:
+                    return mapped
+                try:
+                    source = pa.memory_map(os.path.join(self._dir(name), f"{wanted}.arrow"), 'r')
+                except FileNotFoundError:
+                    # Pruned before it could be mapped; a newer version is current
+                    version = None
+                    continue
+                table = pa.ipc.open_file(source).read_all()
+                self._mapped[name] = (wanted, table, table.to_pandas(split_blocks=True))
+                return self._mapped[name]
+        raise FileNotFoundError(f"{name}: published versions keep disappearing")
+
+    def table(self, name, version=None):
+        """`version` (default: the current one) of `name` as a memory-mapped Arrow table (None if unpublished)"""
+        mapped = self._map(name, version)
+        return None if mapped is None else mapped[1]
+
+    def frame(self, name, version=None):
+        """`version` (default: the current one) of `name` as a DataFrame backed by the mapping"""
+        mapped = self._map(name, version)
+        return None if mapped is None else mapped[2]
+
+    def stats(self):
+        with self._lock:
+            return {
+                name: {'version': version, 'bytes': table.nbytes}
+                for name, (version, table, _) in self._mapped.items()
+            }
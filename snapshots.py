@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+
+import pandas as pd
+import pyarrow as pa
+
+from workbook import read_sheets
+
+DEFAULT_SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR', os.path.join('data', 'snapshots'))
+
+_hash_memo = {}
+_hash_lock = threading.Lock()
+
+
+def file_hash(path):
+    """SHA-256 of a file's content, memoized per (path, size, mtime)"""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _hash_lock:
+        if key in _hash_memo:
+            return _hash_memo[key]
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    with _hash_lock:
+        _hash_memo[key] = digest.hexdigest()
+    return _hash_memo[key]
+
+
+def _to_parquet(frame, path):
+    try:
+        frame.to_parquet(path)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Columns mixing numbers and text (e.g. notes under a numeric column) are stored as text
+        mixed = {col: 'string' for col in frame.columns if frame[col].dtype == object}
+        frame.astype(mixed).to_parquet(path)
+
+
+class SnapshotCache:
+    """Columnar snapshots of Excel workbooks, keyed by file content hash.
+
+    The first load of a workbook version parses every sheet once and
+    writes one Parquet file per sheet under `<root>/<name>-<hash>/`; later
+    loads (in any process) read the Parquet files instead of the XML.
+    Editing the workbook changes its hash, which makes it a new snapshot;
+    publishing one removes the workbook's superseded snapshots. Several
+    caches (in threads or processes) may compile the same workbook at
+    once: each writes to its own temporary directory and the first to
+    publish wins.
+    """
+
+    def __init__(self, root=DEFAULT_SNAPSHOT_DIR, parse=None):
+        self.root = root
+        self.parse = parse or read_sheets
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def snapshot_dir(self, path):
+        stem = re.sub(r'[^A-Za-z0-9._-]', '_', os.path.splitext(os.path.basename(path))[0])
+        return os.path.join(self.root, f"{stem}-{file_hash(path)[:16]}")
+
+    def _manifest(self, directory):
+        try:
+            with open(os.path.join(directory, 'manifest.json')) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def compile(self, path):
+        """Parse the workbook and write its snapshot; returns the manifest"""
+        directory = self.snapshot_dir(path)
+        with self._lock:
+            manifest = self._manifest(directory)
+            if manifest is not None:
+                return manifest
+            tmp_dir = tempfile.mkdtemp(prefix=os.path.basename(directory) + '.tmp-', dir=self.root)
+            try:
+                sheets = {}
+                for i, (sheet, frame) in enumerate(self.parse(path).items()):
+                    file_name = f"sheet{i}.parquet"
+                    _to_parquet(frame, os.path.join(tmp_dir, file_name))
+                    sheets[sheet] = file_name
+                manifest = {'source': os.path.basename(path), 'sha256': file_hash(path), 'sheets': sheets}
+                with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as f:
+                    json.dump(manifest, f, indent=2)
+                # Publish the whole snapshot at once so readers never see a partial one
+                try:
+                    os.replace(tmp_dir, directory)
+                except OSError:
+                    # Another compile of the same content published first
+                    published = self._manifest(directory)
+                    if published is None:
+                        raise
+                    return published
+            finally:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+            print(f"✅ Compiled snapshot for {path} ({len(sheets)} sheets)")
+            self._prune(directory)
+            return manifest
+
+    def _prune(self, directory, tmp_age=3600):
+        # Remove the workbook's other versions, and temporary directories an
+        # interrupted compile left behind more than `tmp_age` seconds ago
+        name = os.path.basename(directory)
+        pattern = re.compile(re.escape(name[:-16]) + r'[0-9a-f]{16}(\.tmp-.+)?')
+        for entry in os.listdir(self.root):
+            match = pattern.fullmatch(entry)
+            if entry == name or match is None:
+                continue
+            path = os.path.join(self.root, entry)
+            if match.group(1) is None or time.time() - os.path.getmtime(path) > tmp_age:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def load(self, path, sheets=None):
+        """{sheet name: DataFrame} for the current content of the workbook"""
+        directory = self.snapshot_dir(path)
+        manifest = self._manifest(directory) or self.compile(path)
+        names = manifest['sheets'] if sheets is None else [s for s in sheets if s in manifest['sheets']]
+        return {
+            sheet: pd.read_parquet(os.path.join(directory, manifest['sheets'][sheet]))
+            for sheet in names
+        }
@@ -0,0 +1,90 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class SWRCache:
+    """Process-wide TTL cache with stale-while-revalidate semantics.
+
+    A fresh entry is returned as is. A stale entry is returned immediately
+    while a background thread reloads it. A missing entry blocks the caller
+    on the loader. At most one load per key is in flight at any time;
+    concurrent callers for a missing key wait on the same load instead of
+    stampeding the data source.
+    """
+
+    def __init__(self, ttl=300, max_workers=4):
+        self.ttl = ttl
+        self._entries = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='swr-refresh')
+        self._stats = {'hits': 0, 'misses': 0, 'stale': 0, 'refreshes': 0, 'errors': 0}
+
+    def get(self, key, loader, ttl=None):
+        """Cached value for `key`, calling `loader()` to (re)load it"""
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, loaded_at = entry
+                if time.time() - loaded_at < ttl:
+                    self._stats['hits'] += 1
+                    return value
+                self._stats['stale'] += 1
+                if key not in self._in_flight:
+                    self._in_flight[key] = self._executor.submit(self._refresh, key, loader)
+                return value
+            self._stats['misses'] += 1
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+        if not owner:
+            return future.result()
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                self._stats['errors'] += 1
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            del self._in_flight[key]
+        future.set_result(value)
+        return value
+
+    def _refresh(self, key, loader):
+        try:
+            value = loader()
+        except Exception as e:
+            # Keep serving the stale value; the next stale read retries
+            print(f"⚠️ Background refresh failed for {key}: {e}")
+            with self._lock:
+                self._stats['errors'] += 1
+                del self._in_flight[key]
+            return
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._stats['refreshes'] += 1
+            del self._in_flight[key]
+
+    def invalidate(self, predicate=None):
+        """Mark entries stale so the next read serves them and refreshes in the background"""
+        with self._lock:
+            for key, (value, _) in self._entries.items():
+                if predicate is None or predicate(key):
+                    self._entries[key] = (value, 0.0)
+
+    def clear(self):
+        """Drop every entry; the next read of each key blocks on its loader"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Hit/miss/stale counters plus current size and in-flight loads"""
+        with self._lock:
+            return dict(self._stats, size=len(self._entries), in_flight=len(self._in_flight))
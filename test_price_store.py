@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+from market_data import MarketDataProvider, normalize_history
+from price_store import PriceStore
+
+
+class RecordedProvider(MarketDataProvider):
+    """Serves a fixed set of bars and records the `start` of every request"""
+
+    def __init__(self, bars):
+        self.bars = bars
+        self.starts = []
+
+    def history(self, ticker, start=None):
+        self.starts.append(start)
+        return self.bars if start is None else self.bars[self.bars.index >= start]
+
+
+def make_bars(dates, close, dividends=None):
+    close = np.asarray(close, dtype='float64')
+    data = pd.DataFrame({
+        'Open': close, 'High': close, 'Low': close, 'Close': close, 'Volume': 1000.0,
+        'Dividends': 0.0 if dividends is None else dividends, 'Stock Splits': 0.0,
+    }, index=pd.DatetimeIndex(dates))
+    return normalize_history(data)
+
+
+def test_gap_fill_requests_only_bars_from_last_stored_date(tmp_path):
+    dates = pd.bdate_range('2024-01-01', periods=10)
+    provider = RecordedProvider(make_bars(dates[:6], np.arange(6) + 100))
+    store = PriceStore(root=str(tmp_path), provider=provider, refresh_interval=0)
+    assert store.update('SPUS') == 6
+    provider.bars = make_bars(dates, np.arange(10) + 100)
+    # The last stored bar is fetched again (it may be restated) plus the four new ones
+    assert store.update('SPUS') == 5
+    assert provider.starts == [None, dates[5]]
+    assert store.load('SPUS')['Close'].tolist() == list(np.arange(10) + 100.0)
+
+
+def test_restated_last_bar_replaces_stored_one(tmp_path):
+    dates = pd.bdate_range('2024-01-01', periods=5)
+    provider = RecordedProvider(make_bars(dates, [100, 101, 102, 103, 104]))
+    store = PriceStore(root=str(tmp_path), provider=provider, refresh_interval=0)
+    store.update('SPUS')
+    provider.bars = make_bars(dates, [100, 101, 102, 103, 104.5])
+    assert store.update('SPUS') == 1
+    data = store.load('SPUS')
+    assert len(data) == 5
+    assert data['Close'].iloc[-1] == 104.5
+
+
+def test_unchanged_last_bar_writes_nothing(tmp_path):
+    dates = pd.bdate_range('2024-01-01', periods=5)
+    provider = RecordedProvider(make_bars(dates, [100, 101, 102, 103, 104]))
+    store = PriceStore(root=str(tmp_path), provider=provider, refresh_interval=0)
+    store.update('SPUS')
+    segments = store._segments('SPUS')
+    assert store.update('SPUS') == 0
+    assert store._segments('SPUS') == segments
+
+
+def test_dividend_in_gap_rewrites_adjusted_history(tmp_path):
+    dates = pd.bdate_range('2024-01-01', periods=8)
+    provider = RecordedProvider(make_bars(dates[:5], [100, 101, 102, 103, 104]))
+    store = PriceStore(root=str(tmp_path), provider=provider, refresh_interval=0)
+    store.update('SPUS')
+    # A dividend goes ex on the seventh day and the provider back-adjusts every earlier close
+    dividends = np.zeros(8)
+    dividends[6] = 1.0
+    provider.bars = make_bars(dates, np.array([100, 101, 102, 103, 104, 105, 105, 106]) * 0.99, dividends)
+    assert store.update('SPUS') == 8
+    assert provider.starts == [None, dates[4], None]
+    assert np.allclose(store.load('SPUS')['Close'], provider.bars['Close'])
+    assert len(store._segments('SPUS')) == 1
+
+
+def test_segments_are_compacted(tmp_path):
+    dates = pd.bdate_range('2024-01-01', periods=12)
+    close = np.arange(12) + 100.0
+    store = PriceStore(root=str(tmp_path), provider=RecordedProvider(None), max_segments=4)
+    for i in range(12):
+        store.append('SPUS', make_bars(dates[i:i + 1], close[i:i + 1]))
+        assert len(store._segments('SPUS')) <= 4
+    assert store.load('SPUS')['Close'].tolist() == close.tolist()
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+
+from rolling import ROLLING_WINDOWS, RollingAnalytics, pair_returns, pandas_rolling
+
+
+def make_returns(periods=700, seed=0):
+    dates = pd.bdate_range('2020-01-01', periods=periods)
+    rng = np.random.default_rng(seed)
+    benchmark = pd.Series(rng.normal(0.0003, 0.01, periods), index=dates)
+    returns = pd.Series(0.9 * benchmark.to_numpy() + rng.normal(0, 0.006, periods), index=dates)
+    # Missing bars in each series, as on non-shared holidays
+    returns.iloc[300:303] = np.nan
+    benchmark.iloc[450] = np.nan
+    return returns, benchmark
+
+
+def assert_matches_pandas(frame, returns, benchmark):
+    reference = pandas_rolling(returns, benchmark)[frame.columns]
+    assert frame.index.equals(reference.index)
+    np.testing.assert_allclose(frame.to_numpy(), reference.to_numpy(), rtol=1e-9, atol=1e-12, equal_nan=True)
+
+
+def test_first_build_matches_pandas():
+    returns, benchmark = make_returns()
+    frame = RollingAnalytics().update('X', returns, benchmark)
+    assert_matches_pandas(frame, returns, benchmark)
+
+
+def test_incremental_updates_match_pandas():
+    returns, benchmark = make_returns()
+    analytics = RollingAnalytics()
+    analytics.update('X', returns.iloc[:260], benchmark.iloc[:260])
+    for end in range(261, len(returns) + 1):
+        frame = analytics.update('X', returns.iloc[:end], benchmark.iloc[:end])
+    assert_matches_pandas(frame, returns, benchmark)
+
+
+def test_restated_last_bar_matches_pandas():
+    returns, benchmark = make_returns()
+    analytics = RollingAnalytics()
+    for end in range(400, 420):
+        # Each new bar first arrives partially traded, then is restated
+        partial = returns.iloc[:end].copy()
+        partial.iloc[-1] += 0.004
+        analytics.update('X', partial, benchmark.iloc[:end])
+        frame = analytics.update('X', returns.iloc[:end], benchmark.iloc[:end])
+        assert_matches_pandas(frame, returns.iloc[:end], benchmark.iloc[:end])
+    # A restated benchmark bar goes through the same path
+    restated = benchmark.iloc[:420].copy()
+    restated.iloc[-1] -= 0.002
+    analytics.update('X', returns.iloc[:420], benchmark.iloc[:420])
+    frame = analytics.update('X', returns.iloc[:420], restated)
+    assert_matches_pandas(frame, returns.iloc[:420], restated)
+
+
+def test_older_history_gets_prefix_without_rebuild():
+    returns, benchmark = make_returns()
+    analytics = RollingAnalytics()
+    full = analytics.update('X', returns, benchmark)
+    state = analytics._state['X']
+    older = analytics.update('X', returns.iloc[:500], benchmark.iloc[:500])
+    assert analytics._state['X'] is state
+    pd.testing.assert_frame_equal(older, full.iloc[:500])
+    assert_matches_pandas(older, returns.iloc[:500], benchmark.iloc[:500])
+
+
+def test_changed_history_is_rebuilt():
+    returns, benchmark = make_returns()
+    analytics = RollingAnalytics()
+    analytics.update('X', returns, benchmark)
+    # A bar removed further back no longer lines up with the state
+    revised, revised_benchmark = returns.drop(returns.index[50]), benchmark.drop(benchmark.index[50])
+    frame = analytics.update('X', revised, revised_benchmark)
+    assert_matches_pandas(frame, revised, revised_benchmark)
+
+
+def test_frames_are_read_only_views():
+    returns, benchmark = make_returns()
+    analytics = RollingAnalytics()
+    frame = analytics.update('X', returns, benchmark)
+    assert np.shares_memory(frame.to_numpy(), analytics._state['X']['values'])
+
+
+def test_pair_returns_use_each_calendar():
+    dates = pd.bdate_range('2020-01-01', periods=600)
+    rng = np.random.default_rng(1)
+    benchmark = pd.Series(100 * np.cumprod(1 + rng.normal(0.0003, 0.01, len(dates))), index=dates)
+    closes = pd.Series(50 * np.cumprod(1 + rng.normal(0.0003, 0.01, len(dates))), index=dates)
+    # Holidays that only one of the two markets observes, every few weeks
+    etf_holidays, benchmark_holidays = dates[20::23], dates[31::29]
+    closes, benchmark = closes.drop(etf_holidays), benchmark.drop(benchmark_holidays)
+    returns, benchmark_returns = pair_returns(closes, benchmark)
+    assert returns.index.equals(closes.index) and benchmark_returns.index.equals(closes.index)
+    assert returns.iloc[1:].notna().all() and benchmark_returns.iloc[1:].notna().all()
+    # Across an ETF holiday the benchmark's return spans both of its sessions
+    after = closes.index.get_loc(dates[21])
+    assert np.isclose(benchmark_returns.iloc[after], benchmark[dates[21]] / benchmark[dates[19]] - 1)
+    # On a benchmark holiday its close carries over
+    assert benchmark_returns[dates[31]] == 0.0
+    frame = RollingAnalytics().update('X', returns, benchmark_returns)
+    assert_matches_pandas(frame, returns, benchmark_returns)
+    assert frame.iloc[max(ROLLING_WINDOWS):].notna().all().all()
+
+
+def test_restated_earlier_bar_is_rebuilt():
+    returns, benchmark = make_returns()
+    analytics = RollingAnalytics()
+    analytics.update('X', returns.iloc[:600], benchmark.iloc[:600])
+    # Same dates, one value corrected far back (e.g. after a rewrite of the stored history)
+    revised = returns.copy()
+    revised.iloc[123] += 0.01
+    frame = analytics.update('X', revised, benchmark)
+    assert_matches_pandas(frame, revised, benchmark)
+    older = analytics.update('X', returns.iloc[:500], benchmark.iloc[:500])
+    assert_matches_pandas(older, returns.iloc[:500], benchmark.iloc[:500])
+
+
+def test_returned_frames_survive_a_restated_last_bar():
+    returns, benchmark = make_returns()
+    analytics = RollingAnalytics()
+    partial = returns.copy()
+    partial.iloc[-1] += 0.004
+    held = analytics.update('X', partial, benchmark)
+    expected = held.copy()
+    frame = analytics.update('X', returns, benchmark)
+    pd.testing.assert_frame_equal(held, expected)
+    assert_matches_pandas(frame, returns, benchmark)
+
+
+def test_shifted_dates_are_rebuilt():
+    returns, benchmark = make_returns()
+    analytics = RollingAnalytics()
+    analytics.update('X', returns, benchmark)
+    # Same length and values, one bar moved to a different date
+    index = returns.index.to_series()
+    index.iloc[100] += pd.Timedelta(hours=12)
+    moved, moved_benchmark = returns.set_axis(pd.DatetimeIndex(index)), benchmark.set_axis(pd.DatetimeIndex(index))
+    frame = analytics.update('X', moved, moved_benchmark)
+    assert frame.index.equals(moved.index)
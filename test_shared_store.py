@@ -0,0 +1,119 @@
+import multiprocessing
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from shared_store import SharedStore
+
+ROWS, COLUMNS, GENERATIONS = 2000, 200, 5
+
+
+def closes(generation):
+    """Aligned closes like the app's: every cell is `generation`, with NaN where a ticker has no bar"""
+    values = np.full((ROWS, COLUMNS), float(generation))
+    values[:50, ::2] = np.nan
+    values[ROWS // 2, 1::7] = np.nan
+    return pd.DataFrame(
+        values,
+        index=pd.bdate_range('2000-01-03', periods=ROWS, name='Date'),
+        columns=[f"T{i:04d}" for i in range(COLUMNS)]
+    )
+
+
+def mappings(path_suffix):
+    """Address ranges, Rss and Pss (KiB) of this process's mappings of files ending with `path_suffix`"""
+    ranges, totals, matching = [], {'Rss': 0, 'Pss': 0}, False
+    with open('/proc/self/smaps') as f:
+        for line in f:
+            fields = line.split()
+            if len(fields) >= 5 and '-' in fields[0]:
+                matching = fields[-1].endswith(path_suffix)
+                if matching:
+                    start, end = (int(address, 16) for address in fields[0].split('-'))
+                    ranges.append((start, end))
+            elif matching and fields[0].rstrip(':') in totals:
+                totals[fields[0].rstrip(':')] += int(fields[1])
+    return ranges, totals
+
+
+def reader(root, barrier, report):
+    store = SharedStore(root)
+    version = store.version('closes')
+    frame = store.frame('closes')
+    ranges, _ = mappings(f"{version}.arrow")
+    # Every column, NaN or not, must point into the mapping rather than a private copy
+    copied = [
+        column for column in frame.columns
+        if not any(start <= frame[column].to_numpy().ctypes.data < end for start, end in ranges)
+    ]
+    for column in frame.columns:
+        np.nansum(frame[column].to_numpy())
+    barrier.wait(timeout=60)
+    report.put(('mapped', copied, mappings(f"{version}.arrow")[1]))
+    barrier.wait(timeout=60)
+    seen, torn = [], 0
+    deadline = time.time() + 60
+    while len(seen) < GENERATIONS and time.time() < deadline:
+        values = store.frame('closes').to_numpy()
+        generation = np.nanmax(values)
+        # A torn read would mix generations (or lose the NaN layout)
+        torn += int(np.nanmin(values) != generation or np.isnan(values).sum() != np.isnan(closes(0).to_numpy()).sum())
+        if not seen or seen[-1] != generation:
+            seen.append(int(generation))
+        time.sleep(0.005)
+    report.put(('swaps', seen, torn))
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/smaps'), reason="needs /proc/<pid>/smaps")
+def test_processes_share_pages_and_never_see_torn_versions(tmp_path):
+    store = SharedStore(str(tmp_path))
+    store.publish('closes', closes(0))
+    context = multiprocessing.get_context('fork')
+    report = context.Queue()
+    barrier = context.Barrier(2)
+    readers = [context.Process(target=reader, args=(str(tmp_path), barrier, report)) for _ in range(2)]
+    for process in readers:
+        process.start()
+    try:
+        for _ in readers:
+            _, copied, memory = report.get(timeout=60)
+            assert copied == []
+            # Pss splits shared pages between the processes mapping them: Rss/2 means one copy for both
+            assert memory['Rss'] >= ROWS * COLUMNS * 8 / 1024 * 0.9
+            assert abs(memory['Pss'] - memory['Rss'] / 2) <= memory['Rss'] * 0.1
+        for generation in range(1, GENERATIONS):
+            time.sleep(0.1)
+            store.publish('closes', closes(generation))
+        for _ in readers:
+            _, seen, torn = report.get(timeout=90)
+            assert torn == 0
+            assert seen == sorted(seen) and seen[-1] == GENERATIONS - 1
+    finally:
+        for process in readers:
+            process.join(timeout=30)
+            if process.is_alive():
+                process.terminate()
+    assert all(process.exitcode == 0 for process in readers)
+
+
+def test_frame_maps_the_requested_version(tmp_path):
+    store = SharedStore(str(tmp_path), keep=3)
+    first = store.publish('closes', closes(1))
+    SharedStore(str(tmp_path)).publish('closes', closes(2))
+    assert store.frame('closes', first).iloc[-1, -1] == 1.0
+    assert store.frame('closes').iloc[-1, -1] == 2.0
+
+
+def test_retire_keeps_most_recently_published(tmp_path):
+    store = SharedStore(str(tmp_path))
+    for i in range(5):
+        store.publish(f"closes-{i}", closes(i))
+        time.sleep(0.01)
+    # Republishing unchanged content counts as use
+    store.publish('closes-0', closes(0))
+    store.publish('prices-X', closes(9))
+    store.retire('closes-', 2)
+    assert sorted(os.listdir(tmp_path)) == ['closes-0', 'closes-4', 'prices-X']
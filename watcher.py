@@ -0,0 +1,113 @@
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+from ingest import (
+    DEFAULT_DATASET_DIR, DEFAULT_WORKBOOKS, REFERENCE_WORKBOOK, TABLES,
+    empty_table, ingest_workbook, workbook_etf, write_dataset
+)
+from snapshots import DEFAULT_SNAPSHOT_DIR, file_hash
+
+
+def dataset_key(path):
+    """Dataset a workbook feeds: its ETF code, 'reference', or the file stem"""
+    if os.path.basename(path) == REFERENCE_WORKBOOK:
+        return 'reference'
+    return workbook_etf(path) or os.path.splitext(os.path.basename(path))[0]
+
+
+class WorkbookWatcher:
+    """Polls the workbooks and re-ingests only the ones whose content changed.
+
+    A poll stats every workbook (mtime and size) and hashes only those
+    whose stat changed, so touching a file without editing it costs one
+    hash and nothing more. Each re-ingested workbook bumps the version of
+    its dataset; callers pass `version(...)` as a cache key argument so
+    only entries built from that dataset are invalidated. Polls are
+    throttled to one per `interval` seconds unless forced.
+    """
+
+    def __init__(self, paths=None, out_dir=DEFAULT_DATASET_DIR, snapshot_dir=DEFAULT_SNAPSHOT_DIR, interval=30):
+        self.paths = list(paths or DEFAULT_WORKBOOKS)
+        self.out_dir = out_dir
+        self.snapshot_dir = snapshot_dir
+        self.interval = interval
+        self.versions = {}
+        self._stats = {}
+        self._hashes = {}
+        self._workbooks = {}
+        self._last_poll = 0
+        self._lock = threading.Lock()
+        self.dataset = {name: empty_table(name) for name in TABLES}
+        self._load()
+        self.poll(force=True)
+
+    def _load(self):
+        # Start from the last ingested dataset so only workbooks edited since are re-ingested
+        if self.out_dir is None:
+            return
+        try:
+            with open(os.path.join(self.out_dir, 'manifest.json')) as f:
+                manifest = json.load(f)
+            dataset = {name: pd.read_parquet(os.path.join(self.out_dir, f"{name}.parquet")) for name in TABLES}
+        except (FileNotFoundError, OSError, ValueError):
+            return
+        self.dataset = {name: table.astype(TABLES[name]) for name, table in dataset.items()}
+        for path, entry in manifest['workbooks'].items():
+            self._hashes[path] = entry['sha256']
+            self._workbooks[path] = dict(entry, path=path)
+
+    def version(self, path_or_key):
+        """Current version of the dataset a workbook (or dataset key) belongs to"""
+        key = dataset_key(path_or_key) if path_or_key.endswith('.xlsx') else path_or_key
+        return self.versions.get(key, 0)
+
+    def _merge(self, result):
+        tables = result['tables']
+        for name in TABLES:
+            table = self.dataset[name]
+            if 'etf' in table.columns:
+                if result['etf'] is not None:
+                    table = table[table['etf'] != result['etf']]
+            elif name in tables:
+                table = table.iloc[:0]
+            if name in tables and len(tables[name]):
+                table = pd.concat([table, tables[name]], ignore_index=True).astype(TABLES[name])
+            self.dataset[name] = table.reset_index(drop=True)
+
+    def poll(self, force=False):
+        """Re-ingest changed workbooks; returns the keys of the datasets that changed"""
+        with self._lock:
+            if not force and time.time() - self._last_poll < self.interval:
+                return []
+            self._last_poll = time.time()
+            changed = []
+            for path in self.paths:
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                fingerprint = (stat.st_mtime_ns, stat.st_size)
+                if self._stats.get(path) == fingerprint:
+                    continue
+                self._stats[path] = fingerprint
+                sha256 = file_hash(path)
+                if self._hashes.get(path) == sha256:
+                    continue
+                result = ingest_workbook(path, self.snapshot_dir)
+                self._merge(result)
+                self._hashes[path] = sha256
+                self._workbooks[path] = {k: v for k, v in result.items() if k in ('path', 'etf', 'sha256', 'rows')}
+                key = dataset_key(path)
+                self.versions[key] = self.versions.get(key, 0) + 1
+                changed.append(key)
+                print(f"🔄 Ingested {path} ({key} v{self.versions[key]}) in {result['seconds'] * 1000:.0f} ms")
+            if changed and self.out_dir is not None:
+                write_dataset(self.dataset, list(self._workbooks.values()), self.out_dir)
+            return changed
+
+    def stats(self):
+        return {'workbooks': len(self.paths), 'versions': dict(self.versions), 'last_poll': self._last_poll}
@@ -0,0 +1,370 @@
+"""Stripe webhook service, run separately from the Streamlit app.
+
+    python webhook_service.py [--port 5000] [--workers 2] [--threads 4]
+
+Each request is verified, its payload is written (and fsynced) to a spool
+directory, and only then acknowledged; a pool of worker threads runs the
+blocking handler (MySQL updates) behind it, retrying failures with backoff.
+Runs on uvicorn with `--workers` processes, each spooling to its own
+directory, named per start, and holding a lock on it while it runs. A
+process that starts adopts and replays every spool whose lock is free, so
+a crash loses no acknowledged event. Once spooled, each event is claimed
+by hard-linking its file into the spool's claimed/ directory, which fails
+if the id is already there, so a redelivery is skipped whichever process
+it reaches. An event that still fails after its retries is moved to the
+spool's dead/ directory and its claim is released, so a Stripe redelivery
+or a dashboard Resend is processed again. If an event cannot be spooled,
+the request fails and Stripe retries it.
+"""
+import argparse
+import contextlib
+import fcntl
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import stripe
+import uvicorn
+from dotenv import load_dotenv
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+
+from webhook_handler import handle_webhook_event
+
+load_dotenv()
+
+DEFAULT_PORT = int(os.getenv('WEBHOOK_PORT', '5000'))
+DEFAULT_SPOOL_DIR = os.getenv('WEBHOOK_SPOOL_DIR', os.path.join('data', 'webhooks'))
+# Stripe stops redelivering an event after three days
+CLAIM_TTL = 7 * 24 * 3600
+LOCK_NAME = '.lock'
+
+
+def _lock(directory):
+    """Exclusive lock on a spool directory, or None while another process holds it"""
+    try:
+        lock = open(os.path.join(directory, LOCK_NAME), 'a')
+    except FileNotFoundError:
+        # Adopted and removed by another process meanwhile
+        return None
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock.close()
+        return None
+    return lock
+
+
+def _remove_spool(directory, lock):
+    # Only while holding its lock, and only if nothing is left in it
+    with contextlib.suppress(OSError):
+        if os.listdir(directory) == [LOCK_NAME]:
+            os.remove(os.path.join(directory, LOCK_NAME))
+            os.rmdir(directory)
+    lock.close()
+
+
+def _filename(event_id):
+    return re.sub(r'[^A-Za-z0-9_-]', '_', event_id)
+
+
+def _fsync_dir(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class EventQueue:
+    """Bounded queue of verified events processed by `threads` worker threads.
+
+    With a `spool` directory, an event's payload is stored under
+    `<spool>/pending/<pid>-<start id>/` before `submit` returns and removed
+    once it is handled; events that exhaust their retries are moved to `<spool>/dead/`.
+    Event ids are claimed under `<spool>/claimed/`, shared by every process
+    using the spool, and claims older than `claim_ttl` seconds are pruned.
+    """
+
+    def __init__(self, handler, threads=4, maxsize=1000, retries=3, backoff=0.5, remember=10000, spool=None,
+                 claim_ttl=CLAIM_TTL):
+        self.handler = handler
+        self.threads = threads
+        self.retries = retries
+        self.backoff = backoff
+        self.remember = remember
+        self.spool = spool
+        self.claim_ttl = claim_ttl
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._seen = OrderedDict()
+        self._workers = []
+        self._lock = threading.Lock()
+        self.counts = {
+            'accepted': 0, 'duplicates': 0, 'rejected': 0, 'recovered': 0, 'processed': 0, 'failed': 0
+        }
+        self._pending = self._dead = self._claims = self._owner = None
+        self._pruned = 0
+
+    def start(self):
+        if self.spool:
+            # Per serving process, so it is known only once the process runs; a
+            # pid alone could be reused by a later process (e.g. in a container)
+            self._pending = os.path.join(self.spool, 'pending', f"{os.getpid()}-{uuid.uuid4().hex[:12]}")
+            self._dead = os.path.join(self.spool, 'dead')
+            self._claims = os.path.join(self.spool, 'claimed')
+            for path in (self._pending, self._dead, self._claims):
+                os.makedirs(path, exist_ok=True)
+            # Held until the process stops or dies, which tells others the spool is live
+            self._owner = _lock(self._pending)
+        for i in range(self.threads):
+            worker = threading.Thread(target=self._work, name=f"webhook-worker-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        if self._pending:
+            self._recover()
+
+    def stop(self, timeout=30):
+        """Let the workers drain the queue, then stop them"""
+        for _ in self._workers:
+            self._queue.put(None)
+        deadline = time.time() + timeout
+        for worker in self._workers:
+            worker.join(max(0, deadline - time.time()))
+        self._workers = []
+        if self._owner:
+            # Removed only when empty; anything left is replayed by the next process
+            _remove_spool(self._pending, self._owner)
+            self._owner = None
+
+    def _count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def _forget(self, event_id):
+        with self._lock:
+            self._seen.pop(event_id, None)
+
+    def _claim(self, path):
+        # Atomic across processes: only one link to an id can be created. A
+        # spooled file that is already the claim was claimed before a restart.
+        claim = os.path.join(self._claims, os.path.basename(path)[:-len('.json')])
+        while True:
+            try:
+                os.link(path, claim)
+                return True
+            except FileExistsError:
+                pass
+            try:
+                return os.path.samefile(path, claim)
+            except FileNotFoundError:
+                # Released in between (its event dead-lettered); try again
+                continue
+
+    def _release(self, event_id):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(os.path.join(self._claims, _filename(event_id)))
+
+    def _prune_claims(self):
+        # Once Stripe has stopped redelivering an event its claim is not needed
+        self._pruned = time.time()
+        for name in os.listdir(self._claims):
+            path = os.path.join(self._claims, name)
+            with contextlib.suppress(FileNotFoundError):
+                if os.path.getmtime(path) < self._pruned - self.claim_ttl:
+                    os.remove(path)
+
+    def _store(self, event_id, payload):
+        # Durably write the payload before the event is acknowledged
+        path = os.path.join(self._pending, _filename(event_id) + '.json')
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(payload if isinstance(payload, bytes) else payload.encode())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        _fsync_dir(self._pending)
+        return path
+
+    def _recover(self):
+        # Adopt the spools no running process holds, then replay everything pending
+        root = os.path.dirname(self._pending)
+        for entry in os.listdir(root):
+            directory = os.path.join(root, entry)
+            if directory == self._pending:
+                continue
+            lock = _lock(directory)
+            if lock is None:
+                continue
+            for name in os.listdir(directory):
+                if name != LOCK_NAME:
+                    os.replace(os.path.join(directory, name), os.path.join(self._pending, name))
+            _remove_spool(directory, lock)
+        for name in sorted(os.listdir(self._pending)):
+            path = os.path.join(self._pending, name)
+            if name == LOCK_NAME:
+                continue
+            if not name.endswith('.json'):
+                os.remove(path)
+                continue
+            if not self._claim(path):
+                # Redelivered to another process before this one was acknowledged
+                os.remove(path)
+                continue
+            with open(path, 'rb') as f:
+                event = stripe.Webhook.construct_event_without_verification(f.read())
+            with self._lock:
+                self._seen[event['id']] = True
+            self._queue.put((event, path))
+            self._count('recovered')
+        if self.counts['recovered']:
+            print(f"🔄 Replaying {self.counts['recovered']} spooled webhook event(s)")
+
+    def submit(self, event, payload=None):
+        """Queue an event; returns 'accepted', 'duplicate', 'full' or 'error' (could not be spooled)"""
+        with self._lock:
+            # Stripe redelivers on timeouts, so an event id may arrive more than once
+            if event['id'] in self._seen:
+                self.counts['duplicates'] += 1
+                return 'duplicate'
+            self._seen[event['id']] = True
+            if len(self._seen) > self.remember:
+                self._seen.popitem(last=False)
+        path = None
+        if self._pending and payload is not None:
+            try:
+                path = self._store(event['id'], payload)
+                claimed = self._claim(path)
+            except OSError as e:
+                print(f"❌ Could not spool webhook event {event['id']}: {e}")
+                self._forget(event['id'])
+                if path:
+                    with contextlib.suppress(OSError):
+                        os.remove(path)
+                self._count('rejected')
+                return 'error'
+            if not claimed:
+                # The redelivery reached another process first
+                os.remove(path)
+                self._forget(event['id'])
+                self._count('duplicates')
+                return 'duplicate'
+            if time.time() - self._pruned > 3600:
+                self._prune_claims()
+        try:
+            self._queue.put_nowait((event, path))
+        except queue.Full:
+            self._forget(event['id'])
+            if path:
+                os.remove(path)
+                self._release(event['id'])
+            self._count('rejected')
+            return 'full'
+        self._count('accepted')
+        return 'accepted'
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._process(*item)
+            finally:
+                self._queue.task_done()
+
+    def _process(self, event, path=None):
+        for attempt in range(self.retries + 1):
+            try:
+                self.handler(event)
+                self._count('processed')
+                if path:
+                    os.remove(path)
+                    # A redelivered event that had been dead-lettered is settled now
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(os.path.join(self._dead, os.path.basename(path)))
+                return
+            except Exception as e:
+                if attempt == self.retries:
+                    print(f"❌ Webhook event {event['id']} ({event['type']}) failed: {e}")
+                    if path:
+                        os.replace(path, os.path.join(self._dead, os.path.basename(path)))
+                    # Let a redelivery or a dashboard Resend through
+                    self._forget(event['id'])
+                    if path:
+                        self._release(event['id'])
+                    self._count('failed')
+                    return
+                time.sleep(self.backoff * 2 ** attempt)
+
+    def join(self):
+        """Block until every queued event has been processed"""
+        self._queue.join()
+
+    def stats(self):
+        dead = len(os.listdir(self._dead)) if self._dead else 0
+        with self._lock:
+            return dict(self.counts, queued=self._queue.qsize(), threads=len(self._workers), dead=dead)
+
+
+def create_app(handler=handle_webhook_event, secret=None, threads=4, maxsize=1000, spool=DEFAULT_SPOOL_DIR):
+    """Starlette app that verifies, spools, acknowledges and queues Stripe events"""
+    secret = secret or os.getenv('STRIPE_WEBHOOK_SECRET')
+    events = EventQueue(handler, threads=threads, maxsize=maxsize, spool=spool)
+
+    async def webhook(request):
+        payload = await request.body()
+        try:
+            event = stripe.Webhook.construct_event(payload, request.headers.get('Stripe-Signature'), secret)
+        except ValueError:
+            return PlainTextResponse('Invalid payload', status_code=400)
+        except stripe.error.SignatureVerificationError:
+            return PlainTextResponse('Invalid signature', status_code=400)
+        # Not acknowledged unless spooled, so Stripe retries later; the fsyncs
+        # run on the threadpool rather than blocking the event loop
+        status = await run_in_threadpool(events.submit, event, payload)
+        if status == 'full':
+            return PlainTextResponse('Busy', status_code=503)
+        if status == 'error':
+            return PlainTextResponse('Could not store event', status_code=500)
+        return PlainTextResponse('Success')
+
+    async def health(request):
+        return JSONResponse(events.stats())
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        events.start()
+        yield
+        events.stop()
+
+    app = Starlette(
+        routes=[Route('/webhook', webhook, methods=['POST']), Route('/health', health)],
+        lifespan=lifespan,
+    )
+    app.state.events = events
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default=os.getenv('WEBHOOK_HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=2, help="Server processes")
+    parser.add_argument('--threads', type=int, default=4, help="Event worker threads per process")
+    args = parser.parse_args()
+    os.environ['WEBHOOK_THREADS'] = str(args.threads)
+    print(f"✅ Webhook service on {args.host}:{args.port} ({args.workers} processes x {args.threads} threads)")
+    uvicorn.run('webhook_service:app', host=args.host, port=args.port, workers=args.workers, log_level='warning')
+
+
+# Module-level app for uvicorn (`uvicorn webhook_service:app`)
+app = create_app(threads=int(os.getenv('WEBHOOK_THREADS', '4')))
+
+if __name__ == "__main__":
+    main()
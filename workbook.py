@@ -0,0 +1,91 @@
+import threading
+
+import numpy as np
+import openpyxl
+import pandas as pd
+from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+from pandas.io.parsers import TextParser
+
+
+def _convert_cell(cell):
+    # Same conversion pandas applies to openpyxl cells
+    if cell.value is None:
+        return ""
+    if cell.data_type == TYPE_ERROR:
+        return np.nan
+    if cell.data_type == TYPE_NUMERIC:
+        value = int(cell.value)
+        return value if value == cell.value else float(cell.value)
+    return cell.value
+
+
+class WorkbookReader:
+    """Reads sheets of one .xlsx file on demand through a single open archive.
+
+    The workbook is opened once in openpyxl's read-only (streaming) mode;
+    a sheet's XML is only parsed the first time it is requested, and only
+    up to the last requested column. Parsed sheets are cached per
+    (sheet, columns). Results match `pd.read_excel(path, sheet_name=...)`.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._book = openpyxl.load_workbook(path, read_only=True, data_only=True, keep_links=False)
+        self._sheets = {}
+        self._lock = threading.Lock()
+
+    @property
+    def sheet_names(self):
+        return self._book.sheetnames
+
+    def _rows(self, worksheet, columns=None):
+        worksheet.reset_dimensions()
+        data = []
+        last_row_with_data = -1
+        width = None
+        for row_number, row in enumerate(worksheet.iter_rows()):
+            if width is None and columns is not None:
+                # Stop each row after the last requested header
+                positions = [i for i, cell in enumerate(row) if cell.value in columns]
+                width = max(positions) + 1 if positions else 0
+            converted = [_convert_cell(cell) for cell in row[:width]]
+            while converted and converted[-1] == "":
+                converted.pop()
+            if converted:
+                last_row_with_data = row_number
+            data.append(converted)
+        data = data[:last_row_with_data + 1]
+        width = max((len(row) for row in data), default=0)
+        return [row + [""] * (width - len(row)) for row in data]
+
+    def sheet(self, name, columns=None):
+        """One sheet as a DataFrame, optionally restricted to `columns` (header names)"""
+        key = (name, tuple(columns) if columns is not None else None)
+        with self._lock:
+            if key not in self._sheets:
+                data = self._rows(self._book[name], columns)
+                frame = TextParser(data, header=0).read() if data else pd.DataFrame()
+                if columns is not None:
+                    frame = frame[[column for column in columns if column in frame.columns]]
+                self._sheets[key] = frame
+            return self._sheets[key]
+
+    def sheets(self, names=None):
+        """{sheet name: DataFrame} for `names` (default: every sheet)"""
+        names = self.sheet_names if names is None else [name for name in names if name in self.sheet_names]
+        return {name: self.sheet(name) for name in names}
+
+    def close(self):
+        self._book.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_sheets(path, names=None):
+    """Parse only the named sheets of a workbook, opening it once"""
+    with WorkbookReader(path) as reader:
+        return reader.sheets(names)